@@ -0,0 +1,67 @@
+"""Compare opening an OSL file from JSON with reopening it from its binary cache.
+
+Usage: python benchmarks/bench_cache.py [--videos N] [--events N] [--keep DIR]
+
+A synthetic OSL file is written to a temporary folder, then timed:
+
+- cold JSON load: parsing the whole file (what every open cost before the cache);
+- cache build: writing ``<file>.json.cache`` from the parsed data;
+- cached open: reading the cache and creating every video with its event counts;
+- open one video: building the annotation dicts of one video from the cache.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "osl_visualizer"))
+
+from bincache import cache_path, open_cache, write_cache  # noqa: E402
+from osl_io import load_osl_json  # noqa: E402
+from stats import label_counts  # noqa: E402
+from synthetic import make_dataset, write_dataset  # noqa: E402
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<18}{time.perf_counter() - start:9.3f} s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=250, help="annotations per video")
+    parser.add_argument("--keep", metavar="DIR", help="write the files to DIR instead of a temporary folder")
+    args = parser.parse_args(argv)
+
+    folder = args.keep or tempfile.mkdtemp(prefix="osl-bench-")
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, "bench.json")
+    write_dataset(file_path, make_dataset(args.videos, args.videos * args.events))
+    print(f"{args.videos} videos, {args.videos * args.events} annotations, "
+          f"JSON {os.path.getsize(file_path) / 1e6:.1f} MB")
+
+    osl_data = timed("cold JSON load", lambda: load_osl_json(file_path))
+    timed("cache build", lambda: write_cache(file_path, osl_data))
+    print(f"{'cache size':<18}{os.path.getsize(cache_path(file_path)) / 1e6:9.1f} MB")
+
+    def cached_open():
+        reader = open_cache(file_path)
+        videos = list(reader.videos())
+        for video in videos:
+            label_counts(video["annotations"])
+        return videos
+
+    videos = timed("cached open", cached_open)
+    timed("open one video", lambda: videos[len(videos) // 2]["annotations"].load())
+    if not args.keep:
+        for path in (file_path, cache_path(file_path)):
+            os.remove(path)
+        os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main()
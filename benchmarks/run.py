@@ -0,0 +1,433 @@
+"""Benchmark suite of the data layer, on synthetic datasets.
+
+Usage: python benchmarks/run.py [--scale small|medium|large] [--output results.json]
+                                [--baseline baseline.json] [--threshold 0.25] [--filter NAME]
+
+Times, and measures the memory allocated by, the operations whose cost
+grows with the size of a project: loading and saving OSL JSON, resetting
+and inserting into the video and annotation models, jumping to the
+previous/next annotation, exporting events, bulk edits and formatting times. The
+dataset is generated by synthetic.py; the ``large`` scale has 10k videos
+and 1M annotations.
+
+Every benchmark is run once to warm up, then ``--repeat`` times after a
+fresh, untimed setup, with the garbage collector paused, and its median
+time is reported; the memory peak is measured in one more run under
+tracemalloc. ``--output`` writes the results as JSON. Given a
+``--baseline`` (the JSON output of an earlier run), the results are
+compared with it and the exit status is 1 if a benchmark got slower or
+allocated more than the threshold allows. Times are compared on the
+fastest run, which other processes of the machine disturb the least. Runs are headless: Qt uses its
+offscreen platform unless QT_QPA_PLATFORM is set.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "osl_visualizer"))
+
+from PyQt6.QtCore import QT_VERSION_STR  # noqa: E402
+from PyQt6.QtGui import QGuiApplication  # noqa: E402
+
+from models import AnnotationListModel, VideoListModel  # noqa: E402
+from osl_io import encode_video, iter_osl_chunks, iter_osl_json, load_osl_json, read_osl_text, write_atomic  # noqa: E402
+from utils import hms_ms_to_ms, ms_to_hms_ms, ms_to_hms_ms_batch, ms_to_time  # noqa: E402
+from export import export_events  # noqa: E402
+from bulk import BulkEdit, apply_edit, revert_edit, RENAME, SHIFT  # noqa: E402
+from store import AnnotationStore, LabelTable  # noqa: E402
+from synthetic import make_dataset, make_video, write_dataset  # noqa: E402
+
+SCALES = {
+    "small": (200, 20000),
+    "medium": (2000, 200000),
+    "large": (10000, 1000000),
+}
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown, as a fraction of the baseline time
+DEFAULT_MEMORY_THRESHOLD = 0.10  # Allowed growth of the memory peak
+MEMORY_NOISE_BYTES = 64 * 1024  # Smaller growths of the memory peak are never regressions
+RESULTS_VERSION = 1
+
+
+class Context:
+    """Dataset shared by the benchmarks, generated and written once."""
+
+    def __init__(self, n_videos, n_annotations, seed, folder):
+        self.seed = seed
+        self.folder = folder
+        self.osl_data = make_dataset(n_videos, n_annotations, seed)
+        self.videos = self.osl_data["videos"]
+        self.json_path = os.path.join(folder, "bench.json")
+        write_dataset(self.json_path, self.osl_data)
+        self.out_path = os.path.join(folder, "saved.json")
+        # The video with the most events, where per-video costs are the highest
+        self.largest = max(self.videos, key=lambda video: len(video["annotations"]))
+        self.positions = [ann["position"] for video in self.videos for ann in video["annotations"]]
+        self._fragments = None
+        self._compact_videos = None
+        self.label_table = None  # LabelTable of the compact videos
+
+    def rng(self):
+        return random.Random(self.seed)
+
+    def fragments(self):
+        """Encoded fragments of every video, as the fragment cache holds them after a save."""
+        if self._fragments is None:
+            self._fragments = [encode_video(video) for video in self.videos]
+        return self._fragments
+
+    def compact_videos(self):
+        """Copies of the videos with their annotations in AnnotationStores, as compact storage keeps them."""
+        if self._compact_videos is None:
+            self.label_table = labels = LabelTable()
+            self._compact_videos = [dict(video, annotations=AnnotationStore.from_list(video["annotations"], labels))
+                                    for video in self.videos]
+        return self._compact_videos
+
+
+class Benchmark:
+    """A named operation. setup(ctx) returns the function to time and the number of operations it does."""
+
+    def __init__(self, name, setup, threshold=None):
+        self.name = name
+        self.setup = setup
+        self.threshold = threshold  # Overrides --threshold for noisy benchmarks
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, threshold=None):
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(name, setup, threshold))
+        return setup
+    return decorator
+
+
+# ---------- OSL JSON ----------
+
+@benchmark("json.load")
+def _json_load(ctx):
+    return lambda: load_osl_json(ctx.json_path), len(ctx.videos)
+
+
+@benchmark("json.load_streaming")
+def _json_load_streaming(ctx):
+    # What the background loader does: videos are decoded one by one from the text
+    def run():
+        for _ in iter_osl_json(read_osl_text(ctx.json_path)):
+            pass
+    return run, len(ctx.videos)
+
+
+@benchmark("json.save", threshold=0.5)  # Disk bound
+def _json_save(ctx):
+    def run():
+        fragments = [encode_video(video) for video in ctx.videos]
+        write_atomic(ctx.out_path, iter_osl_chunks(ctx.osl_data, fragments))
+    return run, len(ctx.videos)
+
+
+@benchmark("json.save_incremental", threshold=0.5)
+def _json_save_incremental(ctx):
+    # 1% of the videos were edited since the last save, the others are cached fragments
+    cached = ctx.fragments()
+    modified = set(ctx.rng().sample(range(len(ctx.videos)), max(1, len(ctx.videos) // 100)))
+
+    def run():
+        fragments = [encode_video(video) if i in modified else cached[i] for i, video in enumerate(ctx.videos)]
+        write_atomic(ctx.out_path, iter_osl_chunks(ctx.osl_data, fragments))
+    return run, len(modified)
+
+
+@benchmark("export.csv", threshold=0.5)
+def _export_csv(ctx):
+    return lambda: export_events(ctx.videos, os.path.join(ctx.folder, "events.csv")), len(ctx.positions)
+
+
+@benchmark("export.jsonl", threshold=0.5)
+def _export_jsonl(ctx):
+    return lambda: export_events(ctx.videos, os.path.join(ctx.folder, "events.jsonl")), len(ctx.positions)
+
+
+# ---------- Models ----------
+
+@benchmark("video_model.reset")
+def _video_model_reset(ctx):
+    model = VideoListModel()
+    return lambda: model.set_videos(list(ctx.videos)), len(ctx.videos)
+
+
+@benchmark("video_model.append")
+def _video_model_append(ctx):
+    # Batches of 200 videos, as streamed by the background loader
+    model = VideoListModel()
+
+    def run():
+        for start in range(0, len(ctx.videos), 200):
+            model.append_videos(ctx.videos[start:start + 200])
+    return run, len(ctx.videos)
+
+
+@benchmark("video_model.insert")
+def _video_model_insert(ctx):
+    rng = ctx.rng()
+    model = VideoListModel(sorted(ctx.videos, key=lambda video: video["path"]))
+    new_videos = [make_video(rng.randrange(len(ctx.videos)), 0, rng) for _ in range(100)]
+
+    def run():
+        for video in new_videos:
+            model.insert_video(video)
+    return run, len(new_videos)
+
+
+@benchmark("annotation_model.reset")
+def _annotation_model_reset(ctx):
+    # Browsing through the videos of the project
+    model = AnnotationListModel()
+    lists = [video["annotations"] for video in ctx.videos[:1000]]
+
+    def run():
+        for annotations in lists:
+            model.set_annotations(annotations)
+    return run, len(lists)
+
+
+@benchmark("annotation_model.insert")
+def _annotation_model_insert(ctx):
+    rng = ctx.rng()
+    model = AnnotationListModel(list(ctx.largest["annotations"]))
+    duration_ms = int(ctx.largest["duration"] * 1000)
+    new = [{"label": "Goal", "position": rng.randrange(duration_ms)} for _ in range(1000)]
+
+    def run():
+        for annotation in new:
+            model.add_annotation(annotation)
+    return run, len(new)
+
+
+@benchmark("navigation.previous")
+def _navigation_previous(ctx):
+    rng = ctx.rng()
+    model = AnnotationListModel(ctx.largest["annotations"])
+    duration_ms = int(ctx.largest["duration"] * 1000)
+    positions = [rng.randrange(duration_ms) for _ in range(10000)]
+
+    def run():
+        for position in positions:
+            model.previous_row(position)
+    return run, len(positions)
+
+
+@benchmark("navigation.next")
+def _navigation_next(ctx):
+    rng = ctx.rng()
+    model = AnnotationListModel(ctx.largest["annotations"])
+    duration_ms = int(ctx.largest["duration"] * 1000)
+    positions = [rng.randrange(duration_ms) for _ in range(10000)]
+
+    def run():
+        for position in positions:
+            model.next_row(position)
+    return run, len(positions)
+
+
+# ---------- Bulk edits ----------
+# Every run applies the edit and reverts it, so the dataset is the same for the next run
+
+def _bulk(videos, edit, table=None):
+    def run():
+        revert_edit(apply_edit(videos, edit, table=table))
+    return run
+
+
+@benchmark("bulk.rename")
+def _bulk_rename(ctx):
+    return _bulk(ctx.videos, BulkEdit(RENAME, ["Foul", "Offside"], "Infringement")), len(ctx.positions)
+
+
+@benchmark("bulk.rename_compact")
+def _bulk_rename_compact(ctx):
+    # Renamed in the label table shared by the stores, without rewriting events
+    videos = ctx.compact_videos()
+    return _bulk(videos, BulkEdit(RENAME, ["Foul"], "Infringement"), ctx.label_table), len(ctx.positions)
+
+
+@benchmark("bulk.shift")
+def _bulk_shift(ctx):
+    return _bulk(ctx.videos, BulkEdit(SHIFT, offset=2000)), len(ctx.positions)
+
+
+@benchmark("bulk.shift_compact")
+def _bulk_shift_compact(ctx):
+    return _bulk(ctx.compact_videos(), BulkEdit(SHIFT, offset=2000)), len(ctx.positions)
+
+
+# ---------- Time formatting ----------
+
+@benchmark("utils.ms_to_hms_ms")
+def _ms_to_hms_ms(ctx):
+    return lambda: [ms_to_hms_ms(position) for position in ctx.positions], len(ctx.positions)
+
+
+@benchmark("utils.ms_to_hms_ms_batch")
+def _ms_to_hms_ms_batch(ctx):
+    return lambda: ms_to_hms_ms_batch(ctx.positions), len(ctx.positions)
+
+
+@benchmark("utils.ms_to_time")
+def _ms_to_time(ctx):
+    return lambda: [ms_to_time(position) for position in ctx.positions], len(ctx.positions)
+
+
+@benchmark("utils.hms_ms_to_ms")
+def _hms_ms_to_ms(ctx):
+    texts = [ms_to_hms_ms(position) for position in ctx.positions]
+    return lambda: [hms_ms_to_ms(text) for text in texts], len(texts)
+
+
+# ---------- Runner ----------
+
+def measure(bench, ctx, repeat):
+    """Run bench repeat times, then once more under tracemalloc, and return its results."""
+    times = []
+    run, ops = bench.setup(ctx)
+    run()  # Warm up
+    for _ in range(repeat):
+        run, ops = bench.setup(ctx)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    run, _ = bench.setup(ctx)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    median = statistics.median(times)
+    return {
+        "median_s": median,
+        "min_s": min(times),
+        "max_s": max(times),
+        "repeat": repeat,
+        "ops": ops,
+        "us_per_op": median * 1e6 / ops if ops else None,
+        "peak_memory_bytes": peak - before,
+    }
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """Compare results with a baseline; return a list of (name, kind, ratio, limit, regressed)."""
+    thresholds = {bench.name: bench.threshold for bench in BENCHMARKS}
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = thresholds.get(name) or threshold
+        if base.get("min_s"):
+            ratio = result["min_s"] / base["min_s"]
+            rows.append((name, "time", ratio, limit, ratio > 1 + limit))
+        if base.get("peak_memory_bytes"):
+            ratio = result["peak_memory_bytes"] / base["peak_memory_bytes"]
+            grown = result["peak_memory_bytes"] - base["peak_memory_bytes"] > MEMORY_NOISE_BYTES
+            rows.append((name, "memory", ratio, memory_threshold, grown and ratio > 1 + memory_threshold))
+    return rows
+
+
+def _format_bytes(n):
+    return f"{n / 1e6:.1f} MB" if n >= 1e5 else f"{n / 1e3:.1f} kB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data layer on a synthetic dataset")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--videos", type=int, help="number of videos (overrides --scale)")
+    parser.add_argument("--annotations", type=int, help="number of annotations in total (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", action="append", metavar="NAME",
+                        help="only run the benchmarks whose name contains NAME (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--baseline", metavar="PATH", help="compare with the JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown over the baseline (default: %(default)s, i.e. 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="allowed growth of the memory peak over the baseline (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    benches = [bench for bench in BENCHMARKS
+               if not args.filter or any(pattern in bench.name for pattern in args.filter)]
+    if args.list:
+        for bench in benches:
+            print(bench.name)
+        return 0
+    n_videos, n_annotations = SCALES[args.scale]
+    n_videos = args.videos or n_videos
+    n_annotations = args.annotations if args.annotations is not None else n_annotations
+
+    # The models need an application; it is kept referenced until the benchmarks are done
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    log = sys.stderr if args.output == "-" else sys.stdout
+    with tempfile.TemporaryDirectory(prefix="osl-bench-") as folder:
+        print(f"Generating {n_videos} videos, {n_annotations} annotations...", file=log)
+        ctx = Context(n_videos, n_annotations, args.seed, folder)
+        print(f"JSON {os.path.getsize(ctx.json_path) / 1e6:.1f} MB\n", file=log)
+        print(f"{'benchmark':<26}{'median':>10}{'per op':>12}{'memory':>12}", file=log)
+        results = {}
+        for bench in benches:
+            result = results[bench.name] = measure(bench, ctx, args.repeat)
+            per_op = f"{result['us_per_op']:.2f} us" if result["us_per_op"] is not None else ""
+            print(f"{bench.name:<26}{result['median_s'] * 1000:8.1f} ms{per_op:>12}"
+                  f"{_format_bytes(result['peak_memory_bytes']):>12}", file=log)
+    del app
+
+    report = {
+        "version": RESULTS_VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "qt": QT_VERSION_STR,
+                    "platform": platform.platform(), "processor": platform.processor()},
+        "dataset": {"videos": n_videos, "annotations": n_annotations, "seed": args.seed},
+        "results": results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("dataset") != report["dataset"]:
+            print(f"\nWarning: the baseline was measured on another dataset: {baseline.get('dataset')}", file=log)
+        rows = compare(results, baseline.get("results", {}), args.threshold, args.memory_threshold)
+        report["comparison"] = [{"benchmark": name, "metric": kind, "ratio": ratio, "threshold": limit,
+                                 "regression": regressed} for name, kind, ratio, limit, regressed in rows]
+        print(f"\n{'benchmark':<26}{'metric':<8}{'vs baseline':>12}", file=log)
+        for name, kind, ratio, limit, regressed in rows:
+            flag = f"  REGRESSION (> +{limit:.0%})" if regressed else ""
+            print(f"{name:<26}{kind:<8}{ratio - 1:>+11.1%}{flag}", file=log)
+        if any(row[4] for row in rows):
+            status = 1
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
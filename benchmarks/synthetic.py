@@ -0,0 +1,117 @@
+"""Synthetic OSL datasets for the benchmarks.
+
+make_dataset() builds an OSL JSON document of any size (up to 10k videos
+and 1M annotations and beyond) with distributions close to those of real
+action spotting datasets:
+
+- labels follow the long-tailed frequencies of the SoccerNet-v2 classes
+  (throw-ins and balls out of play are common, red cards are rare);
+- the number of events per video varies around the mean (log-normal), the
+  total being exactly the requested number of annotations;
+- videos are match halves of 45 to 50 minutes at 25, 30 or 50 fps, and
+  events are spread over the whole half, in chronological order;
+- annotations carry ``gameTime``, ``team`` and ``visibility`` like
+  SoccerNet annotations do.
+
+The same seed always gives the same dataset.
+
+Usage: python benchmarks/synthetic.py OUTPUT.json [--videos N] [--annotations N] [--seed N]
+"""
+import json
+import math
+import random
+import argparse
+
+# SoccerNet-v2 classes with their approximate share of the annotations
+LABEL_WEIGHTS = {
+    "Ball out of play": 0.224,
+    "Throw-in": 0.175,
+    "Foul": 0.117,
+    "Indirect free-kick": 0.105,
+    "Clearance": 0.075,
+    "Shots on target": 0.039,
+    "Shots off target": 0.046,
+    "Corner": 0.044,
+    "Substitution": 0.023,
+    "Kick-off": 0.026,
+    "Direct free-kick": 0.024,
+    "Offside": 0.021,
+    "Yellow card": 0.019,
+    "Goal": 0.016,
+    "Penalty": 0.002,
+    "Red card": 0.0005,
+    "Yellow->red card": 0.0004,
+}
+LABELS = list(LABEL_WEIGHTS)
+
+LEAGUES = ["england_epl", "spain_laliga", "germany_bundesliga", "italy_serie-a", "france_ligue-1", "europe_uefa-champions-league"]
+SEASONS = ["2014-2015", "2015-2016", "2016-2017"]
+FPS_CHOICES = (25, 25, 25, 30, 50)  # Most broadcasts are 25 fps
+
+
+def events_per_video(n_videos, n_annotations, rng):
+    """Split n_annotations over n_videos with a log-normal spread around the mean."""
+    weights = [rng.lognormvariate(0, 0.35) for _ in range(n_videos)]
+    total = sum(weights)
+    counts = [int(n_annotations * w / total) for w in weights]
+    for i in rng.sample(range(n_videos), n_annotations - sum(counts)):
+        counts[i] += 1
+    return counts
+
+
+def make_video(i, n_events, rng):
+    half = i % 2 + 1
+    match = i // 2
+    duration_ms = rng.randrange(45 * 60 * 1000, 50 * 60 * 1000)
+    positions = sorted(rng.randrange(0, duration_ms) for _ in range(n_events))
+    labels = rng.choices(LABELS, weights=list(LABEL_WEIGHTS.values()), k=n_events)
+    league = LEAGUES[match % len(LEAGUES)]
+    season = SEASONS[match // len(LEAGUES) % len(SEASONS)]
+    annotations = []
+    for position, label in zip(positions, labels):
+        seconds = position // 1000
+        annotations.append({
+            "gameTime": f"{half} - {seconds // 60:02d}:{seconds % 60:02d}",
+            "label": label,
+            "position": position,
+            "team": rng.choice(("home", "away")) if label != "Kick-off" else "not applicable",
+            "visibility": "visible" if rng.random() < 0.9 else "not shown",
+        })
+    return {
+        "path": f"{league}/{season}/match_{match:05d}/{half}_224p.mkv",
+        "input_fps": rng.choice(FPS_CHOICES),
+        "duration": round(duration_ms / 1000, 3),
+        "annotations": annotations,
+    }
+
+
+def make_dataset(n_videos=2000, n_annotations=200000, seed=0):
+    """Return a synthetic OSL document with n_videos videos and n_annotations annotations in total."""
+    rng = random.Random(seed)
+    counts = events_per_video(n_videos, n_annotations, rng)
+    return {
+        "version": 1,
+        "date": "2024-01-01 00:00",
+        "dataset_name": f"synthetic-{n_videos}x{math.ceil(n_annotations / max(n_videos, 1))}",
+        "labels": LABELS,
+        "videos": [make_video(i, n_events, rng) for i, n_events in enumerate(counts)],
+    }
+
+
+def write_dataset(file_path, osl_data, indent=2):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(osl_data, f, indent=indent)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic OSL JSON dataset")
+    parser.add_argument("output")
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--annotations", type=int, default=200000, help="annotations in total")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_dataset(args.output, make_dataset(args.videos, args.annotations, args.seed))
+
+
+if __name__ == "__main__":
+    main()
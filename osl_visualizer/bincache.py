@@ -0,0 +1,369 @@
+"""Compact binary cache of OSL JSON files, for near-instant reopening.
+
+When the cache is enabled (it is off by default) and a project is loaded
+from JSON, a cache file is written next to it
+(``<project>.json.cache``). It holds the annotations of all videos as typed
+arrays (positions, label ids, key layouts and string ids), the label table,
+and a pool of UTF-8 strings for paths, string fields and metadata. It also
+records the size and modification time of the JSON file it was built from.
+
+Reopening a file whose cache is up to date reads the cache in one go instead
+of parsing the JSON. The cache is not kept open or mapped afterwards, so a
+save can replace it on every platform (Windows refuses to replace a file
+that is mapped). Videos are created from the pool and their annotations are
+CachedAnnotations, which know their length and label counts from the arrays
+and build the annotation dicts only when the video is opened. A stale or
+unreadable cache is ignored and the JSON file is parsed again.
+"""
+import os
+import json
+import struct
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from lazy import LazyAnnotations
+from osl_io import write_atomic
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 1
+_MAGIC = b"OSLCACHE"
+_ALIGN = 8
+_MISSING = object()
+
+
+class CacheError(Exception):
+    """Raised when a cache file cannot be read or built."""
+
+
+def cache_path(file_path):
+    return file_path + CACHE_SUFFIX
+
+
+def file_signature(file_path):
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _annotation_list(annotations):
+    """Plain list of dicts of an annotation list, store or lazy list, without changing it."""
+    if isinstance(annotations, list):
+        return annotations
+    return annotations.to_list()
+
+
+def _distinct_strings(values):
+    """The distinct strings of values, in order of first occurrence."""
+    try:
+        distinct = dict.fromkeys(values)
+    except TypeError:  # Unhashable objects or arrays
+        distinct = dict.fromkeys(value for value in values if type(value) is str)
+    return [value for value in distinct if type(value) is str]
+
+
+class CacheBuilder:
+    """Accumulates videos into the arrays and string pool of a cache file."""
+
+    def __init__(self):
+        self._video_starts = array("q", [0])
+        self._video_info = array("i")  # pool id of the video fields as JSON
+        self._video_flags = array("b")  # 1 when the video has an annotation list
+        self._positions = array("q")
+        self._label_ids = array("i")
+        self._layout_ids = array("H")
+        self._metadata = array("i")  # pool id of the metadata as JSON, -1 when empty
+        self._extras = array("i")  # pool id of the values that fit no column, as JSON
+        self._columns = {}  # key -> array of pool ids of a string field, -1 when unset
+        self._labels = {}
+        self._layouts = {}
+        self._layout_list = []
+        self._strings = {}
+        self._pool = []
+        self._pool_size = 0
+        self._pool_offsets = array("q", [0])
+
+    def __len__(self):
+        return len(self._video_flags)
+
+    def _string(self, value, intern=True):
+        string_id = self._strings.get(value) if intern else None
+        if string_id is None:
+            data = value.encode("utf-8")
+            string_id = len(self._pool)
+            self._pool.append(data)
+            self._pool_size += len(data)
+            self._pool_offsets.append(self._pool_size)
+            if intern:
+                self._strings[value] = string_id
+        return string_id
+
+    def _intern_all(self, table, values):
+        """Give the next ids to the values not yet in table, in order. Returns table."""
+        for value in values:
+            if value not in table:
+                table[value] = len(table)
+        return table
+
+    def add_videos(self, videos):
+        for video in videos:
+            self.add_video(video)
+
+    def add_video(self, video):
+        info = {}
+        annotations = None
+        for key, value in video.items():
+            if key == "annotations" and (isinstance(value, list) or hasattr(value, "to_list")):
+                info[key] = None
+                annotations = _annotation_list(value)
+            else:
+                info[key] = value
+        self._video_info.append(self._string(json.dumps(info, ensure_ascii=False), intern=False))
+        self._video_flags.append(annotations is not None)
+        if annotations:
+            self._add_annotations(annotations)
+        self._video_starts.append(len(self._positions))
+
+    def _add_annotations(self, annotations):
+        """Append the annotations of one video, one field (column) at a time."""
+        if not all(isinstance(annotation, dict) for annotation in annotations):
+            raise CacheError("Annotations must be objects")
+        n = len(annotations)
+        row = len(self._positions)
+        layouts = [tuple(annotation) for annotation in annotations]
+        self._intern_all(self._layouts, dict.fromkeys(layouts))
+        layout_ids = [self._layouts[layout] for layout in layouts]
+        if len(self._layouts) > 0xFFFF:
+            raise CacheError("Too many distinct annotation layouts")
+        keys = {}
+        for keys_of_layout in {self._layout_keys(layout_id) for layout_id in set(layout_ids)}:
+            keys.update(dict.fromkeys(keys_of_layout))
+        positions = labels = metadata = None
+        extras = {}  # index -> {key: value} of values that fit no column
+        missing = _MISSING
+        for key in keys:
+            values = [annotation.get(key, missing) for annotation in annotations]
+            if key == "position":
+                positions = [value if type(value) is int else 0 for value in values]
+                fits = [type(value) is int for value in values]
+            elif key == "label":
+                label_ids = self._intern_all(self._labels, _distinct_strings(values))
+                labels = [label_ids[value] if type(value) is str else -1 for value in values]
+                fits = [type(value) is str for value in values]
+            elif key == "metadata":
+                metadata = [self._string(json.dumps(value, ensure_ascii=False), intern=False)
+                            if type(value) is dict and value else -1 for value in values]
+                fits = [type(value) is dict for value in values]
+            else:
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._columns[key] = array("i", [-1]) * row
+                for value in _distinct_strings(values):
+                    if value not in self._strings:
+                        self._string(value)
+                string_ids = self._strings
+                column.extend([string_ids[value] if type(value) is str else -1 for value in values])
+                fits = [type(value) is str for value in values]
+            if not all(fits):
+                for i, fit in enumerate(fits):
+                    if not fit and values[i] is not missing:
+                        extras.setdefault(i, {})[key] = values[i]
+        for column in self._columns.values():
+            if len(column) == row:
+                column.extend(array("i", [-1]) * n)
+        self._positions.extend(positions if positions is not None else [0] * n)
+        self._label_ids.extend(labels if labels is not None else [-1] * n)
+        self._layout_ids.extend(layout_ids)
+        self._metadata.extend(metadata if metadata is not None else [-1] * n)
+        self._extras.extend([self._string(json.dumps(extras[i], ensure_ascii=False), intern=False)
+                             if i in extras else -1 for i in range(n)])
+
+    def _layout_keys(self, layout_id):
+        if len(self._layout_list) < len(self._layouts):
+            self._layout_list = list(self._layouts)
+        return self._layout_list[layout_id]
+
+    def _sections(self):
+        sections = [
+            ("video_starts", self._video_starts, "<i8"),
+            ("video_info", self._video_info, "<i4"),
+            ("video_flags", self._video_flags, "i1"),
+            ("positions", self._positions, "<i8"),
+            ("label_ids", self._label_ids, "<i4"),
+            ("layout_ids", self._layout_ids, "<u2"),
+            ("metadata", self._metadata, "<i4"),
+            ("extras", self._extras, "<i4"),
+            ("pool_offsets", self._pool_offsets, "<i8"),
+        ]
+        sections += [("column:" + key, column, "<i4") for key, column in self._columns.items()]
+        return [(name, np.asarray(values, dtype=dtype)) for name, values, dtype in sections]
+
+    def chunks(self, fields, signature):
+        """Yield the bytes of the cache file, for a JSON file of the given (size, mtime_ns)."""
+        arrays = self._sections()
+        layout = {}
+        offset = 0
+        for name, values in arrays:
+            layout[name] = [offset, values.dtype.str, len(values)]
+            offset += -(-values.nbytes // _ALIGN) * _ALIGN
+        layout["pool"] = [offset, "|u1", self._pool_size]
+        header = json.dumps({
+            "version": CACHE_VERSION,
+            "size": signature[0],
+            "mtime_ns": signature[1],
+            "fields": fields,
+            "labels": list(self._labels),
+            "layouts": [list(keys) for keys in self._layouts],
+            "columns": list(self._columns),
+            "sections": layout,
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(_MAGIC) + 8 + len(header)) % _ALIGN)
+        yield _MAGIC + struct.pack("<Q", len(header)) + header
+        for _, values in arrays:
+            data = values.tobytes()
+            yield data + b"\0" * (-len(data) % _ALIGN)
+        yield from self._pool
+
+    def write(self, path, fields, signature):
+        write_atomic(path, self.chunks(fields, signature), binary=True)
+
+
+def write_cache(file_path, osl_data):
+    """Build and write the cache of an OSL file from its loaded data."""
+    builder = CacheBuilder()
+    builder.add_videos(osl_data.get("videos", []))
+    fields = {key: (None if key == "videos" else value) for key, value in osl_data.items()}
+    builder.write(cache_path(file_path), fields, file_signature(file_path))
+
+
+class CacheReader:
+    """Contents of a cache file, read in memory; the arrays are views of the bytes read."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = f.read()
+        try:
+            if self._data[:len(_MAGIC)] != _MAGIC:
+                raise CacheError("Not an OSL cache file")
+            start = len(_MAGIC) + 8
+            (header_size,) = struct.unpack("<Q", self._data[len(_MAGIC):start])
+            self.header = json.loads(self._data[start:start + header_size])
+            if self.header.get("version") != CACHE_VERSION:
+                raise CacheError("Unsupported cache version")
+            base = start + header_size
+            self._arrays = {}
+            for name, (offset, dtype, count) in self.header["sections"].items():
+                if base + offset + count * np.dtype(dtype).itemsize > len(self._data):
+                    raise CacheError("Truncated cache file")
+                self._arrays[name] = np.frombuffer(self._data, dtype=dtype, count=count, offset=base + offset)
+        except (CacheError, ValueError, KeyError, TypeError, struct.error) as e:
+            self._arrays = {}
+            self._data = b""
+            raise CacheError(f"Invalid cache file {path}: {e}") from e
+        self.labels = self.header["labels"]
+        self.layouts = [tuple(keys) for keys in self.header["layouts"]]
+        self._pool_offsets = self._arrays["pool_offsets"]
+        self._pool = self._arrays["pool"]
+        self._strings = {}
+
+    def matches(self, file_path):
+        """True if the cache was built from the current version of file_path."""
+        try:
+            size, mtime_ns = file_signature(file_path)
+        except OSError:
+            return False
+        return self.header["size"] == size and self.header["mtime_ns"] == mtime_ns
+
+    @property
+    def fields(self):
+        return self.header["fields"]
+
+    def string(self, string_id):
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = int(self._pool_offsets[string_id]), int(self._pool_offsets[string_id + 1])
+            value = self._strings[string_id] = self._pool[start:end].tobytes().decode("utf-8")
+        return value
+
+    def _json(self, string_id):
+        # Not memoized: the decoded objects are mutable
+        start, end = int(self._pool_offsets[string_id]), int(self._pool_offsets[string_id + 1])
+        return json.loads(self._pool[start:end].tobytes())
+
+    def videos(self):
+        """Yield the videos of the cache, with CachedAnnotations."""
+        starts = self._arrays["video_starts"].tolist()
+        flags = self._arrays["video_flags"].tolist()
+        for i, info_id in enumerate(self._arrays["video_info"].tolist()):
+            video = self._json(info_id)
+            if flags[i]:
+                video["annotations"] = CachedAnnotations(self, starts[i], starts[i + 1])
+            yield video
+
+    def label_counter(self, start, end):
+        label_ids = self._arrays["label_ids"][start:end]
+        if len(label_ids) and label_ids.min() < 0:
+            return None  # Some labels are not plain strings, count them from the annotations
+        counts = np.bincount(label_ids, minlength=len(self.labels))
+        return Counter({self.labels[label_id]: int(counts[label_id]) for label_id in np.flatnonzero(counts)})
+
+    def annotations(self, start, end):
+        """Return the annotations of rows start to end as a list of dicts."""
+        arrays = self._arrays
+        positions = arrays["positions"][start:end].tolist()
+        label_ids = arrays["label_ids"][start:end].tolist()
+        layout_ids = arrays["layout_ids"][start:end].tolist()
+        metadata = arrays["metadata"][start:end].tolist()
+        extras = arrays["extras"][start:end].tolist()
+        columns = {key: arrays["column:" + key][start:end].tolist() for key in self.header["columns"]}
+        labels, layouts, string = self.labels, self.layouts, self.string
+        annotations = []
+        for i in range(end - start):
+            extra = self._json(extras[i]) if extras[i] >= 0 else None
+            annotation = {}
+            for key in layouts[layout_ids[i]]:
+                if extra is not None and key in extra:
+                    annotation[key] = extra[key]
+                elif key == "position":
+                    annotation[key] = positions[i]
+                elif key == "label":
+                    annotation[key] = labels[label_ids[i]]
+                elif key == "metadata":
+                    annotation[key] = self._json(metadata[i]) if metadata[i] >= 0 else {}
+                else:
+                    annotation[key] = string(columns[key][i])
+            annotations.append(annotation)
+        return annotations
+
+
+def open_cache(file_path):
+    """Return a CacheReader for the up-to-date cache of file_path, or None."""
+    path = cache_path(file_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        reader = CacheReader(path)
+    except (OSError, CacheError):
+        return None
+    return reader if reader.matches(file_path) else None
+
+
+class CachedAnnotations(LazyAnnotations):
+    """Annotation list of a video read from a cache file on first use."""
+
+    def __init__(self, reader, start, end):
+        super().__init__(reader, start, end, end - start, None)
+
+    def raw_json(self):
+        return None
+
+    def _parse(self):
+        return self.source.annotations(self.start, self.end)
+
+    def label_counter(self):
+        if self._items is None:
+            counts = self.source.label_counter(self.start, self.end)
+            if counts is not None:
+                return counts
+        return Counter(ann.get("label") for ann in self.load() if isinstance(ann, dict))
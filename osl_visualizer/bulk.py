@@ -0,0 +1,335 @@
+"""Edits applied to the events of many videos at once.
+
+A ``BulkEdit`` is one operation over the events of a set of videos:
+
+- ``rename``: give the events of one or more labels another label (renaming
+  several labels to the same label merges them);
+- ``delete``: remove every event of some labels;
+- ``shift``: add an offset, in ms, to every position (for a video that was
+  re-encoded with a lead-in);
+- ``rescale``: convert positions computed at one frame rate to another,
+  ``position * from_fps / to_fps``.
+
+apply_edit() runs the operation as one pass per video: on whole columns of
+an AnnotationStore, or on a NumPy copy of the positions or labels of a plain
+list. It returns what it changed, as plain JSON values, so revert_edit() can
+restore it and the journal can record it. affected_videos() tells which
+videos an edit changes, and by how many events, from the label counts only,
+so lazily loaded annotations are not parsed to preview an edit.
+
+Renaming a label over every video that uses it, to a name that is not used
+yet, is done in the LabelTable shared by the compact stores of the project
+when all those videos use one: the label keeps its id and only its name
+changes, so no event is rewritten and the change to undo is the rename
+itself.
+
+Positions are clipped at 0. Shifting and rescaling keep the order of the
+events of a video, so annotation lists stay sorted. Runs without Qt.
+"""
+import numpy as np
+
+from stats import label_counts
+
+RENAME = "rename"
+DELETE = "delete"
+SHIFT = "shift"
+RESCALE = "rescale"
+OPERATIONS = (RENAME, DELETE, SHIFT, RESCALE)
+
+
+class BulkEdit:
+    """One dataset-wide operation and its parameters."""
+
+    def __init__(self, op, labels=(), target=None, offset=0, from_fps=None, to_fps=None):
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown bulk operation '{op}'")
+        if op in (RENAME, DELETE) and not labels:
+            raise ValueError(f"The {op} operation needs at least one label")
+        if op == RENAME and not target:
+            raise ValueError("The rename operation needs a new label")
+        if op == RESCALE and not (from_fps and to_fps and from_fps > 0 and to_fps > 0):
+            raise ValueError("The rescale operation needs two positive frame rates")
+        self.op = op
+        self.labels = tuple(labels)
+        self.target = target
+        self.offset = int(offset)
+        self.from_fps = from_fps
+        self.to_fps = to_fps
+
+    @property
+    def text(self):
+        """Name of the edit, for the undo menu."""
+        if self.op == RENAME:
+            return "Merge Labels" if len(self.labels) > 1 else "Rename Label"
+        return {DELETE: "Delete Events", SHIFT: "Shift Events", RESCALE: "Rescale Events"}[self.op]
+
+    def sources(self):
+        """Labels whose events the edit changes (empty for shift and rescale)."""
+        if self.op == RENAME:
+            return set(self.labels) - {self.target}
+        if self.op == DELETE:
+            return set(self.labels)
+        return set()
+
+    def is_noop(self):
+        if self.op == SHIFT:
+            return self.offset == 0
+        if self.op == RESCALE:
+            return self.from_fps == self.to_fps
+        return not self.sources()
+
+    def new_positions(self, positions):
+        """Return the positions (an int64 array) after a shift or a rescale."""
+        if self.op == SHIFT:
+            result = positions + self.offset
+        else:
+            result = np.rint(positions * (self.from_fps / self.to_fps)).astype(np.int64)
+        return np.maximum(result, 0)
+
+    def new_labels(self, labels):
+        """Return the project labels after the edit, or None if they do not change.
+
+        A rename replaces the first renamed label with the new label (unless
+        the project already has it) and drops the others. Deleting events
+        keeps the labels, they can be removed separately.
+        """
+        if self.op != RENAME:
+            return None
+        sources = self.sources()
+        result = []
+        for label in labels:
+            if label not in sources:
+                result.append(label)
+            elif self.target not in labels and self.target not in result:
+                result.append(self.target)
+        if self.target not in result:
+            result.append(self.target)
+        return result if result != labels else None
+
+    def to_record(self):
+        """The edit as a JSON object, for the journal."""
+        record = {"op": self.op}
+        if self.op in (RENAME, DELETE):
+            record["labels"] = list(self.labels)
+        if self.op == RENAME:
+            record["target"] = self.target
+        if self.op == SHIFT:
+            record["offset"] = self.offset
+        if self.op == RESCALE:
+            record["from_fps"] = self.from_fps
+            record["to_fps"] = self.to_fps
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["op"], record.get("labels", ()), record.get("target"), record.get("offset", 0),
+                   record.get("from_fps"), record.get("to_fps"))
+
+    def __repr__(self):
+        return f"BulkEdit({self.to_record()!r})"
+
+
+def _default_annotations(video):
+    return video.setdefault("annotations", [])
+
+
+def affected_videos(videos, edit, label_counts_of=None):
+    """Return ``(video, n_events)`` for every video of videos that edit changes.
+
+    label_counts_of(video) gives the Counter of the labels of a video (the
+    video model statistics keep them); by default it is computed with
+    stats.label_counts(), which answers lazily loaded videos from their index.
+    """
+    if edit.is_noop():
+        return []
+    if label_counts_of is None:
+        label_counts_of = lambda video: label_counts(video.get("annotations", []))
+    sources = edit.sources()
+    result = []
+    for video in videos:
+        counts = label_counts_of(video)
+        if sources:
+            n_events = sum(counts.get(label, 0) for label in sources)
+        else:
+            n_events = sum(counts.values())
+        if n_events:
+            result.append((video, n_events))
+    return result
+
+
+def count_affected(videos, edit, label_counts_of=None):
+    """Return ``(n_events, n_videos)`` changed by edit, to preview it."""
+    affected = affected_videos(videos, edit, label_counts_of)
+    return sum(n_events for _, n_events in affected), len(affected)
+
+
+# ---------- One video ----------
+
+def _is_store(annotations):
+    return hasattr(annotations, "label_ids")
+
+
+def _positions(annotations):
+    if _is_store(annotations):
+        return annotations.positions()
+    return np.fromiter((ann["position"] for ann in annotations), dtype=np.int64, count=len(annotations))
+
+
+def _label_rows(annotations, labels):
+    """Rows of the annotations whose label is in labels, as an int64 array."""
+    if _is_store(annotations):
+        table = annotations.labels
+        ids = [table.ids[label] for label in labels if label in table]
+        return np.flatnonzero(np.isin(annotations.label_ids(), ids))
+    mask = np.fromiter((ann.get("label") in labels for ann in annotations), dtype=bool, count=len(annotations))
+    return np.flatnonzero(mask)
+
+
+def _plain(annotation):
+    return annotation.to_dict() if hasattr(annotation, "to_dict") else annotation
+
+
+def _apply(annotations, edit):
+    """Apply edit to one annotation list and return the change to revert it, or None."""
+    if edit.op in (SHIFT, RESCALE):
+        positions = _positions(annotations)
+        new = edit.new_positions(positions)
+        changed = np.flatnonzero(new != positions)
+        if not len(changed):
+            return None
+        if _is_store(annotations):
+            annotations.set_positions(new)
+        else:
+            for row, position in zip(changed.tolist(), new[changed].tolist()):
+                annotations[row]["position"] = position
+        return {"positions": positions.tolist()}
+
+    rows = _label_rows(annotations, edit.sources())
+    if not len(rows):
+        return None
+    rows_list = rows.tolist()
+    if edit.op == RENAME:
+        if _is_store(annotations):
+            names = annotations.labels.names
+            old_labels = [names[label_id] for label_id in annotations.label_ids()[rows].tolist()]
+            annotations.relabel_rows(rows, edit.target)
+        else:
+            old_labels = []
+            for row in rows_list:
+                old_labels.append(annotations[row]["label"])
+                annotations[row]["label"] = edit.target
+        return {"rows": rows_list, "labels": old_labels}
+
+    removed = [_plain(annotations[row]) for row in rows_list]
+    if _is_store(annotations):
+        annotations.delete_rows(rows)
+    else:
+        keep = np.ones(len(annotations), dtype=bool)
+        keep[rows] = False
+        annotations[:] = [ann for ann, kept in zip(annotations, keep.tolist()) if kept]
+    return {"rows": rows_list, "annotations": removed}
+
+
+def _revert(annotations, change):
+    """Undo the change returned by _apply() for the same annotation list."""
+    if "renamed" in change:
+        # Every event labeled new was labeled old: no event had the new label before the rename
+        old, new = change["renamed"]
+        if _is_store(annotations) and new in annotations.labels and old not in annotations.labels:
+            annotations.labels.rename(new, old)  # Also reverts the other stores sharing the table
+            return
+        rows = _label_rows(annotations, {new})
+        if _is_store(annotations):
+            annotations.relabel_rows(rows, old)
+        else:
+            for row in rows.tolist():
+                annotations[row]["label"] = old
+    elif "positions" in change:
+        old = np.asarray(change["positions"], dtype=np.int64)
+        if _is_store(annotations):
+            annotations.set_positions(old)
+        else:
+            for ann, position in zip(annotations, change["positions"]):
+                ann["position"] = position
+    elif "labels" in change:
+        if _is_store(annotations):
+            rows = np.asarray(change["rows"], dtype=np.int64)
+            labels = np.asarray(change["labels"], dtype=object)
+            for label in set(change["labels"]):
+                annotations.relabel_rows(rows[labels == label], label)
+        else:
+            for row, label in zip(change["rows"], change["labels"]):
+                annotations[row]["label"] = label
+    elif _is_store(annotations):
+        # Rows are ascending, so inserting in order puts every event back at its row
+        for row, annotation in zip(change["rows"], change["annotations"]):
+            annotations.insert(row, annotation)
+    else:
+        restored = []
+        kept = iter(list(annotations))
+        for row, annotation in zip(change["rows"], change["annotations"]):
+            while len(restored) < row:
+                restored.append(next(kept))
+            restored.append(annotation)
+        restored.extend(kept)
+        annotations[:] = restored
+
+
+# ---------- Many videos ----------
+
+def _renames_in_table(edit, table, lists):
+    """True if edit is the rename of one label of table to a new name, and every list is a store of table."""
+    if edit.op != RENAME or len(edit.sources()) != 1:
+        return False
+    (source,) = edit.sources()
+    return (bool(lists) and source in table and edit.target not in table
+            and all(getattr(annotations, "labels", None) is table for annotations in lists))
+
+
+def apply_edit(videos, edit, annotations_of=None, table=None):
+    """Apply edit to every video of videos and return ``[(video, change)]`` for the videos it changed.
+
+    annotations_of(video) returns the annotation list to edit (by default
+    ``video["annotations"]``); the viewer passes one that parses lazily
+    loaded annotations first. Pass the videos of affected_videos() to avoid
+    parsing videos the edit does not change.
+
+    table is the LabelTable of the project, given only when videos holds
+    every video using the renamed label: a rename is then done in the table
+    if all of them are compact stores sharing it.
+    """
+    annotations_of = annotations_of or _default_annotations
+    changes = []
+    if edit.is_noop():
+        return changes
+    lists = [(video, annotations_of(video)) for video in videos]
+    if table is not None and _renames_in_table(edit, table, [annotations for _, annotations in lists]):
+        (source,) = edit.sources()
+        label_id = table.ids[source]
+        renamed = [video for video, annotations in lists if (annotations.label_ids() == label_id).any()]
+        table.rename(source, edit.target)
+        return [(video, {"renamed": [source, edit.target]}) for video in renamed]
+    for video, annotations in lists:
+        change = _apply(annotations, edit)
+        if change is not None:
+            changes.append((video, change))
+    return changes
+
+
+def renamed_label(changes):
+    """``(old, new)`` if changes are a rename done in the LabelTable, else None."""
+    if changes and all("renamed" in change for _, change in changes):
+        return tuple(changes[0][1]["renamed"])
+    return None
+
+
+def revert_edit(changes, annotations_of=None):
+    """Undo the changes returned by apply_edit()."""
+    annotations_of = annotations_of or _default_annotations
+    for video, change in reversed(changes):
+        _revert(annotations_of(video), change)
+
+
+def change_size(change):
+    """Number of events recorded in a change, to estimate its memory."""
+    return len(change.get("positions") or change.get("rows") or ())
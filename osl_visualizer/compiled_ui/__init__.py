@@ -0,0 +1 @@
+"""Python modules generated from ui/*.ui by tools/compile_ui.py. Do not edit."""
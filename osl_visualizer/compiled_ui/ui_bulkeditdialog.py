@@ -0,0 +1,117 @@
+# Form implementation generated from reading ui file 'ui/bulkeditdialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_BulkEditDialog(object):
+    def setupUi(self, BulkEditDialog):
+        BulkEditDialog.setObjectName("BulkEditDialog")
+        self.verticalLayout = QtWidgets.QVBoxLayout(BulkEditDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.operationLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.operationLabel.setObjectName("operationLabel")
+        self.verticalLayout.addWidget(self.operationLabel)
+        self.operationComboBox = QtWidgets.QComboBox(parent=BulkEditDialog)
+        self.operationComboBox.setObjectName("operationComboBox")
+        self.operationComboBox.addItem("")
+        self.operationComboBox.addItem("")
+        self.operationComboBox.addItem("")
+        self.operationComboBox.addItem("")
+        self.verticalLayout.addWidget(self.operationComboBox)
+        self.labelsLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.labelsLabel.setObjectName("labelsLabel")
+        self.verticalLayout.addWidget(self.labelsLabel)
+        self.labelsListWidget = QtWidgets.QListWidget(parent=BulkEditDialog)
+        self.labelsListWidget.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.labelsListWidget.setObjectName("labelsListWidget")
+        self.verticalLayout.addWidget(self.labelsListWidget)
+        self.targetLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.targetLabel.setObjectName("targetLabel")
+        self.verticalLayout.addWidget(self.targetLabel)
+        self.targetComboBox = QtWidgets.QComboBox(parent=BulkEditDialog)
+        self.targetComboBox.setEditable(True)
+        self.targetComboBox.setObjectName("targetComboBox")
+        self.verticalLayout.addWidget(self.targetComboBox)
+        self.offsetLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.offsetLabel.setObjectName("offsetLabel")
+        self.verticalLayout.addWidget(self.offsetLabel)
+        self.offsetSpinBox = QtWidgets.QSpinBox(parent=BulkEditDialog)
+        self.offsetSpinBox.setMinimum(-86400000)
+        self.offsetSpinBox.setMaximum(86400000)
+        self.offsetSpinBox.setSingleStep(100)
+        self.offsetSpinBox.setObjectName("offsetSpinBox")
+        self.verticalLayout.addWidget(self.offsetSpinBox)
+        self.fpsLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.fpsLabel.setObjectName("fpsLabel")
+        self.verticalLayout.addWidget(self.fpsLabel)
+        self.fpsLayout = QtWidgets.QHBoxLayout()
+        self.fpsLayout.setObjectName("fpsLayout")
+        self.fromFpsSpinBox = QtWidgets.QDoubleSpinBox(parent=BulkEditDialog)
+        self.fromFpsSpinBox.setDecimals(3)
+        self.fromFpsSpinBox.setMinimum(1.0)
+        self.fromFpsSpinBox.setMaximum(1000.0)
+        self.fromFpsSpinBox.setProperty("value", 25.0)
+        self.fromFpsSpinBox.setObjectName("fromFpsSpinBox")
+        self.fpsLayout.addWidget(self.fromFpsSpinBox)
+        self.toFpsSpinBox = QtWidgets.QDoubleSpinBox(parent=BulkEditDialog)
+        self.toFpsSpinBox.setDecimals(3)
+        self.toFpsSpinBox.setMinimum(1.0)
+        self.toFpsSpinBox.setMaximum(1000.0)
+        self.toFpsSpinBox.setProperty("value", 25.0)
+        self.toFpsSpinBox.setObjectName("toFpsSpinBox")
+        self.fpsLayout.addWidget(self.toFpsSpinBox)
+        self.verticalLayout.addLayout(self.fpsLayout)
+        self.scopeLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.scopeLabel.setObjectName("scopeLabel")
+        self.verticalLayout.addWidget(self.scopeLabel)
+        self.scopeComboBox = QtWidgets.QComboBox(parent=BulkEditDialog)
+        self.scopeComboBox.setObjectName("scopeComboBox")
+        self.scopeComboBox.addItem("")
+        self.scopeComboBox.addItem("")
+        self.scopeComboBox.addItem("")
+        self.verticalLayout.addWidget(self.scopeComboBox)
+        self.previewLabel = QtWidgets.QLabel(parent=BulkEditDialog)
+        self.previewLabel.setText("")
+        self.previewLabel.setObjectName("previewLabel")
+        self.verticalLayout.addWidget(self.previewLabel)
+        self.hboxlayout = QtWidgets.QHBoxLayout()
+        self.hboxlayout.setObjectName("hboxlayout")
+        self.okButton = QtWidgets.QPushButton(parent=BulkEditDialog)
+        self.okButton.setObjectName("okButton")
+        self.hboxlayout.addWidget(self.okButton)
+        self.cancelButton = QtWidgets.QPushButton(parent=BulkEditDialog)
+        self.cancelButton.setObjectName("cancelButton")
+        self.hboxlayout.addWidget(self.cancelButton)
+        self.verticalLayout.addLayout(self.hboxlayout)
+
+        self.retranslateUi(BulkEditDialog)
+        QtCore.QMetaObject.connectSlotsByName(BulkEditDialog)
+
+    def retranslateUi(self, BulkEditDialog):
+        _translate = QtCore.QCoreApplication.translate
+        BulkEditDialog.setWindowTitle(_translate("BulkEditDialog", "Bulk Edit"))
+        self.operationLabel.setText(_translate("BulkEditDialog", "Operation:"))
+        self.operationComboBox.setItemText(0, _translate("BulkEditDialog", "Rename or merge labels"))
+        self.operationComboBox.setItemText(1, _translate("BulkEditDialog", "Delete all events of labels"))
+        self.operationComboBox.setItemText(2, _translate("BulkEditDialog", "Shift positions by an offset"))
+        self.operationComboBox.setItemText(3, _translate("BulkEditDialog", "Rescale positions between frame rates"))
+        self.labelsLabel.setText(_translate("BulkEditDialog", "Labels:"))
+        self.targetLabel.setText(_translate("BulkEditDialog", "New Label:"))
+        self.offsetLabel.setText(_translate("BulkEditDialog", "Offset (ms, negative to move events earlier):"))
+        self.fpsLabel.setText(_translate("BulkEditDialog", "Positions computed at (fps) / actual frame rate (fps):"))
+        self.scopeLabel.setText(_translate("BulkEditDialog", "Apply To:"))
+        self.scopeComboBox.setItemText(0, _translate("BulkEditDialog", "All videos"))
+        self.scopeComboBox.setItemText(1, _translate("BulkEditDialog", "Videos shown in the filtered list"))
+        self.scopeComboBox.setItemText(2, _translate("BulkEditDialog", "Selected video"))
+        self.okButton.setText(_translate("BulkEditDialog", "Apply"))
+        self.cancelButton.setText(_translate("BulkEditDialog", "Cancel"))
+
+
+FORM_CLASS = Ui_BulkEditDialog
+UI_SHA1 = "5bdc9f161a62be8a371b7e68dd019b962f8dc03e"
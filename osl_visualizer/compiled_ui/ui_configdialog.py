@@ -0,0 +1,91 @@
+# Form implementation generated from reading ui file 'ui/configdialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_ConfigDialog(object):
+    def setupUi(self, ConfigDialog):
+        ConfigDialog.setObjectName("ConfigDialog")
+        self.verticalLayout = QtWidgets.QVBoxLayout(ConfigDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.jumpBeforeLabel = QtWidgets.QLabel(parent=ConfigDialog)
+        self.jumpBeforeLabel.setObjectName("jumpBeforeLabel")
+        self.verticalLayout.addWidget(self.jumpBeforeLabel)
+        self.jumpBeforeSpinBox = QtWidgets.QSpinBox(parent=ConfigDialog)
+        self.jumpBeforeSpinBox.setMaximum(60000)
+        self.jumpBeforeSpinBox.setSingleStep(100)
+        self.jumpBeforeSpinBox.setProperty("value", 5000)
+        self.jumpBeforeSpinBox.setObjectName("jumpBeforeSpinBox")
+        self.verticalLayout.addWidget(self.jumpBeforeSpinBox)
+        self.compactAnnotationsCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.compactAnnotationsCheckBox.setObjectName("compactAnnotationsCheckBox")
+        self.verticalLayout.addWidget(self.compactAnnotationsCheckBox)
+        self.compactJsonCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.compactJsonCheckBox.setObjectName("compactJsonCheckBox")
+        self.verticalLayout.addWidget(self.compactJsonCheckBox)
+        self.showThumbnailsCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.showThumbnailsCheckBox.setObjectName("showThumbnailsCheckBox")
+        self.verticalLayout.addWidget(self.showThumbnailsCheckBox)
+        self.lazyLoadingCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.lazyLoadingCheckBox.setObjectName("lazyLoadingCheckBox")
+        self.verticalLayout.addWidget(self.lazyLoadingCheckBox)
+        self.binaryCacheCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.binaryCacheCheckBox.setObjectName("binaryCacheCheckBox")
+        self.verticalLayout.addWidget(self.binaryCacheCheckBox)
+        self.scrubPreviewCheckBox = QtWidgets.QCheckBox(parent=ConfigDialog)
+        self.scrubPreviewCheckBox.setObjectName("scrubPreviewCheckBox")
+        self.verticalLayout.addWidget(self.scrubPreviewCheckBox)
+        self.playerPoolLabel = QtWidgets.QLabel(parent=ConfigDialog)
+        self.playerPoolLabel.setObjectName("playerPoolLabel")
+        self.verticalLayout.addWidget(self.playerPoolLabel)
+        self.playerPoolSpinBox = QtWidgets.QSpinBox(parent=ConfigDialog)
+        self.playerPoolSpinBox.setMaximum(8)
+        self.playerPoolSpinBox.setProperty("value", 2)
+        self.playerPoolSpinBox.setObjectName("playerPoolSpinBox")
+        self.verticalLayout.addWidget(self.playerPoolSpinBox)
+        self.undoMemoryLabel = QtWidgets.QLabel(parent=ConfigDialog)
+        self.undoMemoryLabel.setObjectName("undoMemoryLabel")
+        self.verticalLayout.addWidget(self.undoMemoryLabel)
+        self.undoMemorySpinBox = QtWidgets.QSpinBox(parent=ConfigDialog)
+        self.undoMemorySpinBox.setMinimum(1)
+        self.undoMemorySpinBox.setMaximum(4096)
+        self.undoMemorySpinBox.setProperty("value", 64)
+        self.undoMemorySpinBox.setObjectName("undoMemorySpinBox")
+        self.verticalLayout.addWidget(self.undoMemorySpinBox)
+        self.hboxlayout = QtWidgets.QHBoxLayout()
+        self.hboxlayout.setObjectName("hboxlayout")
+        self.okButton = QtWidgets.QPushButton(parent=ConfigDialog)
+        self.okButton.setObjectName("okButton")
+        self.hboxlayout.addWidget(self.okButton)
+        self.cancelButton = QtWidgets.QPushButton(parent=ConfigDialog)
+        self.cancelButton.setObjectName("cancelButton")
+        self.hboxlayout.addWidget(self.cancelButton)
+        self.verticalLayout.addLayout(self.hboxlayout)
+
+        self.retranslateUi(ConfigDialog)
+        QtCore.QMetaObject.connectSlotsByName(ConfigDialog)
+
+    def retranslateUi(self, ConfigDialog):
+        _translate = QtCore.QCoreApplication.translate
+        ConfigDialog.setWindowTitle(_translate("ConfigDialog", "Settings"))
+        self.jumpBeforeLabel.setText(_translate("ConfigDialog", "Jump Before Annotation (ms):"))
+        self.compactAnnotationsCheckBox.setText(_translate("ConfigDialog", "Compact annotation storage (lower memory, applies on next load)"))
+        self.compactJsonCheckBox.setText(_translate("ConfigDialog", "Save compact JSON (no indentation, smaller and faster)"))
+        self.showThumbnailsCheckBox.setText(_translate("ConfigDialog", "Show frame thumbnails in the annotation list (requires OpenCV)"))
+        self.lazyLoadingCheckBox.setText(_translate("ConfigDialog", "Lazy loading (parse annotations only when a video is opened, applies on next load)"))
+        self.binaryCacheCheckBox.setText(_translate("ConfigDialog", "Keep a binary cache next to project files for fast reopening"))
+        self.scrubPreviewCheckBox.setText(_translate("ConfigDialog", "Fast approximate preview while dragging on the timeline (exact position on release)"))
+        self.playerPoolLabel.setText(_translate("ConfigDialog", "Neighbouring Videos Kept Open (0 disables preloading):"))
+        self.undoMemoryLabel.setText(_translate("ConfigDialog", "Undo History Memory (MB):"))
+        self.okButton.setText(_translate("ConfigDialog", "OK"))
+        self.cancelButton.setText(_translate("ConfigDialog", "Cancel"))
+
+
+FORM_CLASS = Ui_ConfigDialog
+UI_SHA1 = "2de346c1851f625f1c03fbed5e1df0b77532b693"
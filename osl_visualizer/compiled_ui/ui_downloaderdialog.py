@@ -0,0 +1,102 @@
+# Form implementation generated from reading ui file 'ui/downloaderdialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_DownloaderDialog(object):
+    def setupUi(self, DownloaderDialog):
+        DownloaderDialog.setObjectName("DownloaderDialog")
+        self.verticalLayout = QtWidgets.QVBoxLayout(DownloaderDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.apiKeyLayout = QtWidgets.QHBoxLayout()
+        self.apiKeyLayout.setObjectName("apiKeyLayout")
+        self.labelApiKey = QtWidgets.QLabel(parent=DownloaderDialog)
+        self.labelApiKey.setObjectName("labelApiKey")
+        self.apiKeyLayout.addWidget(self.labelApiKey)
+        self.lineEditApiKey = QtWidgets.QLineEdit(parent=DownloaderDialog)
+        self.lineEditApiKey.setObjectName("lineEditApiKey")
+        self.apiKeyLayout.addWidget(self.lineEditApiKey)
+        self.verticalLayout.addLayout(self.apiKeyLayout)
+        self.urlLayout = QtWidgets.QHBoxLayout()
+        self.urlLayout.setObjectName("urlLayout")
+        self.labelUrl = QtWidgets.QLabel(parent=DownloaderDialog)
+        self.labelUrl.setObjectName("labelUrl")
+        self.urlLayout.addWidget(self.labelUrl)
+        self.lineEditUrl = QtWidgets.QLineEdit(parent=DownloaderDialog)
+        self.lineEditUrl.setObjectName("lineEditUrl")
+        self.urlLayout.addWidget(self.lineEditUrl)
+        self.verticalLayout.addLayout(self.urlLayout)
+        self.outputDirLayout = QtWidgets.QHBoxLayout()
+        self.outputDirLayout.setObjectName("outputDirLayout")
+        self.labelOutputDir = QtWidgets.QLabel(parent=DownloaderDialog)
+        self.labelOutputDir.setObjectName("labelOutputDir")
+        self.outputDirLayout.addWidget(self.labelOutputDir)
+        self.lineEditOutputDir = QtWidgets.QLineEdit(parent=DownloaderDialog)
+        self.lineEditOutputDir.setObjectName("lineEditOutputDir")
+        self.outputDirLayout.addWidget(self.lineEditOutputDir)
+        self.verticalLayout.addLayout(self.outputDirLayout)
+        self.checkBoxDryRun = QtWidgets.QCheckBox(parent=DownloaderDialog)
+        self.checkBoxDryRun.setChecked(True)
+        self.checkBoxDryRun.setObjectName("checkBoxDryRun")
+        self.verticalLayout.addWidget(self.checkBoxDryRun)
+        self.workersLayout = QtWidgets.QHBoxLayout()
+        self.workersLayout.setObjectName("workersLayout")
+        self.labelWorkers = QtWidgets.QLabel(parent=DownloaderDialog)
+        self.labelWorkers.setObjectName("labelWorkers")
+        self.workersLayout.addWidget(self.labelWorkers)
+        self.spinBoxWorkers = QtWidgets.QSpinBox(parent=DownloaderDialog)
+        self.spinBoxWorkers.setMinimum(1)
+        self.spinBoxWorkers.setMaximum(32)
+        self.spinBoxWorkers.setProperty("value", 8)
+        self.spinBoxWorkers.setObjectName("spinBoxWorkers")
+        self.workersLayout.addWidget(self.spinBoxWorkers)
+        self.verticalLayout.addLayout(self.workersLayout)
+        self.progressBar = QtWidgets.QProgressBar(parent=DownloaderDialog)
+        self.progressBar.setObjectName("progressBar")
+        self.verticalLayout.addWidget(self.progressBar)
+        self.labelStatus = QtWidgets.QLabel(parent=DownloaderDialog)
+        self.labelStatus.setObjectName("labelStatus")
+        self.verticalLayout.addWidget(self.labelStatus)
+        self.textEditLog = QtWidgets.QTextEdit(parent=DownloaderDialog)
+        self.textEditLog.setReadOnly(True)
+        self.textEditLog.setMaximumHeight(150)
+        self.textEditLog.setObjectName("textEditLog")
+        self.verticalLayout.addWidget(self.textEditLog)
+        self.buttonLayout = QtWidgets.QHBoxLayout()
+        self.buttonLayout.setObjectName("buttonLayout")
+        self.pushButtonDownload = QtWidgets.QPushButton(parent=DownloaderDialog)
+        self.pushButtonDownload.setObjectName("pushButtonDownload")
+        self.buttonLayout.addWidget(self.pushButtonDownload)
+        self.pushButtonCancel = QtWidgets.QPushButton(parent=DownloaderDialog)
+        self.pushButtonCancel.setObjectName("pushButtonCancel")
+        self.buttonLayout.addWidget(self.pushButtonCancel)
+        self.pushButtonExit = QtWidgets.QPushButton(parent=DownloaderDialog)
+        self.pushButtonExit.setObjectName("pushButtonExit")
+        self.buttonLayout.addWidget(self.pushButtonExit)
+        self.verticalLayout.addLayout(self.buttonLayout)
+
+        self.retranslateUi(DownloaderDialog)
+        QtCore.QMetaObject.connectSlotsByName(DownloaderDialog)
+
+    def retranslateUi(self, DownloaderDialog):
+        _translate = QtCore.QCoreApplication.translate
+        DownloaderDialog.setWindowTitle(_translate("DownloaderDialog", "Download OSL Dataset from HuggingFace"))
+        self.labelApiKey.setText(_translate("DownloaderDialog", "HuggingFace API Key:"))
+        self.labelUrl.setText(_translate("DownloaderDialog", "OSL JSON URL:"))
+        self.labelOutputDir.setText(_translate("DownloaderDialog", "Output Directory:"))
+        self.lineEditOutputDir.setText(_translate("DownloaderDialog", "downloaded_data"))
+        self.checkBoxDryRun.setText(_translate("DownloaderDialog", "Dry run (only estimate required space, do not download)"))
+        self.labelWorkers.setText(_translate("DownloaderDialog", "Parallel downloads:"))
+        self.pushButtonDownload.setText(_translate("DownloaderDialog", "Start Download"))
+        self.pushButtonCancel.setText(_translate("DownloaderDialog", "Cancel"))
+        self.pushButtonExit.setText(_translate("DownloaderDialog", "Exit Tool"))
+
+
+FORM_CLASS = Ui_DownloaderDialog
+UI_SHA1 = "d7ffdf27a2be5db2a34437463a11128d78956516"
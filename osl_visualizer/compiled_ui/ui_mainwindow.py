@@ -0,0 +1,328 @@
+# Form implementation generated from reading ui file 'ui/mainwindow.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(894, 667)
+        self.centralwidget = QtWidgets.QWidget(parent=MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.mainSplitter = QtWidgets.QSplitter(parent=self.centralwidget)
+        self.mainSplitter.setOrientation(QtCore.Qt.Orientation.Horizontal)
+        self.mainSplitter.setObjectName("mainSplitter")
+        self.leftPanel = QtWidgets.QWidget(parent=self.mainSplitter)
+        self.leftPanel.setObjectName("leftPanel")
+        self.leftLayout = QtWidgets.QVBoxLayout(self.leftPanel)
+        self.leftLayout.setContentsMargins(0, 0, 0, 0)
+        self.leftLayout.setObjectName("leftLayout")
+        self.loadButton = QtWidgets.QPushButton(parent=self.leftPanel)
+        self.loadButton.setObjectName("loadButton")
+        self.leftLayout.addWidget(self.loadButton)
+        self.saveButton = QtWidgets.QPushButton(parent=self.leftPanel)
+        self.saveButton.setObjectName("saveButton")
+        self.leftLayout.addWidget(self.saveButton)
+        self.saveAsButton = QtWidgets.QPushButton(parent=self.leftPanel)
+        self.saveAsButton.setObjectName("saveAsButton")
+        self.leftLayout.addWidget(self.saveAsButton)
+        self.gamesLabel = QtWidgets.QLabel(parent=self.leftPanel)
+        self.gamesLabel.setObjectName("gamesLabel")
+        self.leftLayout.addWidget(self.gamesLabel)
+        self.videoFilterLineEdit = QtWidgets.QLineEdit(parent=self.leftPanel)
+        self.videoFilterLineEdit.setClearButtonEnabled(True)
+        self.videoFilterLineEdit.setObjectName("videoFilterLineEdit")
+        self.leftLayout.addWidget(self.videoFilterLineEdit)
+        self.videoListView = QtWidgets.QListView(parent=self.leftPanel)
+        self.videoListView.setObjectName("videoListView")
+        self.leftLayout.addWidget(self.videoListView)
+        self.addVideoButton = QtWidgets.QPushButton(parent=self.leftPanel)
+        self.addVideoButton.setObjectName("addVideoButton")
+        self.leftLayout.addWidget(self.addVideoButton)
+        self.removeVideoButton = QtWidgets.QPushButton(parent=self.leftPanel)
+        self.removeVideoButton.setObjectName("removeVideoButton")
+        self.leftLayout.addWidget(self.removeVideoButton)
+        self.centerPanel = QtWidgets.QWidget(parent=self.mainSplitter)
+        self.centerPanel.setObjectName("centerPanel")
+        self.centerLayout = QtWidgets.QVBoxLayout(self.centerPanel)
+        self.centerLayout.setContentsMargins(0, 0, 0, 0)
+        self.centerLayout.setObjectName("centerLayout")
+        self.videoWidgetPlaceholder = QtWidgets.QWidget(parent=self.centerPanel)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.videoWidgetPlaceholder.sizePolicy().hasHeightForWidth())
+        self.videoWidgetPlaceholder.setSizePolicy(sizePolicy)
+        self.videoWidgetPlaceholder.setMinimumSize(QtCore.QSize(320, 240))
+        self.videoWidgetPlaceholder.setObjectName("videoWidgetPlaceholder")
+        self.centerLayout.addWidget(self.videoWidgetPlaceholder)
+        self.sliderLayout = QtWidgets.QHBoxLayout()
+        self.sliderLayout.setObjectName("sliderLayout")
+        self.timeline = EventTimeline(parent=self.centerPanel)
+        self.timeline.setObjectName("timeline")
+        self.sliderLayout.addWidget(self.timeline)
+        self.timeLabel = QtWidgets.QLabel(parent=self.centerPanel)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.timeLabel.sizePolicy().hasHeightForWidth())
+        self.timeLabel.setSizePolicy(sizePolicy)
+        self.timeLabel.setObjectName("timeLabel")
+        self.sliderLayout.addWidget(self.timeLabel)
+        self.centerLayout.addLayout(self.sliderLayout)
+        self.gridLayout_3 = QtWidgets.QGridLayout()
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.forward5sButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.forward5sButton.setObjectName("forward5sButton")
+        self.gridLayout_3.addWidget(self.forward5sButton, 0, 6, 1, 1)
+        self.backFrameButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.backFrameButton.setObjectName("backFrameButton")
+        self.gridLayout_3.addWidget(self.backFrameButton, 0, 2, 1, 1)
+        self.playButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.playButton.setObjectName("playButton")
+        self.gridLayout_3.addWidget(self.playButton, 0, 3, 1, 1)
+        self.back5sButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.back5sButton.setObjectName("back5sButton")
+        self.gridLayout_3.addWidget(self.back5sButton, 0, 0, 1, 1)
+        self.back1sButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.back1sButton.setObjectName("back1sButton")
+        self.gridLayout_3.addWidget(self.back1sButton, 0, 1, 1, 1)
+        self.forward1sButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.forward1sButton.setObjectName("forward1sButton")
+        self.gridLayout_3.addWidget(self.forward1sButton, 0, 5, 1, 1)
+        self.forwardFrameButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.forwardFrameButton.setObjectName("forwardFrameButton")
+        self.gridLayout_3.addWidget(self.forwardFrameButton, 0, 4, 1, 1)
+        self.speedSlow8Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedSlow8Button.setObjectName("speedSlow8Button")
+        self.gridLayout_3.addWidget(self.speedSlow8Button, 1, 0, 1, 1)
+        self.speedSlow4Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedSlow4Button.setObjectName("speedSlow4Button")
+        self.gridLayout_3.addWidget(self.speedSlow4Button, 1, 1, 1, 1)
+        self.speedSlow2Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedSlow2Button.setObjectName("speedSlow2Button")
+        self.gridLayout_3.addWidget(self.speedSlow2Button, 1, 2, 1, 1)
+        self.speedNormalButton = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedNormalButton.setObjectName("speedNormalButton")
+        self.gridLayout_3.addWidget(self.speedNormalButton, 1, 3, 1, 1)
+        self.speedFast2Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedFast2Button.setObjectName("speedFast2Button")
+        self.gridLayout_3.addWidget(self.speedFast2Button, 1, 4, 1, 1)
+        self.speedFast4Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedFast4Button.setObjectName("speedFast4Button")
+        self.gridLayout_3.addWidget(self.speedFast4Button, 1, 5, 1, 1)
+        self.speedFast8Button = QtWidgets.QPushButton(parent=self.centerPanel)
+        self.speedFast8Button.setObjectName("speedFast8Button")
+        self.gridLayout_3.addWidget(self.speedFast8Button, 1, 6, 1, 1)
+        self.centerLayout.addLayout(self.gridLayout_3)
+        self.rightPanel = QtWidgets.QWidget(parent=self.mainSplitter)
+        self.rightPanel.setObjectName("rightPanel")
+        self.rightLayout = QtWidgets.QVBoxLayout(self.rightPanel)
+        self.rightLayout.setContentsMargins(0, 0, 0, 0)
+        self.rightLayout.setObjectName("rightLayout")
+        self.annotationsLabel = QtWidgets.QLabel(parent=self.rightPanel)
+        self.annotationsLabel.setObjectName("annotationsLabel")
+        self.rightLayout.addWidget(self.annotationsLabel)
+        self.annotationListView = QtWidgets.QListView(parent=self.rightPanel)
+        self.annotationListView.setObjectName("annotationListView")
+        self.rightLayout.addWidget(self.annotationListView)
+        self.editLabel = QtWidgets.QLabel(parent=self.rightPanel)
+        self.editLabel.setObjectName("editLabel")
+        self.rightLayout.addWidget(self.editLabel)
+        self.gridLayout_2 = QtWidgets.QGridLayout()
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.addLabelButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.addLabelButton.setObjectName("addLabelButton")
+        self.gridLayout_2.addWidget(self.addLabelButton, 2, 0, 1, 1)
+        self.labelLabel = QtWidgets.QLabel(parent=self.rightPanel)
+        self.labelLabel.setObjectName("labelLabel")
+        self.gridLayout_2.addWidget(self.labelLabel, 1, 0, 1, 1)
+        self.setTimeToVideoButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.setTimeToVideoButton.setObjectName("setTimeToVideoButton")
+        self.gridLayout_2.addWidget(self.setTimeToVideoButton, 0, 0, 1, 2)
+        self.labelComboBox = QtWidgets.QComboBox(parent=self.rightPanel)
+        self.labelComboBox.setObjectName("labelComboBox")
+        self.gridLayout_2.addWidget(self.labelComboBox, 1, 1, 1, 1)
+        self.removeLabelButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.removeLabelButton.setObjectName("removeLabelButton")
+        self.gridLayout_2.addWidget(self.removeLabelButton, 2, 1, 1, 1)
+        self.renameLabelButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.renameLabelButton.setObjectName("renameLabelButton")
+        self.gridLayout_2.addWidget(self.renameLabelButton, 3, 0, 1, 2)
+        self.rightLayout.addLayout(self.gridLayout_2)
+        self.metadataLabel = QtWidgets.QLabel(parent=self.rightPanel)
+        self.metadataLabel.setObjectName("metadataLabel")
+        self.rightLayout.addWidget(self.metadataLabel)
+        self.metadataTextEdit = QtWidgets.QTextEdit(parent=self.rightPanel)
+        self.metadataTextEdit.setReadOnly(True)
+        self.metadataTextEdit.setObjectName("metadataTextEdit")
+        self.rightLayout.addWidget(self.metadataTextEdit)
+        self.navButtonsLayout = QtWidgets.QHBoxLayout()
+        self.navButtonsLayout.setObjectName("navButtonsLayout")
+        self.prevButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.prevButton.setObjectName("prevButton")
+        self.navButtonsLayout.addWidget(self.prevButton)
+        self.nextButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.nextButton.setObjectName("nextButton")
+        self.navButtonsLayout.addWidget(self.nextButton)
+        self.rightLayout.addLayout(self.navButtonsLayout)
+        self.addAnnotationButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.addAnnotationButton.setObjectName("addAnnotationButton")
+        self.rightLayout.addWidget(self.addAnnotationButton)
+        self.removeAnnotationButton = QtWidgets.QPushButton(parent=self.rightPanel)
+        self.removeAnnotationButton.setObjectName("removeAnnotationButton")
+        self.rightLayout.addWidget(self.removeAnnotationButton)
+        self.gridLayout.addWidget(self.mainSplitter, 0, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menuBar = QtWidgets.QMenuBar(parent=MainWindow)
+        self.menuBar.setGeometry(QtCore.QRect(0, 0, 894, 37))
+        self.menuBar.setObjectName("menuBar")
+        self.menuFile = QtWidgets.QMenu(parent=self.menuBar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuEdit = QtWidgets.QMenu(parent=self.menuBar)
+        self.menuEdit.setObjectName("menuEdit")
+        self.menuView = QtWidgets.QMenu(parent=self.menuBar)
+        self.menuView.setObjectName("menuView")
+        MainWindow.setMenuBar(self.menuBar)
+        self.statusBar = QtWidgets.QStatusBar(parent=MainWindow)
+        self.statusBar.setObjectName("statusBar")
+        MainWindow.setStatusBar(self.statusBar)
+        self.statisticsDock = QtWidgets.QDockWidget(parent=MainWindow)
+        self.statisticsDock.setObjectName("statisticsDock")
+        self.statisticsDockContents = QtWidgets.QWidget()
+        self.statisticsDockContents.setObjectName("statisticsDockContents")
+        self.statisticsLayout = QtWidgets.QVBoxLayout(self.statisticsDockContents)
+        self.statisticsLayout.setObjectName("statisticsLayout")
+        self.statisticsSummaryLabel = QtWidgets.QLabel(parent=self.statisticsDockContents)
+        self.statisticsSummaryLabel.setWordWrap(True)
+        self.statisticsSummaryLabel.setObjectName("statisticsSummaryLabel")
+        self.statisticsLayout.addWidget(self.statisticsSummaryLabel)
+        self.statisticsVideoLabel = QtWidgets.QLabel(parent=self.statisticsDockContents)
+        self.statisticsVideoLabel.setWordWrap(True)
+        self.statisticsVideoLabel.setObjectName("statisticsVideoLabel")
+        self.statisticsLayout.addWidget(self.statisticsVideoLabel)
+        self.labelStatisticsView = QtWidgets.QTableView(parent=self.statisticsDockContents)
+        self.labelStatisticsView.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.labelStatisticsView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.labelStatisticsView.setObjectName("labelStatisticsView")
+        self.statisticsLayout.addWidget(self.labelStatisticsView)
+        self.statisticsDock.setWidget(self.statisticsDockContents)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.statisticsDock)
+        self.actionLoad_OSL_Json = QtGui.QAction(parent=MainWindow)
+        self.actionLoad_OSL_Json.setObjectName("actionLoad_OSL_Json")
+        self.actionOpen_OSL_Folder = QtGui.QAction(parent=MainWindow)
+        self.actionOpen_OSL_Folder.setObjectName("actionOpen_OSL_Folder")
+        self.actionSave_As_OSL_JSON = QtGui.QAction(parent=MainWindow)
+        self.actionSave_As_OSL_JSON.setObjectName("actionSave_As_OSL_JSON")
+        self.actionExport_Annotations = QtGui.QAction(parent=MainWindow)
+        self.actionExport_Annotations.setObjectName("actionExport_Annotations")
+        self.actionSave_OSL_JSON = QtGui.QAction(parent=MainWindow)
+        self.actionSave_OSL_JSON.setObjectName("actionSave_OSL_JSON")
+        self.actionOpen_Settings = QtGui.QAction(parent=MainWindow)
+        self.actionOpen_Settings.setObjectName("actionOpen_Settings")
+        self.actionDataset_Downloader = QtGui.QAction(parent=MainWindow)
+        self.actionDataset_Downloader.setObjectName("actionDataset_Downloader")
+        self.actionUndo = QtGui.QAction(parent=MainWindow)
+        self.actionUndo.setEnabled(False)
+        self.actionUndo.setObjectName("actionUndo")
+        self.actionRedo = QtGui.QAction(parent=MainWindow)
+        self.actionRedo.setEnabled(False)
+        self.actionRedo.setObjectName("actionRedo")
+        self.actionBulk_Edit = QtGui.QAction(parent=MainWindow)
+        self.actionBulk_Edit.setObjectName("actionBulk_Edit")
+        self.actionCollect_Telemetry = QtGui.QAction(parent=MainWindow)
+        self.actionCollect_Telemetry.setCheckable(True)
+        self.actionCollect_Telemetry.setObjectName("actionCollect_Telemetry")
+        self.actionDump_Telemetry = QtGui.QAction(parent=MainWindow)
+        self.actionDump_Telemetry.setObjectName("actionDump_Telemetry")
+        self.menuFile.addAction(self.actionLoad_OSL_Json)
+        self.menuFile.addAction(self.actionOpen_OSL_Folder)
+        self.menuFile.addAction(self.actionSave_OSL_JSON)
+        self.menuFile.addAction(self.actionSave_As_OSL_JSON)
+        self.menuFile.addAction(self.actionExport_Annotations)
+        self.menuFile.addAction(self.actionOpen_Settings)
+        self.menuFile.addAction(self.actionDataset_Downloader)
+        self.menuEdit.addAction(self.actionUndo)
+        self.menuEdit.addAction(self.actionRedo)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.actionBulk_Edit)
+        self.menuView.addAction(self.actionCollect_Telemetry)
+        self.menuView.addAction(self.actionDump_Telemetry)
+        self.menuView.addSeparator()
+        self.menuBar.addAction(self.menuFile.menuAction())
+        self.menuBar.addAction(self.menuEdit.menuAction())
+        self.menuBar.addAction(self.menuView.menuAction())
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "OSL Dataset Visualizer"))
+        self.loadButton.setText(_translate("MainWindow", "Load OSL JSON"))
+        self.saveButton.setText(_translate("MainWindow", "Save OSL JSON"))
+        self.saveAsButton.setText(_translate("MainWindow", "Save As OSL JSON"))
+        self.gamesLabel.setText(_translate("MainWindow", "Games"))
+        self.videoFilterLineEdit.setPlaceholderText(_translate("MainWindow", "Filter by path or label:\"Red card\""))
+        self.addVideoButton.setText(_translate("MainWindow", "Add Video"))
+        self.removeVideoButton.setText(_translate("MainWindow", "Remove Video"))
+        self.videoWidgetPlaceholder.setStyleSheet(_translate("MainWindow", "background: #111;"))
+        self.timeLabel.setText(_translate("MainWindow", "00:00 / 00:00"))
+        self.forward5sButton.setText(_translate("MainWindow", "5s >>"))
+        self.backFrameButton.setText(_translate("MainWindow", "<|"))
+        self.playButton.setText(_translate("MainWindow", "Play"))
+        self.back5sButton.setText(_translate("MainWindow", "<< 5s"))
+        self.back1sButton.setText(_translate("MainWindow", "< 1s"))
+        self.forward1sButton.setText(_translate("MainWindow", "1s >"))
+        self.forwardFrameButton.setText(_translate("MainWindow", "|>"))
+        self.speedSlow8Button.setText(_translate("MainWindow", "1/8x"))
+        self.speedSlow4Button.setText(_translate("MainWindow", "1/4x"))
+        self.speedSlow2Button.setText(_translate("MainWindow", "1/2x"))
+        self.speedNormalButton.setText(_translate("MainWindow", "1x"))
+        self.speedFast2Button.setText(_translate("MainWindow", "2x"))
+        self.speedFast4Button.setText(_translate("MainWindow", "4x"))
+        self.speedFast8Button.setText(_translate("MainWindow", "8x"))
+        self.annotationsLabel.setText(_translate("MainWindow", "Annotations"))
+        self.editLabel.setText(_translate("MainWindow", "Edit Annotation"))
+        self.addLabelButton.setText(_translate("MainWindow", "Add Label"))
+        self.labelLabel.setText(_translate("MainWindow", "Label"))
+        self.setTimeToVideoButton.setText(_translate("MainWindow", "Set to Current Video Time"))
+        self.removeLabelButton.setText(_translate("MainWindow", "Remove Label"))
+        self.renameLabelButton.setText(_translate("MainWindow", "Rename Label in All Videos"))
+        self.metadataLabel.setText(_translate("MainWindow", "Metadata"))
+        self.prevButton.setText(_translate("MainWindow", "Previous"))
+        self.nextButton.setText(_translate("MainWindow", "Next"))
+        self.addAnnotationButton.setText(_translate("MainWindow", "Add Annotation at Current Time"))
+        self.removeAnnotationButton.setText(_translate("MainWindow", "Remove Selected Annotation"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuEdit.setTitle(_translate("MainWindow", "Edit"))
+        self.menuView.setTitle(_translate("MainWindow", "View"))
+        self.statisticsDock.setWindowTitle(_translate("MainWindow", "Statistics"))
+        self.actionLoad_OSL_Json.setText(_translate("MainWindow", "Load OSL JSON"))
+        self.actionOpen_OSL_Folder.setText(_translate("MainWindow", "Open OSL Folder"))
+        self.actionOpen_OSL_Folder.setToolTip(_translate("MainWindow", "Open all the OSL JSON files of a folder as one project"))
+        self.actionSave_As_OSL_JSON.setText(_translate("MainWindow", "Save As OSL JSON"))
+        self.actionExport_Annotations.setText(_translate("MainWindow", "Export Annotations..."))
+        self.actionExport_Annotations.setToolTip(_translate("MainWindow", "Export one row per event to a CSV or JSON lines file"))
+        self.actionSave_OSL_JSON.setText(_translate("MainWindow", "Save OSL JSON"))
+        self.actionOpen_Settings.setText(_translate("MainWindow", "Open Settings"))
+        self.actionDataset_Downloader.setText(_translate("MainWindow", "Dataset Downloader"))
+        self.actionUndo.setText(_translate("MainWindow", "Undo"))
+        self.actionRedo.setText(_translate("MainWindow", "Redo"))
+        self.actionBulk_Edit.setText(_translate("MainWindow", "Bulk Edit..."))
+        self.actionBulk_Edit.setToolTip(_translate("MainWindow", "Rename, merge or delete labels, or shift or rescale positions, across many videos at once"))
+        self.actionCollect_Telemetry.setText(_translate("MainWindow", "Collect Telemetry"))
+        self.actionDump_Telemetry.setText(_translate("MainWindow", "Save Telemetry..."))
+from timeline import EventTimeline
+
+
+FORM_CLASS = Ui_MainWindow
+UI_SHA1 = "6eff7aa9bc92c1ec6189131ac228c8f503ec17e4"
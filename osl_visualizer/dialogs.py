@@ -1,15 +1,29 @@
 import os
-import json
-from PyQt6 import uic
 from PyQt6.QtWidgets import QDialog, QMessageBox
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSettings
 
+from downloader import (ParallelDownloader, DownloadItem, DownloadCancelled, parse_hf_url, resolve_url,
+                        repo_video_paths, human_size, human_duration)
+from osl_io import load_osl_json
+from bulk import BulkEdit, RENAME, DELETE, SHIFT, RESCALE
+from uiloader import load_ui
+
 class ConfigDialog(QDialog):
     """Configuration dialog for user settings."""
-    def __init__(self, parent=None, current_jump_before=5000):
+    def __init__(self, parent=None, current_jump_before=5000, compact_annotations=False, compact_json=False,
+                 show_thumbnails=True, lazy_loading=False, binary_cache=False, undo_memory_mb=64,
+                 scrub_preview=True, player_pool_size=2):
         super().__init__(parent)
-        uic.loadUi(os.path.join(os.path.dirname(__file__), "ui/configdialog.ui"), self)
+        load_ui(self, "configdialog")
         self.jumpBeforeSpinBox.setValue(current_jump_before)
+        self.compactAnnotationsCheckBox.setChecked(compact_annotations)
+        self.compactJsonCheckBox.setChecked(compact_json)
+        self.showThumbnailsCheckBox.setChecked(show_thumbnails)
+        self.lazyLoadingCheckBox.setChecked(lazy_loading)
+        self.binaryCacheCheckBox.setChecked(binary_cache)
+        self.undoMemorySpinBox.setValue(undo_memory_mb)
+        self.scrubPreviewCheckBox.setChecked(scrub_preview)
+        self.playerPoolSpinBox.setValue(player_pool_size)
         self.okButton.clicked.connect(self.accept)
         self.cancelButton.clicked.connect(self.reject)
 
@@ -17,170 +31,219 @@ class ConfigDialog(QDialog):
         """Return the currently set 'jump before annotation' value."""
         return self.jumpBeforeSpinBox.value()
 
+    def get_compact_annotations(self):
+        """Return whether annotations should be kept in compact array storage."""
+        return self.compactAnnotationsCheckBox.isChecked()
+
+    def get_compact_json(self):
+        """Return whether OSL JSON files should be saved without indentation."""
+        return self.compactJsonCheckBox.isChecked()
+
+    def get_show_thumbnails(self):
+        """Return whether frame thumbnails should be shown in the annotation list."""
+        return self.showThumbnailsCheckBox.isChecked()
+
+    def get_lazy_loading(self):
+        """Return whether annotations should only be parsed when their video is opened."""
+        return self.lazyLoadingCheckBox.isChecked()
+
+    def get_binary_cache(self):
+        """Return whether a binary cache should be kept next to project files."""
+        return self.binaryCacheCheckBox.isChecked()
+
+    def get_undo_memory_mb(self):
+        """Return the memory budget of the undo history, in megabytes."""
+        return self.undoMemorySpinBox.value()
+
+    def get_scrub_preview(self):
+        """Return whether dragging on the timeline should show a fast approximate preview."""
+        return self.scrubPreviewCheckBox.isChecked()
+
+    def get_player_pool_size(self):
+        """Return the number of neighbouring videos to keep open for instant switching."""
+        return self.playerPoolSpinBox.value()
+
+
+class BulkEditDialog(QDialog):
+    """Dialog choosing a bulk edit and the videos it applies to, with a live count of the affected events.
+
+    preview(edit, scope) returns ``(n_events, n_videos)`` for an edit and
+    one of the SCOPE_* values.
+    """
+    SCOPE_ALL, SCOPE_FILTERED, SCOPE_SELECTED = range(3)
+    OPERATIONS = (RENAME, DELETE, SHIFT, RESCALE)  # In the order of operationComboBox
+
+    def __init__(self, parent=None, labels=(), preview=None, scope=SCOPE_ALL):
+        super().__init__(parent)
+        load_ui(self, "bulkeditdialog")
+        self.preview = preview
+        self.labelsListWidget.addItems(labels)
+        self.targetComboBox.addItems(labels)
+        self.targetComboBox.setCurrentText("")
+        self.scopeComboBox.setCurrentIndex(scope)
+        self.operationComboBox.currentIndexChanged.connect(self._update_fields)
+        self.labelsListWidget.itemSelectionChanged.connect(self._update_preview)
+        self.targetComboBox.currentTextChanged.connect(self._update_preview)
+        self.offsetSpinBox.valueChanged.connect(self._update_preview)
+        self.fromFpsSpinBox.valueChanged.connect(self._update_preview)
+        self.toFpsSpinBox.valueChanged.connect(self._update_preview)
+        self.scopeComboBox.currentIndexChanged.connect(self._update_preview)
+        self.okButton.clicked.connect(self.accept)
+        self.cancelButton.clicked.connect(self.reject)
+        self._update_fields()
+
+    def get_operation(self):
+        return self.OPERATIONS[self.operationComboBox.currentIndex()]
+
+    def get_scope(self):
+        """Return the videos to edit, as one of the SCOPE_* values."""
+        return self.scopeComboBox.currentIndex()
+
+    def get_edit(self):
+        """Return the BulkEdit described by the dialog, or None while it is incomplete."""
+        labels = [item.text() for item in self.labelsListWidget.selectedItems()]
+        try:
+            return BulkEdit(self.get_operation(), labels, self.targetComboBox.currentText().strip(),
+                            self.offsetSpinBox.value(), self.fromFpsSpinBox.value(), self.toFpsSpinBox.value())
+        except ValueError:
+            return None
+
+    def _update_fields(self):
+        op = self.get_operation()
+        for widget in (self.labelsLabel, self.labelsListWidget):
+            widget.setVisible(op in (RENAME, DELETE))
+        for widget in (self.targetLabel, self.targetComboBox):
+            widget.setVisible(op == RENAME)
+        for widget in (self.offsetLabel, self.offsetSpinBox):
+            widget.setVisible(op == SHIFT)
+        for widget in (self.fpsLabel, self.fromFpsSpinBox, self.toFpsSpinBox):
+            widget.setVisible(op == RESCALE)
+        self._update_preview()
+
+    def _update_preview(self):
+        edit = self.get_edit()
+        if edit is None or self.preview is None:
+            self.previewLabel.setText("")
+            self.okButton.setEnabled(edit is not None)
+            return
+        n_events, n_videos = self.preview(edit, self.get_scope())
+        self.previewLabel.setText(f"{n_events} events in {n_videos} videos will be changed.")
+        self.okButton.setEnabled(n_events > 0)
+
 
 class DownloadThread(QThread):
     log_signal = pyqtSignal(str)
     progress_signal = pyqtSignal(int)
+    status_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
     cancelled_signal = pyqtSignal()
 
-    def __init__(self, api_key, osl_json_url, output_dir, dry_run=True):
+    def __init__(self, api_key, osl_json_url, output_dir, dry_run=True, max_workers=8):
         super().__init__()
         self.api_key = api_key
         self.osl_json_url = osl_json_url
         self.output_dir = output_dir
         self.dry_run = dry_run
+        self.downloader = ParallelDownloader(token=api_key, max_workers=max_workers)
         self._stop_requested = False
 
     def request_stop(self):
         self._stop_requested = True
+        self.downloader.cancel()
 
     def run(self):
         try:
-            from huggingface_hub import hf_hub_download, HfApi, HfFolder
-            from urllib.parse import urlparse
-
-            HfFolder.save_token(self.api_key)
-
-            def human_size(num):
-                for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                    if num < 1024.0:
-                        return f"{num:3.1f} {unit}"
-                    num /= 1024.0
-                return f"{num:.1f} PB"
-
-            def fix_hf_url(hf_url):
-                return hf_url.replace("/blob/", "/resolve/")
-
-            def parse_hf_url(hf_url):
-                url = fix_hf_url(hf_url)
-                parsed = urlparse(url)
-                parts = parsed.path.strip("/").split("/")
-                if "datasets" in parts:
-                    datasets_idx = parts.index("datasets")
-                    parts = parts[datasets_idx + 1:]
-                if len(parts) < 4 or parts[2] != "resolve":
-                    raise ValueError(f"URL does not look like a valid HuggingFace dataset file URL: {url}")
-                repo_id = f"{parts[0]}/{parts[1]}"
-                revision = parts[3]
-                path_in_repo = "/".join(parts[4:])
-                return repo_id, revision, path_in_repo
-
-            def get_json_repo_folder(path_in_repo):
-                folder = os.path.dirname(path_in_repo)
-                return folder if folder and folder != '.' else ''
-
-            repo_id, revision, path_in_repo = parse_hf_url(self.osl_json_url)
-            repo_json_folder = get_json_repo_folder(path_in_repo)
+            endpoint, repo_id, revision, path_in_repo = parse_hf_url(self.osl_json_url)
 
             self.log_signal.emit(f"⬇️ Downloading OSL JSON from {repo_id}@{revision}: {path_in_repo}")
             os.makedirs(self.output_dir, exist_ok=True)
-            hf_json_path = hf_hub_download(
-                repo_id=repo_id,
-                repo_type="dataset",
-                filename=path_in_repo,
-                revision=revision,
-                local_dir=self.output_dir,
-                local_dir_use_symlinks=False,
-            )
-            self.log_signal.emit(f"  → Saved as {hf_json_path}")
+            json_item = DownloadItem(resolve_url(endpoint, repo_id, revision, path_in_repo),
+                                     os.path.join(self.output_dir, path_in_repo))
+            self.downloader.download(json_item)
+            self.log_signal.emit(f"  → Saved as {json_item.dest}")
 
             # Load OSL JSON and extract video paths
-            with open(hf_json_path, "r") as f:
-                osl = json.load(f)
-            videos = osl.get("videos", [])
-            self.log_signal.emit(f"Found {len(videos)} video files to download.")
-
-            repo_paths = [video["path"].lstrip("/") for video in videos]
-            def repo_full_path(rel_path):
-                if repo_json_folder and not rel_path.startswith(repo_json_folder + "/"):
-                    return os.path.join(repo_json_folder, rel_path)
-                return rel_path
-            allow_patterns = sorted(set([repo_full_path(rel_path) for rel_path in repo_paths]))
+            repo_paths = repo_video_paths(load_osl_json(json_item.dest), path_in_repo)
+            self.log_signal.emit(f"Found {len(repo_paths)} video files to download.")
+            items = [DownloadItem(resolve_url(endpoint, repo_id, revision, path), os.path.join(self.output_dir, path),
+                                  name=path)
+                     for path in repo_paths]
+
+            # Sizes are needed for the dry run, to skip complete files and for byte-level progress
+            self.status_signal.emit("Fetching file sizes…")
+            missing = self.downloader.fetch_sizes(items)
+            items = [item for item in items if item.size is not None]
+            total_size = sum(item.size for item in items)
+            on_disk = sum(item.size for item in items
+                          if os.path.exists(item.dest) and os.path.getsize(item.dest) == item.size)
 
             if self.dry_run:
-                # DRY RUN LOGIC
-                try:
-                    api = HfApi()
-                    info_obj = api.repo_info(repo_id=repo_id, revision=revision, repo_type="dataset", files_metadata=True)
-                    size_lookup = {f.rfilename: f.size for f in info_obj.siblings}
-                except Exception as e:
-                    self.log_signal.emit(f"[ERROR] Could not fetch repo files info: {e}")
-                    size_lookup = {}
-
-                total_size = 0
-                missing_files = []
-                for full_repo_path in allow_patterns:
-                    size = size_lookup.get(full_repo_path)
-                    if size is not None:
-                        size_str = human_size(size)
-                        total_size += size
-                    else:
-                        size_str = "Not found"
-                        missing_files.append(full_repo_path)
-                    self.log_signal.emit(f"[DRY RUN] {full_repo_path}: {size_str}")
+                for item in items:
+                    self.log_signal.emit(f"[DRY RUN] {item.name}: {human_size(item.size)}")
+                for item in missing:
+                    self.log_signal.emit(f"[DRY RUN] {item.name}: Not found")
                 self.log_signal.emit("-" * 48)
                 self.log_signal.emit(f"Total estimated storage needed: {human_size(total_size)}")
-                if missing_files:
-                    self.log_signal.emit(f"WARNING: {len(missing_files)} files not found in repo!")
-                    for f in missing_files:
-                        self.log_signal.emit(f"  - {f}")
+                if on_disk:
+                    self.log_signal.emit(f"Already downloaded: {human_size(on_disk)}")
+            if missing:
+                self.log_signal.emit(f"WARNING: {len(missing)} files not found in repo!")
+                for item in missing:
+                    self.log_signal.emit(f"  - {item.name}")
+            if self.dry_run:
                 self.progress_signal.emit(100)
+                self.status_signal.emit("")
                 self.finished_signal.emit()
                 return
 
-            # Download logic (per-file, so we can check for cancel)
-            total_files = len(allow_patterns)
-            downloaded = 0
-
-            def progress_callback():
-                nonlocal downloaded
-                downloaded += 1
-                percent = int((downloaded / total_files) * 100)
-                self.progress_signal.emit(percent)
-
-            self.log_signal.emit(f"Downloading {len(allow_patterns)} files using hf_hub_download...")
+            self.log_signal.emit(f"Downloading {len(items)} files ({human_size(total_size)}, "
+                                 f"{self.downloader.max_workers} at a time)...")
             self.progress_signal.emit(0)
-
-            for allow_pattern in allow_patterns:
-                if self._stop_requested:
-                    self.log_signal.emit("Download cancelled by user.")
-                    self.finished_signal.emit()
-                    return
-                self.log_signal.emit(f"Downloading {allow_pattern}...")
-                hf_hub_download(
-                    repo_id=repo_id,
-                    repo_type="dataset",
-                    filename=allow_pattern,
-                    revision=revision,
-                    local_dir=self.output_dir,
-                    local_dir_use_symlinks=False,
-                )
-                progress_callback()
-
+            failed = self.downloader.download_all(items, self._on_progress, self._on_file_done)
+            if failed:
+                self.log_signal.emit(f"WARNING: {len(failed)} files could not be downloaded, start the download "
+                                     "again to retry them.")
+        except DownloadCancelled:
+            self.log_signal.emit("Download cancelled by user. Partial files are kept and will be resumed next time.")
         except Exception as e:
             self.log_signal.emit(f"[ERROR] {e}")
 
         self.finished_signal.emit()
 
+    def _on_progress(self, done, total, rate, eta):
+        self.progress_signal.emit(int(done * 100 / total) if total else 100)
+        status = f"{human_size(done)} / {human_size(total)} — {human_size(rate)}/s"
+        if eta is not None:
+            status += f", {human_duration(eta)} left"
+        self.status_signal.emit(status)
+
+    def _on_file_done(self, item, error):
+        if error is None:
+            self.log_signal.emit(f"{'Already downloaded' if item.skipped else 'Downloaded'} {item.name}")
+        else:
+            self.log_signal.emit(f"[ERROR] {item.name}: {error}")
+
 
 class DownloaderDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        uic.loadUi(os.path.join(os.path.dirname(__file__), "ui", "downloaderdialog.ui"), self)
+        load_ui(self, "downloaderdialog")
 
         settings = QSettings("OSLActionSpotting", "DatasetAnnotationTool/Downloader")
         self.hf_api_key = settings.value("hf_api_key", "")
         self.url = settings.value("url", "")
         self.output_dir = settings.value("output_dir", "")
+        self.max_workers = settings.value("max_workers", 8, type=int)
 
         self.lineEditApiKey.setText(self.hf_api_key)
         self.lineEditUrl.setText(self.url)
         self.lineEditOutputDir.setText(self.output_dir)
+        self.spinBoxWorkers.setValue(self.max_workers)
 
         self.lineEditApiKey.textChanged.connect(lambda: setattr(self, 'hf_api_key', self.lineEditApiKey.text().strip()))
         self.lineEditUrl.textChanged.connect(lambda: setattr(self, 'url', self.lineEditUrl.text().strip()))
         self.lineEditOutputDir.textChanged.connect(lambda: setattr(self, 'output_dir', self.lineEditOutputDir.text().strip()))
+        self.spinBoxWorkers.valueChanged.connect(lambda value: setattr(self, 'max_workers', value))
 
         self.pushButtonDownload.clicked.connect(self.start_download)
         self.pushButtonCancel.clicked.connect(self.on_cancel)
@@ -197,12 +260,14 @@ class DownloaderDialog(QDialog):
 
         self.textEditLog.clear()
         self.progressBar.setValue(0)
+        self.labelStatus.clear()
         self.pushButtonDownload.setEnabled(False)
         self.pushButtonExit.setEnabled(False)
 
-        self.worker = DownloadThread(api_key, url, outdir, dry_run)
+        self.worker = DownloadThread(api_key, url, outdir, dry_run, self.spinBoxWorkers.value())
         self.worker.log_signal.connect(self.textEditLog.append)
         self.worker.progress_signal.connect(self.progressBar.setValue)
+        self.worker.status_signal.connect(self.labelStatus.setText)
         self.worker.finished_signal.connect(self.on_finished)
         self.worker.cancelled_signal.connect(self.on_cancel)
         self.worker.start()
@@ -216,15 +281,19 @@ class DownloaderDialog(QDialog):
     def on_cancel(self):
         if hasattr(self, "worker") and self.worker is not None and self.worker.isRunning():
             self.worker.request_stop()
-            self.textEditLog.append("Cancelling download… (the current file must finish downloading before stopping)")
-            self.textEditLog.append("You can exit the downloader tool, but the download of the last video will continue in the background.")
+            self.textEditLog.append("Cancelling download… Partially downloaded files are kept and resumed next time.")
             self.pushButtonCancel.setEnabled(False)
             self.pushButtonExit.setEnabled(True)
         else:
             self.reject()  # Close the dialog if worker is not running
 
     def closeEvent(self, event):
+        if getattr(self, "worker", None) is not None and self.worker.isRunning():
+            # Workers stop after their current chunk, partial files are resumed next time
+            self.worker.request_stop()
+            self.worker.wait()
         settings = QSettings("OSLActionSpotting", "DatasetAnnotationTool/Downloader")
         settings.setValue("hf_api_key", self.hf_api_key)
         settings.setValue("url", self.url)
         settings.setValue("output_dir", self.output_dir)
+        settings.setValue("max_workers", self.max_workers)
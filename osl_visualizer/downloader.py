@@ -0,0 +1,264 @@
+"""Parallel, resumable HTTP downloads of OSL datasets hosted on the Hugging Face Hub.
+
+Files are fetched by a bounded pool of threads. Each file is streamed in
+chunks to ``<file>.part`` and renamed once complete, so an interrupted
+download resumes from where it stopped (with an HTTP Range request) and
+files already on disk with the expected size are skipped. This module has
+no Qt dependency; progress is reported through callbacks.
+
+The Hub is only reached through plain ``<endpoint>/datasets/<repo>/resolve/
+<revision>/<path>`` URLs, so any HTTP server laid out the same way (a mirror
+set with ``HF_ENDPOINT``, or a local stand-in) can serve the files.
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, quote
+
+DEFAULT_ENDPOINT = "https://huggingface.co"
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadCancelled(Exception):
+    """Raised inside a worker when the download was cancelled."""
+
+
+def human_size(num):
+    """Convert a file size in bytes to a human-readable string (B, KB, MB, GB, TB)."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if num < 1024.0:
+            return f"{num:3.1f} {unit}"
+        num /= 1024.0
+    return f"{num:.1f} PB"
+
+
+def human_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+
+def parse_hf_url(hf_url):
+    """
+    Parse a Hugging Face dataset file URL (supports 'blob' or 'resolve' forms).
+    Returns (endpoint, repo_id, revision, path_in_repo).
+
+    The endpoint is the scheme and host of the URL, unless the HF_ENDPOINT
+    environment variable is set.
+    """
+    url = hf_url.replace("/blob/", "/resolve/")
+    parsed = urlparse(url)
+    parts = parsed.path.strip("/").split("/")
+    if "datasets" in parts:
+        datasets_idx = parts.index("datasets")
+        parts = parts[datasets_idx + 1:]
+    if len(parts) < 4 or parts[2] != "resolve":
+        raise ValueError(f"URL does not look like a valid HuggingFace dataset file URL: {url}")
+    repo_id = f"{parts[0]}/{parts[1]}"
+    revision = parts[3]
+    path_in_repo = "/".join(parts[4:])
+    endpoint = os.environ.get("HF_ENDPOINT") or (
+        f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else DEFAULT_ENDPOINT)
+    return endpoint.rstrip("/"), repo_id, revision, path_in_repo
+
+
+def resolve_url(endpoint, repo_id, revision, path_in_repo):
+    """Direct download URL of a file of a dataset repository."""
+    return f"{endpoint}/datasets/{repo_id}/resolve/{quote(revision, safe='')}/{quote(path_in_repo)}"
+
+
+def repo_video_paths(osl_data, path_in_repo):
+    """Repository paths of the videos referenced by an OSL file located at path_in_repo."""
+    folder = os.path.dirname(path_in_repo)
+    folder = folder if folder and folder != "." else ""
+    paths = set()
+    for video in osl_data.get("videos", []):
+        rel_path = video["path"].lstrip("/")
+        if folder and not rel_path.startswith(folder + "/"):
+            rel_path = f"{folder}/{rel_path}"
+        paths.add(rel_path)
+    return sorted(paths)
+
+
+class DownloadItem:
+    """One file to download: its URL, its destination and its size when known."""
+
+    def __init__(self, url, dest, size=None, name=None):
+        self.url = url
+        self.dest = dest
+        self.size = size
+        self.name = name or os.path.basename(dest)
+        self.skipped = False  # Set when the file was already complete on disk
+
+
+class DownloadProgress:
+    """Thread-safe byte counter with a sliding-window throughput estimate."""
+
+    def __init__(self, total=0, window=5.0):
+        self.total = total
+        self.done = 0
+        self.window = window
+        self._samples = deque()  # (time, done)
+        self._lock = threading.Lock()
+
+    def add(self, nbytes):
+        with self._lock:
+            self.done += nbytes
+
+    def snapshot(self):
+        """Return ``(done, total, bytes_per_second, eta_seconds)``; eta is None when unknown."""
+        now = time.monotonic()
+        with self._lock:
+            done = self.done
+        self._samples.append((now, done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+        start_time, start_done = self._samples[0]
+        elapsed = now - start_time
+        rate = (done - start_done) / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - done) / rate if rate > 0 and self.total >= done else None
+        return done, self.total, rate, eta
+
+
+class ParallelDownloader:
+    """Downloads files with a pool of threads, resuming partial files.
+
+    cancel() may be called from any thread; workers stop after the chunk
+    they are writing (CHUNK_SIZE bytes at most) and keep their ``.part``
+    files for the next attempt.
+    """
+
+    def __init__(self, token=None, max_workers=8, chunk_size=CHUNK_SIZE, timeout=30):
+        self.token = token
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._cancel = threading.Event()
+        self._local = threading.local()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+            if self.token:
+                # requests drops this header when redirected to another host (the CDN)
+                session.headers["Authorization"] = f"Bearer {self.token}"
+        return session
+
+    # ---------- Sizes ----------
+
+    def remote_size(self, url):
+        """Return the size of a remote file with a HEAD request, or None if it does not exist."""
+        response = self._session().head(url, allow_redirects=True, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        # The Hub reports the size of LFS files on the first (redirect) response
+        for r in list(response.history) + [response]:
+            size = r.headers.get("X-Linked-Size")
+            if size is not None:
+                return int(size)
+        size = response.headers.get("Content-Length")
+        return int(size) if size is not None else None
+
+    def fetch_sizes(self, items):
+        """Fill in the size of every item in parallel. Returns the items that do not exist remotely."""
+        missing = []
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            futures = {pool.submit(self.remote_size, item.url): item for item in items if item.size is None}
+            for future in as_completed(futures):
+                item = futures[future]
+                if self.cancelled:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise DownloadCancelled()
+                item.size = future.result()
+                if item.size is None:
+                    missing.append(item)
+        return missing
+
+    # ---------- Downloads ----------
+
+    def download_all(self, items, on_progress=None, on_file_done=None, interval=0.25):
+        """Download items, calling on_progress(done, total, rate, eta) every interval seconds.
+
+        on_file_done(item, error) is called (from the calling thread) for every
+        finished item, with error None on success or the exception that made
+        it fail. Returns the list of ``(item, error)`` of failed items. Raises
+        DownloadCancelled if cancel() was called.
+        """
+        progress = DownloadProgress(total=sum(item.size or 0 for item in items))
+        failed = []
+        interrupted = False
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            pending = {pool.submit(self._download_one, item, progress): item for item in items}
+            while pending:
+                done = [future for future in pending if future.done()]
+                for future in done:
+                    item = pending.pop(future)
+                    error = future.exception()
+                    if isinstance(error, DownloadCancelled):
+                        interrupted = True
+                        continue
+                    if error is not None:
+                        failed.append((item, error))
+                    if on_file_done is not None:
+                        on_file_done(item, error)
+                if on_progress is not None:
+                    on_progress(*progress.snapshot())
+                if pending:
+                    time.sleep(interval)
+        if on_progress is not None:
+            on_progress(*progress.snapshot())
+        if interrupted:
+            raise DownloadCancelled()
+        return failed
+
+    def download(self, item):
+        """Download a single item in the calling thread."""
+        self._download_one(item, DownloadProgress(item.size or 0))
+
+    def _download_one(self, item, progress):
+        if self.cancelled:
+            raise DownloadCancelled()
+        if item.size is not None and os.path.exists(item.dest) and os.path.getsize(item.dest) == item.size:
+            progress.add(item.size)  # Already complete on disk
+            item.skipped = True
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(item.dest)), exist_ok=True)
+        part_path = item.dest + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if item.size is not None and offset > item.size:
+            offset = 0  # The remote file changed, start over
+        if item.size is None or offset < item.size:
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            with self._session().get(item.url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 416 and item.size is None:
+                    pass  # The part file already holds the whole file
+                else:
+                    response.raise_for_status()
+                    if offset and response.status_code != 206:
+                        offset = 0  # The server ignored the range
+                    progress.add(offset)
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(self.chunk_size):
+                            if self.cancelled:
+                                raise DownloadCancelled()
+                            f.write(chunk)
+                            progress.add(len(chunk))
+        else:
+            progress.add(offset)
+        if item.size is not None and os.path.getsize(part_path) != item.size:
+            raise IOError(f"Incomplete download of {item.name}: "
+                          f"{os.path.getsize(part_path)} of {item.size} bytes")
+        os.replace(part_path, item.dest)
@@ -0,0 +1,176 @@
+"""Export of annotations to flat per-event tables, in CSV or JSON lines.
+
+Training pipelines read one row per event rather than the nested OSL JSON.
+Every row holds the columns of BASE_COLUMNS (video path, position in ms,
+frame index at the frame rate of the video, ``HH:MM:SS:ZZZ`` time and
+label) followed by the other fields of the annotation (``gameTime``,
+``team``, ``visibility``...).
+
+Rows are produced video by video and written as they are produced, so
+memory use is bounded by the largest video whatever the size of the
+project. Positions, frames and times of a video are computed at once with
+NumPy (see utils.ms_to_hms_ms_batch). Runs without Qt, for osl_batch.py.
+"""
+import io
+import os
+import csv
+import json
+
+import numpy as np
+
+from osl_io import iter_osl_json, read_osl_text, write_atomic
+from store import json_default
+from utils import ms_to_hms_ms_batch
+
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+BASE_COLUMNS = ("video", "position", "frame", "time", "label")
+EXTRA_COLUMN = "extra"  # CSV column holding, as JSON, the fields that have no column of their own
+DEFAULT_FPS = 25.0
+FPS_KEYS = ("fps", "input_fps", "framerate")  # Video fields holding the frame rate
+
+
+class ExportCancelled(Exception):
+    """Raised by the row generators when should_stop() returns True."""
+
+
+def export_format(file_path):
+    """Return the export format ("csv" or "jsonl") matching the extension of file_path."""
+    fmt = EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unknown export format for {file_path}, use one of {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+
+def video_fps(video, default=DEFAULT_FPS):
+    """Frame rate of video, from its OSL fields, or default."""
+    for key in FPS_KEYS:
+        value = video.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            return float(value)
+    return default
+
+
+def _annotation_list(annotations):
+    # Lazy and compact annotations convert without changing the state of the video
+    return annotations.to_list() if hasattr(annotations, "to_list") else annotations
+
+
+def iter_event_batches(videos, path_of=None, fps_of=None, default_fps=DEFAULT_FPS, should_stop=None):
+    """Yield ``(path, annotations, positions, frames, times)`` for every video with annotations.
+
+    path_of(video) gives the path to write (the OSL path by default) and
+    fps_of(video) the frame rate (from the video fields, else default_fps).
+    """
+    for video in videos:
+        if should_stop is not None and should_stop():
+            raise ExportCancelled()
+        annotations = _annotation_list(video.get("annotations", []))
+        if not annotations:
+            continue
+        positions = np.array([ann.get("position", 0) for ann in annotations], dtype=np.int64)
+        fps = (fps_of(video) if fps_of is not None else None) or video_fps(video, default_fps)
+        frames = (positions * fps // 1000).astype(np.int64)
+        path = path_of(video) if path_of is not None else video.get("path", "")
+        yield path, annotations, positions.tolist(), frames.tolist(), ms_to_hms_ms_batch(positions)
+
+
+def _other_fields(annotation):
+    return [key for key in annotation if key not in ("position", "label")]
+
+
+def _column(annotations, field):
+    """Values of field for the CSV, with nested values encoded as JSON (csv writes None as empty)."""
+    values = [ann.get(field) for ann in annotations]
+    types = set(map(type, values))
+    if dict in types or list in types:
+        values = [json.dumps(value, ensure_ascii=False, default=json_default) if isinstance(value, (dict, list))
+                  else value for value in values]
+    return values
+
+
+def iter_csv_chunks(batches, fields=None):
+    """Yield the CSV text of batches from iter_event_batches(), one chunk per video.
+
+    fields lists the annotation fields to write after BASE_COLUMNS. By
+    default they are those of the first annotation, and fields only found
+    in later annotations go to the EXTRA_COLUMN as a JSON object.
+    """
+    extra = fields is None
+    header_written = False
+    for path, annotations, positions, frames, times in batches:
+        if not header_written:
+            if fields is None:
+                fields = _other_fields(annotations[0])
+            columns = list(BASE_COLUMNS) + list(fields) + ([EXTRA_COLUMN] if extra else [])
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="\n").writerow(columns)
+            yield buffer.getvalue()
+            header_written = True
+            known = set(fields) | {"position", "label"}
+        # Built column by column, the rows are then zipped in C by the csv writer
+        columns = [[path] * len(annotations), positions, frames, times, _column(annotations, "label")]
+        columns.extend(_column(annotations, field) for field in fields)
+        if extra:
+            others = [ann.keys() - known for ann in annotations]
+            if any(others):
+                columns.append([json.dumps({key: ann[key] for key in ann if key in keys}, ensure_ascii=False,
+                                           default=json_default) if keys else None
+                                for ann, keys in zip(annotations, others)])
+            else:
+                columns.append([None] * len(annotations))
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(zip(*columns))
+        yield buffer.getvalue()
+    if not header_written:
+        yield ",".join(BASE_COLUMNS) + "\n"  # No events: header only
+
+
+def iter_jsonl_chunks(batches, fields=None):
+    """Yield the JSON lines of batches from iter_event_batches(), one chunk per video.
+
+    Every line holds BASE_COLUMNS, then the given annotation fields, or all
+    the other fields of the annotation when fields is None.
+    """
+    for path, annotations, positions, frames, times in batches:
+        lines = []
+        for ann, position, frame, time in zip(annotations, positions, frames, times):
+            row = {"video": path, "position": position, "frame": frame, "time": time, "label": ann.get("label")}
+            if fields is None:
+                for key, value in ann.items():
+                    if key not in row:
+                        row[key] = value
+            else:
+                for field in fields:
+                    row[field] = ann.get(field)
+            lines.append(json.dumps(row, ensure_ascii=False, default=json_default))
+        lines.append("")
+        yield "\n".join(lines)
+
+
+def export_events(videos, file_path, fmt=None, fields=None, path_of=None, fps_of=None,
+                  default_fps=DEFAULT_FPS, should_stop=None):
+    """Write one row per annotation of videos to file_path and return the number of rows.
+
+    fmt is "csv" or "jsonl" (by default from the extension of file_path).
+    The file is written atomically; if should_stop() returns True the
+    export stops with ExportCancelled and the previous file is kept.
+    """
+    fmt = fmt or export_format(file_path)
+    counted = [0]
+
+    def counting(batches):
+        for batch in batches:
+            counted[0] += len(batch[1])
+            yield batch
+
+    batches = counting(iter_event_batches(videos, path_of, fps_of, default_fps, should_stop))
+    chunks = iter_csv_chunks(batches, fields) if fmt == "csv" else iter_jsonl_chunks(batches, fields)
+    write_atomic(file_path, chunks)
+    return counted[0]
+
+
+def iter_file_videos(file_path):
+    """Yield the videos of an OSL JSON file one by one, without building the whole document."""
+    for key, value, _ in iter_osl_json(read_osl_text(file_path)):
+        if key == "video":
+            yield value
@@ -0,0 +1,255 @@
+"""Append-only journal of edits, used to recover work after a crash.
+
+Every edit made in the GUI is appended as one JSON line to a sidecar file
+next to the project (``<project>.json.journal``). A full save compacts the
+journal, and a journal still present when the project is loaded again holds
+the edits that were never saved; replay_journal() re-applies them.
+
+Videos are identified by their path and annotations by their row in the
+chronologically sorted annotation list of their video. Undoing an edit
+appends the inverse edit, so the journal never has to be rewritten. A bulk
+edit (see bulk.py) is one record listing the videos it changed; undoing it
+records what it had changed in those videos.
+"""
+import os
+import json
+
+from bulk import BulkEdit, apply_edit, revert_edit
+from utils import bisect_by
+from store import json_default
+
+JOURNAL_SUFFIX = ".journal"
+
+
+class JournalError(Exception):
+    """Raised when a journal record cannot be applied to the loaded data."""
+
+
+def journal_path(file_path):
+    return file_path + JOURNAL_SUFFIX
+
+
+def _file_signature(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None, None
+    return st.st_size, st.st_mtime_ns
+
+
+class EditJournal:
+    """Append-only JSON-lines log of the edits made to one project file.
+
+    The journal file is created on the first append and starts with a
+    header recording the size and modification time of the project file,
+    so a journal written against another version of the file can be told
+    apart.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.path = journal_path(file_path)
+        self._file = None
+
+    def append(self, op, **fields):
+        """Append one edit record. Costs one small write, whatever the project size."""
+        if self._file is None:
+            is_new = not os.path.exists(self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if is_new:
+                self._write(self._header())
+        record = {"op": op}
+        record.update(fields)
+        self._write(record)
+
+    def _header(self):
+        size, mtime_ns = _file_signature(self.file_path)
+        return {"op": "begin", "base_size": size, "base_mtime_ns": mtime_ns}
+
+    def _write(self, record):
+        # Undoing the removal of a video journals the video with its (possibly compact) annotations
+        self._file.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+        self._file.flush()
+
+    def checkpoint(self):
+        """Return the current end of the journal, to be passed to compact()."""
+        if self._file is not None:
+            return self._file.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def compact(self, checkpoint=None):
+        """Drop the records written before checkpoint, after a full save.
+
+        Records appended after the checkpoint (edits made while the save was
+        running) are kept, under a new header matching the saved file.
+        """
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        tail = ""
+        if checkpoint is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                f.seek(checkpoint)
+                tail = f.read()
+        if not tail.strip():
+            os.remove(self.path)
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._header()) + "\n")
+            f.write(tail)
+        os.replace(tmp_path, self.path)
+
+    def discard(self):
+        """Delete the journal file."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_journal(file_path):
+    """Read the pending journal of file_path.
+
+    Returns ``(header, records)``, or ``(None, [])`` when there is no
+    journal. A truncated last line (from a crash mid-write) is ignored.
+    """
+    path = journal_path(file_path)
+    if not os.path.exists(path):
+        return None, []
+    header = None
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record.get("op") == "begin":
+                header = record
+            else:
+                records.append(record)
+    return header, records
+
+
+def journal_matches_file(header, file_path):
+    """Return True if the journal header was written against file_path as it is now."""
+    if header is None:
+        return False
+    return (header.get("base_size"), header.get("base_mtime_ns")) == _file_signature(file_path)
+
+
+def _position(annotation):
+    return annotation["position"]
+
+
+def _path(video):
+    return video.get("path", "")
+
+
+def _video_at(videos_by_path, path):
+    video = videos_by_path.get(path)
+    if video is None:
+        raise JournalError(f"Video '{path}' not found")
+    return video
+
+
+def apply_record(osl_data, record, videos_by_path):
+    """Apply one journal record to osl_data.
+
+    Returns the edited video, or None for project-level edits (labels and
+    the video list itself). Bulk edits return the list of edited videos.
+    """
+    op = record["op"]
+    videos = osl_data.setdefault("videos", [])
+    labels = osl_data.setdefault("labels", [])
+
+    if op == "add_label":
+        if record["label"] not in labels:
+            labels.insert(record.get("index", len(labels)), record["label"])
+        return None
+    if op == "remove_label":
+        if record["label"] in labels:
+            labels.remove(record["label"])
+        return None
+    if op == "add_video":
+        paths = [_path(v) for v in videos]
+        if any(a > b for a, b in zip(paths, paths[1:])):
+            videos.sort(key=_path)
+        video = record["video"]
+        videos.insert(bisect_by(videos, _path(video), _path, right=True), video)
+        videos_by_path.setdefault(_path(video), video)
+        return None
+    if op == "remove_video":
+        row = record["row"]
+        if not (0 <= row < len(videos)) or _path(videos[row]) != record["path"]:
+            raise JournalError(f"Video '{record['path']}' not found at row {row}")
+        video = videos.pop(row)
+        if videos_by_path.get(record["path"]) is video:
+            del videos_by_path[record["path"]]
+        return None
+    if op == "bulk":
+        edit = BulkEdit.from_record(record["edit"])
+        edited = [_video_at(videos_by_path, path) for path in record["paths"]]
+        apply_edit(edited, edit)
+        new_labels = edit.new_labels(labels)
+        if new_labels is not None:
+            labels[:] = new_labels
+        return edited
+    if op == "bulk_revert":
+        changes = [(_video_at(videos_by_path, change["path"]), change) for change in record["changes"]]
+        revert_edit(changes)
+        if record.get("labels") is not None:
+            labels[:] = record["labels"]
+        return [video for video, _ in changes]
+
+    video = _video_at(videos_by_path, record["path"])
+    annotations = video.setdefault("annotations", [])
+    row = record["row"]
+    if op == "add_annotation":
+        annotations.insert(row, record["annotation"])
+        return video
+    if not (0 <= row < len(annotations)):
+        raise JournalError(f"No annotation at row {row} of '{record['path']}'")
+    if op == "remove_annotation":
+        del annotations[row]
+    elif op == "set_label":
+        annotations[row]["label"] = record["label"]
+    elif op == "move_annotation":
+        annotation = annotations[row]
+        annotation["position"] = record["position"]
+        new_row = bisect_by(annotations, record["position"], _position, skip=row)
+        if hasattr(annotations, "move"):
+            annotations.move(row, new_row)
+        else:
+            annotations.insert(new_row, annotations.pop(row))
+    else:
+        raise JournalError(f"Unknown journal operation '{op}'")
+    return video
+
+
+def replay_journal(osl_data, records):
+    """Apply journal records to osl_data in order.
+
+    Returns ``(videos, project_changed)``: the list of edited videos and
+    whether project-level data changed.
+    """
+    videos_by_path = {}
+    for video in osl_data.get("videos", []):
+        videos_by_path.setdefault(_path(video), video)
+    edited = {}
+    project_changed = False
+    for record in records:
+        video = apply_record(osl_data, record, videos_by_path)
+        if video is None:
+            project_changed = True
+        elif isinstance(video, list):
+            edited.update((id(v), v) for v in video)
+            project_changed = True  # Renames change the project labels
+        else:
+            edited[id(video)] = video
+    return list(edited.values()), project_changed
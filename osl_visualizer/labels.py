@@ -0,0 +1,85 @@
+"""Registry of the labels of a project.
+
+The labels of a project are the ``osl_data["labels"]`` list, which is what
+gets saved. ``LabelRegistry`` edits that same list in place and indexes it,
+so checking whether a label exists or finding its row is a dictionary
+lookup instead of a scan of the list. Every label is also interned in the
+LabelTable of the project, which gives it a stable integer id shared with
+the compact annotation stores (see store.py).
+
+Because compact stores keep label ids rather than names, a label can be
+renamed across the whole dataset by renaming it in the LabelTable (see
+bulk.apply_edit): every event shows the new name without being rewritten.
+"""
+from store import LabelTable
+
+
+class LabelRegistry:
+    """The project labels, a list edited in place, with O(1) membership and row lookups."""
+
+    def __init__(self, labels=None, table=None):
+        self.labels = []
+        self.table = LabelTable()
+        self._rows = {}  # label -> row of its first occurrence in labels
+        self.reset(labels if labels is not None else [], table)
+
+    def reset(self, labels, table=None):
+        """Index labels, which are edited in place from now on, and intern them in table."""
+        if table is not None:
+            self.table = table
+        self.labels = labels
+        for label in labels:
+            self.table.intern(label)
+        self._reindex()
+
+    def _reindex(self):
+        # Labels are a few dozens, rebuilding the index costs less than the list edit itself
+        rows = {}
+        for row, label in enumerate(self.labels):
+            rows.setdefault(label, row)
+        self._rows = rows
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __getitem__(self, row):
+        return self.labels[row]
+
+    def __contains__(self, label):
+        return label in self._rows
+
+    def index(self, label):
+        """Row of label, like list.index()."""
+        row = self._rows.get(label)
+        if row is None:
+            raise ValueError(f"{label!r} is not a label of the project")
+        return row
+
+    def id_of(self, label):
+        """Stable integer id of label in the LabelTable."""
+        return self.table.intern(label)
+
+    def insert(self, index, label):
+        """Insert label at index (clamped to the list) and return its row."""
+        index = max(0, min(index, len(self.labels)))
+        self.labels.insert(index, label)
+        self.table.intern(label)
+        self._reindex()
+        return index
+
+    def remove(self, label):
+        """Remove label and return its former row."""
+        row = self.index(label)
+        del self.labels[row]
+        self._reindex()
+        return row
+
+    def replace(self, labels):
+        """Replace all the labels, keeping the same list object."""
+        self.labels[:] = labels
+        for label in labels:
+            self.table.intern(label)
+        self._reindex()
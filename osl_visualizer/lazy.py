@@ -0,0 +1,306 @@
+"""Lazy loading of OSL JSON files through a byte-offset index.
+
+A large OSL file is mostly made of annotation arrays, while opening a
+project only needs the video list. scan_osl_file() reads the file once and
+records, for every video, its fields without the annotations, the byte span
+of its ``"annotations"`` array and the number of annotations per label. The
+result is kept in a sidecar index next to the file (``<project>.json.index``)
+so later opens only read the index, whose size is that of the video list.
+
+Videos are then created with a LazyAnnotations placeholder, which knows its
+length and label counts but reads and parses its array from the file only
+when the annotations are actually needed.
+
+The file is not kept open, so a save can replace it on every platform. A
+save that replaces it moves the placeholders that were not parsed yet to
+their spans in the new file (see replace_source()).
+"""
+import os
+import json
+import threading
+from collections import Counter
+from contextlib import ExitStack
+from collections.abc import MutableSequence
+
+from osl_io import _decoder, _expect, _skip_ws, write_atomic
+from store import AnnotationStore
+
+INDEX_SUFFIX = ".index"
+INDEX_VERSION = 1
+
+
+def index_path(file_path):
+    return file_path + INDEX_SUFFIX
+
+
+def _file_signature(file_path):
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+class LazySource:
+    """An OSL file read by span, shared by the LazyAnnotations of its videos.
+
+    The file is opened for every read instead of being kept open or mapped:
+    Windows does not let a save replace a file that is open. Spans are read
+    under ``lock``, which replace_source() holds while it replaces the file
+    and moves the spans, so a read never mixes the old spans and the new file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+
+    def read(self, start, end):
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+
+class LazyAnnotations(MutableSequence):
+    """Annotation list of a video that is parsed from its source file on first use.
+
+    len() and label_counter() are answered from the index without parsing.
+    Any other access parses the array once and then behaves as a plain list.
+    """
+
+    def __init__(self, source, start, end, count, labels):
+        self.source = source
+        self.start = start
+        self.end = end
+        self._count = count
+        self._labels = labels  # label -> number of annotations, from the index
+        self._items = None
+
+    def is_loaded(self):
+        return self._items is not None
+
+    def _read(self):
+        with self.source.lock:
+            return self.source.read(self.start, self.end)
+
+    def raw_json(self):
+        """The array exactly as it appears in the source file, or None if it has no JSON source."""
+        return self._read().decode("utf-8")
+
+    def _parse(self):
+        return json.loads(self._read())
+
+    def load(self):
+        """Parse the annotations if needed and return them as a list."""
+        if self._items is None:
+            self._items = self._parse()
+        return self._items
+
+    def materialize(self, labels=None):
+        """Return the annotations as a list, or as an AnnotationStore sharing labels."""
+        items = self.load()
+        return AnnotationStore.from_list(items, labels) if labels is not None else items
+
+    def label_counter(self):
+        if self._items is None:
+            return Counter(self._labels)
+        return Counter(ann.get("label") for ann in self._items)
+
+    def to_list(self):
+        # Not cached, so a background save does not change the state of the object
+        return list(self._items) if self._items is not None else self._parse()
+
+    def __len__(self):
+        return self._count if self._items is None else len(self._items)
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __setitem__(self, index, value):
+        self.load()[index] = value
+
+    def __delitem__(self, index):
+        del self.load()[index]
+
+    def insert(self, index, value):
+        self.load().insert(index, value)
+
+    def __repr__(self):
+        state = "loaded" if self._items is not None else "not loaded"
+        return f"<{type(self).__name__} {len(self)} annotations, {state}>"
+
+
+# ---------- Scanning ----------
+
+def _loads(data, start, end):
+    return json.loads(data[start:end])
+
+
+def _is_plain(value):
+    """True if value decoded from latin-1 text is what decoding the UTF-8 bytes would give."""
+    return not isinstance(value, (dict, list)) and (not isinstance(value, str) or value.isascii())
+
+
+def _decode_key(text, data, idx):
+    if text[idx:idx + 1] != '"':
+        raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, idx)
+    key, end = _decoder.raw_decode(text, idx)
+    return (key if key.isascii() else _loads(data, idx, end)), end
+
+
+def _scan_video(text, data, idx):
+    """Scan the video object at idx. Returns ``(entry, end)`` where entry is an index entry."""
+    decode = _decoder.raw_decode
+    _, idx = _expect(text, idx, "{", "'{'")
+    skeleton = {}
+    entry = {"video": skeleton}
+    idx = _skip_ws(text, idx)
+    if text[idx:idx + 1] == "}":
+        return entry, idx + 1
+    while True:
+        key, idx = _decode_key(text, data, idx)
+        idx = _skip_ws(text, idx)
+        _, idx = _expect(text, idx, ":", "':' delimiter")
+        idx = _skip_ws(text, idx)
+        start = idx
+        value, idx = decode(text, idx)
+        if key == "annotations" and isinstance(value, list):
+            skeleton[key] = None
+            labels = Counter(ann.get("label") if isinstance(ann, dict) else None for ann in value)
+            if not all(_is_plain(label) for label in labels):
+                # Non-ASCII labels were decoded from latin-1 text, count them again from the bytes
+                labels = Counter(ann.get("label") if isinstance(ann, dict) else None
+                                 for ann in _loads(data, start, idx))
+            entry["span"] = [start, idx]
+            entry["count"] = len(value)
+            entry["labels"] = [[label, count] for label, count in labels.items()]
+        else:
+            skeleton[key] = value if _is_plain(value) else _loads(data, start, idx)
+        idx = _skip_ws(text, idx)
+        ch, idx = _expect(text, idx, ",}", "',' delimiter")
+        if ch == "}":
+            return entry, idx
+        idx = _skip_ws(text, idx)
+
+
+def scan_osl_file(file_path, progress=None, should_stop=None):
+    """Scan an OSL file and return its lazy index.
+
+    The index holds the top-level fields in document order (``"videos"``
+    mapped to None) and one entry per video with its fields (annotations
+    mapped to None), the byte span of its annotation array, its number of
+    annotations and its ``[label, count]`` pairs. progress(fraction) is
+    called after every video; the scan returns None when should_stop()
+    becomes true.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    size, mtime_ns = _file_signature(file_path)
+    # Latin-1 maps every byte to one character, so text offsets are byte offsets
+    text = data.decode("latin-1")
+    decode = _decoder.raw_decode
+    fields = {}
+    videos = []
+    idx = _skip_ws(text, 3 if data.startswith(b"\xef\xbb\xbf") else 0)
+    _, idx = _expect(text, idx, "{", "'{'")
+    idx = _skip_ws(text, idx)
+    while text[idx:idx + 1] != "}":
+        key, idx = _decode_key(text, data, idx)
+        idx = _skip_ws(text, idx)
+        _, idx = _expect(text, idx, ":", "':' delimiter")
+        idx = _skip_ws(text, idx)
+        if key == "videos" and text[idx:idx + 1] == "[":
+            fields["videos"] = None
+            idx = _skip_ws(text, idx + 1)
+            if text[idx:idx + 1] == "]":
+                idx += 1
+            else:
+                while True:
+                    entry, idx = _scan_video(text, data, idx)
+                    videos.append(entry)
+                    if should_stop is not None and should_stop():
+                        return None
+                    if progress is not None:
+                        progress(idx / len(data))
+                    idx = _skip_ws(text, idx)
+                    ch, idx = _expect(text, idx, ",]", "',' delimiter")
+                    if ch == "]":
+                        break
+                    idx = _skip_ws(text, idx)
+        else:
+            start = idx
+            _, idx = decode(text, idx)
+            fields[key] = _loads(data, start, idx)
+        idx = _skip_ws(text, idx)
+        ch, idx = _expect(text, idx, ",}", "',' delimiter")
+        if ch == "}":
+            break
+        idx = _skip_ws(text, idx)
+    return {"version": INDEX_VERSION, "size": size, "mtime_ns": mtime_ns, "fields": fields, "videos": videos}
+
+
+# ---------- Sidecar index ----------
+
+def read_index(file_path):
+    """Return the sidecar index of file_path, or None if it is missing or out of date."""
+    try:
+        with open(index_path(file_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        size, mtime_ns = _file_signature(file_path)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(index, dict) or index.get("version") != INDEX_VERSION
+            or index.get("size") != size or index.get("mtime_ns") != mtime_ns):
+        return None
+    return index
+
+
+def write_index(file_path, index):
+    """Write the sidecar index of file_path. Errors (read-only folder...) are raised to the caller."""
+    write_atomic(index_path(file_path), [json.dumps(index, ensure_ascii=False, separators=(",", ":"))])
+
+
+def load_index(file_path, progress=None, should_stop=None):
+    """Return ``(index, scanned)``: the sidecar index if up to date, else a new scan of the file."""
+    index = read_index(file_path)
+    if index is not None:
+        return index, False
+    return scan_osl_file(file_path, progress, should_stop), True
+
+
+def _same_file(path, other):
+    return os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(other))
+
+
+def replace_source(tmp_path, file_path, videos):
+    """Replace file_path by tmp_path, a new version of it listing videos in this order.
+
+    Videos whose annotations are still to be read from file_path are moved
+    to their spans in the new file, which is scanned before replacing.
+    Returns the index of the new file, or None if no video reads from it.
+    """
+    pending = []
+    for row, video in enumerate(videos):
+        annotations = video.get("annotations")
+        if (isinstance(annotations, LazyAnnotations) and isinstance(annotations.source, LazySource)
+                and not annotations.is_loaded() and _same_file(annotations.source.file_path, file_path)):
+            pending.append((row, annotations))
+    if not pending:
+        os.replace(tmp_path, file_path)
+        return None
+    index = scan_osl_file(tmp_path)
+    sources = {id(annotations.source): annotations.source for _, annotations in pending}
+    with ExitStack() as stack:
+        for source in sources.values():
+            stack.enter_context(source.lock)
+        os.replace(tmp_path, file_path)
+        for row, annotations in pending:
+            annotations.start, annotations.end = index["videos"][row]["span"]
+    return index
+
+
+def index_videos(index, source):
+    """Yield the videos of an index, with LazyAnnotations reading from source."""
+    for entry in index["videos"]:
+        video = dict(entry["video"])
+        span = entry.get("span")
+        if span is not None:
+            video["annotations"] = LazyAnnotations(source, span[0], span[1], entry["count"],
+                                                   {label: count for label, count in entry["labels"]})
+        yield video
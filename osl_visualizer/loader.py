@@ -0,0 +1,217 @@
+import time
+import logging
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from bincache import CacheBuilder, CacheError, cache_path, file_signature, open_cache
+from lazy import LazySource, index_videos, load_index, write_index
+from osl_io import iter_osl_json, read_osl_text
+from shards import ShardedProject, shard_paths
+from store import compact_videos
+
+
+class OslLoadThread(QThread):
+    """Parse an OSL JSON file in the background and stream its videos.
+
+    Videos are emitted in batches through ``videos_signal`` as soon as they
+    are decoded, so the GUI can display them before the whole file has been
+    parsed. When parsing completes, ``finished_signal`` carries the
+    top-level fields in document order, with ``"videos"`` mapped to None.
+
+    When ``labels`` is a LabelTable, annotation lists are converted to
+    compact AnnotationStores sharing that table before they are emitted.
+
+    When ``lazy`` is True, only the video list is read, from the sidecar
+    index of the file (built by a first scan when missing or out of date),
+    and every annotation list is a LazyAnnotations parsed on first use.
+
+    When ``cache`` is True, a file with an up-to-date binary cache is read
+    from the cache instead, with CachedAnnotations; otherwise
+    the cache is built while the JSON is parsed and written once it is
+    complete.
+    """
+    videos_signal = pyqtSignal(object)
+    progress_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal(object)
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, file_path, labels=None, batch_size=200, batch_interval=0.05, lazy=False,
+                 cache=False):
+        super().__init__()
+        self.file_path = file_path
+        self.labels = labels
+        self.lazy = lazy
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._stop_requested = False
+        self._builder = None
+
+    def request_stop(self):
+        self._stop_requested = True
+
+    def run(self):
+        if self.cache:
+            reader = open_cache(self.file_path)
+            if reader is not None:
+                self._run_cached(reader)
+                return
+        if self.lazy:
+            self._run_lazy()
+            return
+        try:
+            signature = file_signature(self.file_path)
+            self._builder = CacheBuilder() if self.cache else None
+            text = read_osl_text(self.file_path)
+            total = max(len(text), 1)
+            fields = {}
+            batch = []
+            last_emit = time.monotonic()
+            last_percent = -1
+            for key, value, offset in iter_osl_json(text):
+                if self._stop_requested:
+                    self.cancelled_signal.emit()
+                    return
+                if key == "video":
+                    batch.append(value)
+                elif key == "videos":
+                    fields["videos"] = None
+                else:
+                    fields[key] = value
+                now = time.monotonic()
+                if batch and (len(batch) >= self.batch_size or now - last_emit >= self.batch_interval):
+                    self._emit_batch(batch)
+                    batch = []
+                    last_emit = now
+                percent = int(offset * 100 / total)
+                if percent != last_percent:
+                    self.progress_signal.emit(percent)
+                    last_percent = percent
+            if batch:
+                self._emit_batch(batch)
+            if self._builder is not None:
+                try:
+                    self._builder.write(cache_path(self.file_path), fields, signature)
+                except OSError as e:
+                    logging.warning(f"Could not write the binary cache: {e}")
+            self.progress_signal.emit(100)
+            self.finished_signal.emit(fields)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def _run_cached(self, reader):
+        try:
+            batch = []
+            for video in reader.videos():
+                if self._stop_requested:
+                    self.cancelled_signal.emit()
+                    return
+                batch.append(video)
+                if len(batch) >= self.batch_size:
+                    self.videos_signal.emit(batch)
+                    batch = []
+            if batch:
+                self.videos_signal.emit(batch)
+            self.progress_signal.emit(100)
+            self.finished_signal.emit(reader.fields)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def _run_lazy(self):
+        try:
+            index, scanned = load_index(self.file_path, lambda fraction: self.progress_signal.emit(int(fraction * 90)),
+                                        lambda: self._stop_requested)
+            if index is None:
+                self.cancelled_signal.emit()
+                return
+            if scanned:
+                try:
+                    write_index(self.file_path, index)
+                except OSError as e:
+                    logging.warning(f"Could not write the lazy loading index: {e}")
+            source = LazySource(self.file_path)
+            batch = []
+            for video in index_videos(index, source):
+                if self._stop_requested:
+                    self.cancelled_signal.emit()
+                    return
+                batch.append(video)
+                if len(batch) >= self.batch_size:
+                    self.videos_signal.emit(batch)  # Not compacted: annotations are converted when parsed
+                    batch = []
+            if batch:
+                self.videos_signal.emit(batch)
+            self.progress_signal.emit(100)
+            self.finished_signal.emit(index["fields"])
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def _emit_batch(self, batch):
+        if self._builder is not None:
+            try:
+                self._builder.add_videos(batch)  # Before compaction, from the parsed dicts
+            except (CacheError, OverflowError) as e:
+                logging.warning(f"Not writing a binary cache: {e}")
+                self._builder = None
+        if self.labels is not None:
+            compact_videos(batch, self.labels)
+        self.videos_signal.emit(batch)
+
+
+class ShardedLoadThread(QThread):
+    """Open a folder or manifest of OSL JSON files as one project.
+
+    Every shard is read lazily, through its sidecar index, whatever the lazy
+    loading setting: only the video lists are read, and annotations are
+    parsed when a video is opened. Shards are not kept open, and a save that
+    replaces one moves its unparsed videos to their new spans (see
+    lazy.replace_source()). Videos are streamed through ``videos_signal``,
+    and ``finished_signal`` carries the project fields with the labels of
+    all shards. The ShardedProject telling the shard of every video is then
+    available as ``project``.
+    """
+    videos_signal = pyqtSignal(object)
+    progress_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal(object)
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, path, batch_size=200):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self.project = None
+        self._stop_requested = False
+
+    def request_stop(self):
+        self._stop_requested = True
+
+    def run(self):
+        try:
+            paths = shard_paths(self.path)
+            project = ShardedProject(self.path)
+            for i, file_path in enumerate(paths):
+                def progress(fraction, i=i):
+                    self.progress_signal.emit(int((i + fraction) * 100 / len(paths)))
+                index, scanned = load_index(file_path, progress, lambda: self._stop_requested)
+                if index is None:
+                    self.cancelled_signal.emit()
+                    return
+                if scanned:
+                    try:
+                        write_index(file_path, index)
+                    except OSError as e:
+                        logging.warning(f"Could not write the lazy loading index of {file_path}: {e}")
+                videos = list(index_videos(index, LazySource(file_path)))
+                project.add_shard(file_path, index["fields"], videos)
+                for start in range(0, len(videos), self.batch_size):
+                    if self._stop_requested:
+                        self.cancelled_signal.emit()
+                        return
+                    self.videos_signal.emit(videos[start:start + self.batch_size])
+            self.project = project
+            self.progress_signal.emit(100)
+            self.finished_signal.emit({"videos": None, "labels": project.labels()})
+        except Exception as e:
+            self.error_signal.emit(str(e))
@@ -1,19 +1,55 @@
 import sys
+import time
+import multiprocessing
 import argparse
-from PyQt6.QtWidgets import QApplication
-from viewer import DatasetViewer
+
+from profiling import startup
+from telemetry import telemetry
 
 if __name__ == "__main__":
+    started = time.perf_counter()
+    # Thumbnail workers are spawned processes, which frozen builds must support
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description="OSL Dataset Visualizer")
-    parser.add_argument('--osl_file', type=str, help='Path to an OSL JSON file to preload')
+    parser.add_argument('--osl_file', type=str, help='Path to an OSL JSON file, or a folder or .oslproj manifest of OSL JSON files, to preload')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print the time spent in each startup phase once the window is shown')
+    parser.add_argument('--telemetry', action='store_true',
+                        help='Collect counters and latency histograms of loads, saves, seeks, painting...')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Also trace memory allocations (slower), included in the telemetry dump')
+    parser.add_argument('--telemetry-dump', type=str, metavar='PATH',
+                        help='Write the telemetry as JSON to PATH on exit (implies --telemetry)')
     args = parser.parse_args()
+    if args.profile_startup:
+        startup.enable(started)
+    if args.telemetry or args.trace_memory or args.telemetry_dump:
+        telemetry.enable()
+    if args.trace_memory:
+        telemetry.start_memory_tracing()
 
+    # Heavy imports come after argument parsing, so spawned worker processes do not pay for them
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    startup.mark("import PyQt6")
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
+    from viewer import DatasetViewer
+    startup.mark("import viewer")
     viewer = DatasetViewer()
 
     if args.osl_file:
         viewer.load_osl_json_from_file(args.osl_file)
+        startup.mark("start loading OSL file")
 
     viewer.show()
-    sys.exit(app.exec())
-# 
\ No newline at end of file
+    startup.mark("show window")
+    if args.profile_startup:
+        def report():
+            startup.mark("first event loop iteration")
+            startup.report()
+        QTimer.singleShot(0, report)
+    status = app.exec()
+    if args.telemetry_dump:
+        telemetry.dump(args.telemetry_dump)
+    sys.exit(status)
@@ -1,10 +1,41 @@
-from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
-from utils import ms_to_hms_ms
+from PyQt6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+from utils import ms_to_hms, ms_to_hms_ms, bisect_by
+from stats import DatasetStatistics
+from labels import LabelRegistry
+from telemetry import telemetry
+
+
+def _position(annotation):
+    return annotation["position"]
+
+
+def _path(video):
+    return video.get("path", "")
+
+
+def _move_item(items, src, dst):
+    if hasattr(items, "move"):
+        items.move(src, dst)
+    else:
+        items.insert(dst, items.pop(src))
+
 
 class VideoListModel(QAbstractListModel):
+    # True if the video file exists, False if it is missing, None until it has been checked
+    AvailabilityRole = Qt.ItemDataRole.UserRole + 1
+    MISSING_COLOR = QColor(200, 40, 40)
+    statistics_changed = pyqtSignal()
+
     def __init__(self, videos=None):
         super().__init__()
-        self.videos = videos or []
+        self.videos = videos if videos is not None else []
+        self._sorted = None  # Cached "videos are sorted by path", None when unknown
+        self.media_info = {}  # video path -> probed metadata (fps, duration_ms, ...)
+        self.availability = {}  # video path -> whether the file exists, from PathValidator
+        # Annotation counts, kept current by the row methods below and the annotation_* hooks
+        self.statistics = DatasetStatistics()
+        self.statistics.rebuild(self.videos)
 
     def rowCount(self, parent=QModelIndex()):
         return len(self.videos)
@@ -15,21 +46,159 @@ class VideoListModel(QAbstractListModel):
         video = self.videos[index.row()]
         if role == Qt.ItemDataRole.DisplayRole:
             path = video.get("path", "unknown")
-            n_events = len(video.get("annotations", []))
+            n_events = self.statistics.video_events(video)
+            if n_events is None:
+                n_events = len(video.get("annotations", []))
+            info = self.media_info.get(path)
+            if info and info.get("duration_ms") and info.get("fps"):
+                return f"{path} ({n_events} events, {ms_to_hms(info['duration_ms'])} @ {info['fps']:g} fps)"
             return f"{path} ({n_events} events)"
         if role == Qt.ItemDataRole.UserRole:
             return video
+        if role == self.AvailabilityRole:
+            return self.availability.get(video.get("path", ""))
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if self.availability.get(video.get("path", "")) is False:
+                return self.MISSING_COLOR
+            return None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if self.availability.get(video.get("path", "")) is False:
+                return "Video file not found"
+            return None
         return None
 
+    @telemetry.instrument("model.reset_videos")
     def set_videos(self, videos):
         self.beginResetModel()
-        self.videos = videos or []
+        self.videos = videos if videos is not None else []
+        self._sorted = None
+        self.statistics.rebuild(self.videos)
         self.endResetModel()
+        self.statistics_changed.emit()
+
+    @telemetry.instrument("model.append_videos")
+    def append_videos(self, videos):
+        """Append a batch of videos, notifying views with a single row insertion."""
+        if not videos:
+            return
+        first = len(self.videos)
+        self.beginInsertRows(QModelIndex(), first, first + len(videos) - 1)
+        self.videos.extend(videos)
+        self._sorted = None
+        for video in videos:
+            self.statistics.add_video(video)
+        self.endInsertRows()
+        self.statistics_changed.emit()
+
+    def set_media_info(self, items):
+        """Store probed metadata for a batch of ``(video path, info)`` pairs and refresh the list."""
+        self.media_info.update(items)
+        if self.videos:
+            self.dataChanged.emit(self.index(0), self.index(len(self.videos) - 1), [Qt.ItemDataRole.DisplayRole])
+
+    def set_availability(self, items):
+        """Store the availability of a batch of ``(video path, available)`` pairs and refresh the list."""
+        self.availability.update(items)
+        if self.videos:
+            self.dataChanged.emit(self.index(0), self.index(len(self.videos) - 1),
+                                  [Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.ToolTipRole, self.AvailabilityRole])
+
+    def row_of(self, video):
+        """Return the row of video (compared by identity), or -1."""
+        if self.is_sorted_by_path():
+            # Binary search, then scan the videos sharing its path
+            path = _path(video)
+            row = bisect_by(self.videos, path, _path)
+            while row < len(self.videos) and _path(self.videos[row]) == path:
+                if self.videos[row] is video:
+                    return row
+                row += 1
+            return -1
+        for row, other in enumerate(self.videos):
+            if other is video:
+                return row
+        return -1
+
+    def is_sorted_by_path(self):
+        if self._sorted is None:
+            paths = [_path(video) for video in self.videos]
+            self._sorted = all(a <= b for a, b in zip(paths, paths[1:]))
+        return self._sorted
+
+    def sort_by_path(self):
+        """Sort videos by path without resetting the model, so selections survive."""
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        tracked = [self.videos[index.row()] for index in old_indexes]
+        self.videos.sort(key=_path)
+        new_rows = {id(video): row for row, video in enumerate(self.videos)}
+        self.changePersistentIndexList(old_indexes, [self.index(new_rows[id(video)]) for video in tracked])
+        self._sorted = True
+        self.layoutChanged.emit()
+
+    def insert_video(self, video):
+        """Insert video in path order and return its row."""
+        row = bisect_by(self.videos, _path(video), _path, right=True)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.videos.insert(row, video)
+        self.statistics.add_video(video)
+        self.endInsertRows()
+        self.statistics_changed.emit()
+        return row
+
+    def remove_video(self, row):
+        """Remove the video at row and return it."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        video = self.videos.pop(row)
+        self.statistics.remove_video(video)
+        self.endRemoveRows()
+        self.statistics_changed.emit()
+        return video
+
+    # ---------- Annotation hooks ----------
+
+    def annotation_added(self, video, label):
+        self.statistics.annotation_added(video, label)
+        self._statistics_updated(video)
+
+    def annotation_removed(self, video, label):
+        self.statistics.annotation_removed(video, label)
+        self._statistics_updated(video)
+
+    def annotation_relabeled(self, video, old_label, new_label):
+        self.statistics.annotation_relabeled(video, old_label, new_label)
+        self._statistics_updated(video)
+
+    def refresh_video(self, video):
+        """Recount the annotations of a video edited outside of the hooks above."""
+        self.statistics.refresh_video(video)
+        self._statistics_updated(video)
+
+    def rename_label(self, old, new):
+        """Update the statistics after every event of old was relabeled new. The rows do not change."""
+        self.statistics.rename_label(old, new)
+        self.statistics_changed.emit()
+
+    def refresh_videos(self, videos):
+        """Recount the annotations of several videos and notify views once."""
+        for video in videos:
+            self.statistics.refresh_video(video)
+        if self.videos:
+            self.dataChanged.emit(self.index(0), self.index(len(self.videos) - 1), [Qt.ItemDataRole.DisplayRole])
+        self.statistics_changed.emit()
+
+    def _statistics_updated(self, video):
+        row = self.row_of(video)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row), self.index(row), [Qt.ItemDataRole.DisplayRole])
+        self.statistics_changed.emit()
 
 class AnnotationListModel(QAbstractListModel):
     def __init__(self, annotations=None):
         super().__init__()
-        self.annotations = annotations or []
+        self.annotations = annotations if annotations is not None else []
+        self.video_path = None  # Resolved path of the video the annotations belong to
+        self.thumbnails = None  # Optional ThumbnailCache serving DecorationRole
 
     def rowCount(self, parent=QModelIndex()):
         return len(self.annotations)
@@ -40,25 +209,228 @@ class AnnotationListModel(QAbstractListModel):
         ann = self.annotations[index.row()]
         if role == Qt.ItemDataRole.DisplayRole:
             return f"[{ms_to_hms_ms(ann['position'])}] {ann['label']}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            # Only requested for visible rows, so thumbnails are decoded lazily
+            if self.thumbnails is not None and self.video_path:
+                return self.thumbnails.get(self.video_path, ann["position"])
+            return None
         if role == Qt.ItemDataRole.UserRole:
             return ann
         return None
 
-    def set_annotations(self, annotations):
+    def set_thumbnail_cache(self, thumbnails):
+        self.thumbnails = thumbnails
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def on_thumbnail_ready(self, video_path, position):
+        if video_path != self.video_path:
+            return
+        row = bisect_by(self.annotations, position, _position)
+        last = row
+        while last < len(self.annotations) and self.annotations[last]["position"] == position:
+            last += 1
+        if last > row:
+            self.dataChanged.emit(self.index(row), self.index(last - 1), [Qt.ItemDataRole.DecorationRole])
+
+    @telemetry.instrument("model.reset_annotations")
+    def set_annotations(self, annotations, video_path=None):
         self.beginResetModel()
-        self.annotations = annotations or []
+        self.annotations = annotations if annotations is not None else []
+        self.video_path = video_path
         self.endResetModel()
 
     def add_annotation(self, annotation):
-        idx = 0
-        while idx < len(self.annotations) and annotation["position"] > self.annotations[idx]["position"]:
-            idx += 1
+        """Insert annotation in chronological order and return its row."""
+        idx = bisect_by(self.annotations, annotation["position"], _position)
         self.beginInsertRows(QModelIndex(), idx, idx)
         self.annotations.insert(idx, annotation)
         self.endInsertRows()
         return idx
 
+    def insert_annotation(self, idx, annotation):
+        """Insert annotation at row idx, which must keep the list in chronological order."""
+        self.beginInsertRows(QModelIndex(), idx, idx)
+        self.annotations.insert(idx, annotation)
+        self.endInsertRows()
+
     def remove_annotation(self, idx):
         self.beginRemoveRows(QModelIndex(), idx, idx)
         del self.annotations[idx]
         self.endRemoveRows()
+
+    def set_label(self, idx, label):
+        """Set the label of the annotation at idx and return the previous one."""
+        annotation = self.annotations[idx]
+        old_label = annotation["label"]
+        annotation["label"] = label
+        self.dataChanged.emit(self.index(idx), self.index(idx))
+        return old_label
+
+    def move_annotation(self, idx, position):
+        """Set the position of the annotation at idx, move it to keep the list sorted and return its new row."""
+        annotation = self.annotations[idx]
+        annotation["position"] = position
+        new_idx = bisect_by(self.annotations, position, _position, skip=idx)
+        if new_idx != idx:
+            # Qt expects the destination row as it is before the move
+            destination = new_idx if new_idx < idx else new_idx + 1
+            self.beginMoveRows(QModelIndex(), idx, idx, QModelIndex(), destination)
+            _move_item(self.annotations, idx, new_idx)
+            self.endMoveRows()
+        self.dataChanged.emit(self.index(new_idx), self.index(new_idx))
+        return new_idx
+
+    def previous_row(self, position):
+        """Row of the last annotation before position (in ms), or None."""
+        row = bisect_by(self.annotations, position, _position)
+        return row - 1 if row > 0 else None
+
+    def next_row(self, position):
+        """Row of the first annotation after position (in ms), or None."""
+        row = bisect_by(self.annotations, position, _position, right=True)
+        return row if row < len(self.annotations) else None
+
+    def row_of(self, annotation):
+        """Return the row of annotation (compared by identity), or -1."""
+        position = annotation["position"]
+        row = bisect_by(self.annotations, position, _position)
+        while row < len(self.annotations) and self.annotations[row]["position"] == position:
+            if self.annotations[row] is annotation:
+                return row
+            row += 1
+        return -1
+
+
+class LabelListModel(QAbstractListModel):
+    """The labels of a LabelRegistry, for the label combo box, updated row by row."""
+
+    def __init__(self, registry=None):
+        super().__init__()
+        self.registry = registry if registry is not None else LabelRegistry()
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.registry)
+
+    def data(self, index, role):
+        if not index.isValid() or not (0 <= index.row() < len(self.registry)):
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return str(self.registry[index.row()])
+        if role == Qt.ItemDataRole.UserRole:
+            return self.registry.id_of(self.registry[index.row()])
+        return None
+
+    def set_labels(self, labels, table=None):
+        """Show labels (the project list, edited in place from now on), interned in table."""
+        self.beginResetModel()
+        self.registry.reset(labels, table)
+        self.endResetModel()
+
+    def insert_label(self, label, index=None):
+        """Insert label at index, or last, and return its row."""
+        row = len(self.registry) if index is None else max(0, min(index, len(self.registry)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.registry.insert(row, label)
+        self.endInsertRows()
+        return row
+
+    def remove_label(self, label):
+        """Remove label and return its former row."""
+        row = self.registry.index(label)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.registry.remove(label)
+        self.endRemoveRows()
+        return row
+
+    def replace_labels(self, labels):
+        """Replace all the labels; a rename only refreshes the rows that changed."""
+        old = list(self.registry)
+        if len(old) != len(labels):
+            self.beginResetModel()
+            self.registry.replace(labels)
+            self.endResetModel()
+            return
+        self.registry.replace(labels)
+        changed = [row for row, (a, b) in enumerate(zip(old, labels)) if a != b]
+        if changed:
+            self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+
+
+class LabelStatisticsModel(QAbstractTableModel):
+    """Table of the number of events and videos per label, read from DatasetStatistics."""
+    HEADERS = ("Label", "Events", "Share", "Videos")
+
+    def __init__(self, statistics=None):
+        super().__init__()
+        self.statistics = statistics if statistics is not None else DatasetStatistics()
+        self._rows = []  # (label, events, videos), in order of first appearance; the view sorts them
+        self._total = 0  # Total the Share column was computed with
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        label, events, videos = self._rows[index.row()]
+        total = self.statistics.total_events
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(label)
+            if column == 1:
+                return str(events)
+            if column == 2:
+                return f"{100 * events / total:.1f}%" if total else ""
+            return str(videos)
+        if role == Qt.ItemDataRole.UserRole:
+            # Raw values, used for sorting
+            return (str(label), events, events, videos)[column]
+        if role == Qt.ItemDataRole.TextAlignmentRole and column > 0:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def refresh(self):
+        """Re-read the label counts. Costs O(labels), whatever the number of events.
+
+        Rows keep their place: only the rows whose counts changed are
+        updated, and rows are inserted or removed only for labels that
+        appear or disappear, so the view keeps its selection and scroll.
+        """
+        label_events = self.statistics.label_events
+        label_videos = self.statistics.label_videos
+        for row in reversed(range(len(self._rows))):
+            if self._rows[row][0] not in label_events:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+        known = set()
+        changed = []
+        for row, (label, events, videos) in enumerate(self._rows):
+            known.add(label)
+            counts = (label, label_events[label], len(label_videos.get(label, ())))
+            if counts != (label, events, videos):
+                self._rows[row] = counts
+                changed.append(row)
+        total = self.statistics.total_events
+        if total != self._total:
+            # The share of every label changed
+            self._total = total
+            changed = range(len(self._rows))
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0), self.index(max(changed), len(self.HEADERS) - 1))
+        added = [(label, events, len(label_videos.get(label, ())))
+                 for label, events in label_events.items() if label not in known]
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(added) - 1)
+            self._rows.extend(added)
+            self.endInsertRows()
@@ -0,0 +1,397 @@
+"""Command-line tools to merge, split, summarize and export OSL JSON files.
+
+Runs without Qt, so it can be used on servers and in nightly pipelines:
+
+    python osl_visualizer/osl_batch.py stats data/*.json
+    python osl_visualizer/osl_batch.py merge a.json b.json -o merged.json
+    python osl_visualizer/osl_batch.py split all.json --by ratio --ratios 0.8 0.2 --names train test -o splits/
+    python osl_visualizer/osl_batch.py export data/*.json -o events.csv
+
+Files are processed by a pool of worker processes and results are printed
+as soon as each file is done.
+"""
+import os
+import re
+import sys
+import json
+import random
+import argparse
+import functools
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+
+from export import DEFAULT_FPS, export_events, export_format, iter_file_videos
+from osl_io import load_osl_json, encode_video, iter_osl_chunks, write_atomic
+from utils import relative_video_path, resolve_video_path
+
+
+# ---------- Helpers ----------
+
+def _imap(func, items, jobs, ordered=True):
+    """Map func over items in a pool of jobs processes, yielding results as they come."""
+    if jobs <= 1 or len(items) <= 1:
+        yield from map(func, items)
+        return
+    with multiprocessing.Pool(min(jobs, len(items))) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        yield from mapper(func, items)
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "unnamed"
+
+
+def rebase_video_paths(videos, src_dir, dst_dir):
+    """Rewrite relative video paths written next to src_dir so they resolve from dst_dir."""
+    if os.path.abspath(src_dir) == os.path.abspath(dst_dir):
+        return
+    for video in videos:
+        path = video.get("path")
+        if path and not os.path.isabs(path):
+            video["path"] = relative_video_path(resolve_video_path(path, src_dir), dst_dir)
+
+
+def write_osl(file_path, osl_data, indent=2):
+    """Write osl_data atomically, in the same format as the GUI."""
+    fragments = [encode_video(video, indent) for video in osl_data.get("videos", [])]
+    write_atomic(file_path, iter_osl_chunks(osl_data, fragments, indent))
+
+
+def _with_videos(osl_data, videos, labels=None):
+    """Return a copy of the top-level fields of osl_data with other videos (and labels)."""
+    result = {}
+    for key, value in osl_data.items():
+        if key == "videos":
+            result[key] = videos
+        elif key == "labels" and labels is not None:
+            result[key] = labels
+        else:
+            result[key] = value
+    result.setdefault("videos", videos)
+    if labels is not None:
+        result.setdefault("labels", labels)
+    return result
+
+
+def _count_events(videos):
+    return sum(len(video.get("annotations", [])) for video in videos)
+
+
+# ---------- Statistics ----------
+
+def file_stats(file_path):
+    """Per-label and per-video event counts of one OSL file."""
+    try:
+        osl_data = load_osl_json(file_path)
+    except (OSError, ValueError) as e:
+        return {"file": file_path, "error": str(e)}
+    labels = Counter()
+    per_video = []
+    for video in osl_data.get("videos", []):
+        annotations = video.get("annotations", [])
+        labels.update(ann.get("label") for ann in annotations)
+        per_video.append({"path": video.get("path", ""), "events": len(annotations)})
+    return {
+        "file": file_path,
+        "videos": len(per_video),
+        "events": sum(v["events"] for v in per_video),
+        "labels": dict(labels.most_common()),
+        "per_video": per_video,
+    }
+
+
+def _print_stats(stats, detail, out):
+    out.write(f"{stats['file']}: {stats['videos']} videos, {stats['events']} events, "
+              f"{len(stats['labels'])} labels\n")
+    if detail:
+        for label, count in stats["labels"].items():
+            out.write(f"  {count:>8}  {label}\n")
+        for video in stats["per_video"]:
+            out.write(f"  {video['events']:>8}  {video['path']}\n")
+
+
+def cmd_stats(args, out=sys.stdout):
+    total_labels = Counter()
+    total_videos = total_events = 0
+    errors = 0
+    for stats in _imap(file_stats, args.files, args.jobs, ordered=False):
+        if "error" in stats:
+            errors += 1
+            print(f"{stats['file']}: {stats['error']}", file=sys.stderr)
+            continue
+        if args.json:
+            out.write(json.dumps(stats, ensure_ascii=False) + "\n")
+        else:
+            _print_stats(stats, args.detail, out)
+        out.flush()
+        total_labels.update(stats["labels"])
+        total_videos += stats["videos"]
+        total_events += stats["events"]
+    total = {"files": len(args.files) - errors, "videos": total_videos, "events": total_events,
+             "labels": dict(total_labels.most_common())}
+    if args.json:
+        out.write(json.dumps({"total": total}, ensure_ascii=False) + "\n")
+    else:
+        out.write(f"Total: {total['files']} files, {total_videos} videos, {total_events} events\n")
+        for label, count in total["labels"].items():
+            out.write(f"  {count:>8}  {label}\n")
+    return 1 if errors else 0
+
+
+# ---------- Merge ----------
+
+def _load_rebased(task):
+    file_path, out_dir = task
+    osl_data = load_osl_json(file_path)
+    rebase_video_paths(osl_data.get("videos", []), os.path.dirname(os.path.abspath(file_path)), out_dir)
+    return file_path, osl_data
+
+
+def merge_osl(documents, duplicates="merge"):
+    """Merge loaded OSL documents into one.
+
+    Top-level fields come from the first document, labels are united in
+    order of appearance and videos are concatenated. A video path seen
+    twice has its annotations merged chronologically, is kept from the
+    first document (duplicates="first"), or raises ValueError
+    (duplicates="error").
+    """
+    merged = None
+    labels = []
+    seen_labels = set()
+    videos = []
+    videos_by_path = {}
+    for osl_data in documents:
+        if merged is None:
+            merged = _with_videos(osl_data, videos, labels)
+        for label in osl_data.get("labels", []):
+            if label not in seen_labels:
+                seen_labels.add(label)
+                labels.append(label)
+        for video in osl_data.get("videos", []):
+            path = video.get("path", "")
+            existing = videos_by_path.get(path)
+            if existing is None:
+                videos_by_path[path] = video
+                videos.append(video)
+            elif duplicates == "merge":
+                annotations = existing.setdefault("annotations", []) + video.get("annotations", [])
+                annotations.sort(key=lambda ann: ann["position"])
+                existing["annotations"] = annotations
+            elif duplicates == "error":
+                raise ValueError(f"Video '{path}' appears in several files")
+    if merged is None:
+        merged = {"videos": videos, "labels": labels}
+    merged["date"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return merged
+
+
+def cmd_merge(args, out=sys.stdout):
+    out_dir = os.path.dirname(os.path.abspath(args.output))
+    documents = []
+    tasks = [(file_path, out_dir) for file_path in args.files]
+    try:
+        for file_path, osl_data in _imap(_load_rebased, tasks, args.jobs):
+            videos = osl_data.get("videos", [])
+            out.write(f"{file_path}: {len(videos)} videos, {_count_events(videos)} events\n")
+            out.flush()
+            documents.append(osl_data)
+        merged = merge_osl(documents, args.duplicates)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    indent = None if args.compact else 2
+    # Videos are encoded in the pool, the main process only concatenates the fragments
+    encode = functools.partial(encode_video, indent=indent)
+    videos = merged["videos"]
+    if args.jobs > 1 and len(videos) > 1:
+        with multiprocessing.Pool(args.jobs) as pool:
+            fragments = pool.map(encode, videos, chunksize=max(1, len(videos) // (4 * args.jobs)))
+    else:
+        fragments = [encode(video) for video in videos]
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        write_atomic(args.output, iter_osl_chunks(merged, fragments, indent))
+    except OSError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    out.write(f"Wrote {args.output}: {len(videos)} videos, {_count_events(videos)} events, "
+              f"{len(merged.get('labels', []))} labels\n")
+    return 0
+
+
+# ---------- Split ----------
+
+def split_videos(videos, by, ratios=None, names=None, seed=0):
+    """Split videos into named groups.
+
+    by="video" makes one group per video, by="label" one group per label
+    (holding only the annotations with that label, videos without any are
+    left out) and by="ratio" shuffles the videos with seed and cuts them
+    according to ratios. Returns a list of ``(name, videos)``.
+    """
+    if by == "video":
+        groups = []
+        for video in videos:
+            stem = os.path.splitext(os.path.basename(video.get("path", "")))[0]
+            groups.append((stem, [video]))
+        return groups
+    if by == "label":
+        per_label = {}
+        for video in videos:
+            by_label = {}
+            for ann in video.get("annotations", []):
+                by_label.setdefault(ann.get("label"), []).append(ann)
+            for label, annotations in by_label.items():
+                copy = dict(video)
+                copy["annotations"] = annotations
+                per_label.setdefault(label, []).append(copy)
+        return [(str(label), group) for label, group in per_label.items()]
+    if by == "ratio":
+        ratios = ratios or [0.8, 0.2]
+        names = names or [f"part{i + 1}" for i in range(len(ratios))]
+        if len(names) != len(ratios):
+            raise ValueError("--names must have as many entries as --ratios")
+        order = list(range(len(videos)))
+        random.Random(seed).shuffle(order)
+        total = sum(ratios)
+        groups = []
+        start = 0
+        cumulative = 0.0
+        for i, (name, ratio) in enumerate(zip(names, ratios)):
+            cumulative += ratio
+            end = len(order) if i == len(ratios) - 1 else round(len(order) * cumulative / total)
+            # Keep the original order of the videos inside each part
+            groups.append((name, [videos[j] for j in sorted(order[start:end])]))
+            start = end
+        return groups
+    raise ValueError(f"Unknown split mode '{by}'")
+
+
+def split_file(task):
+    """Split one OSL file and write its parts. Returns ``(file, [(path, videos, events)], error)``."""
+    file_path, by, ratios, names, seed, out_dir, indent = task
+    try:
+        osl_data = load_osl_json(file_path)
+        videos = osl_data.get("videos", [])
+        rebase_video_paths(videos, os.path.dirname(os.path.abspath(file_path)), out_dir)
+        stem = _safe_name(os.path.splitext(os.path.basename(file_path))[0])
+        written = []
+        used = set()
+        for name, group in split_videos(videos, by, ratios, names, seed):
+            base = f"{stem}_{_safe_name(name)}"
+            out_name, n = base, 1
+            while out_name in used:
+                n += 1
+                out_name = f"{base}_{n}"
+            used.add(out_name)
+            labels = [name] if by == "label" else None
+            out_path = os.path.join(out_dir, out_name + ".json")
+            write_osl(out_path, _with_videos(osl_data, group, labels), indent)
+            written.append((out_path, len(group), _count_events(group)))
+        return file_path, written, None
+    except (OSError, ValueError) as e:
+        return file_path, [], str(e)
+
+
+def cmd_split(args, out=sys.stdout):
+    os.makedirs(args.output_dir, exist_ok=True)
+    out_dir = os.path.abspath(args.output_dir)
+    indent = None if args.compact else 2
+    tasks = [(file_path, args.by, args.ratios, args.names, args.seed, out_dir, indent) for file_path in args.files]
+    errors = 0
+    for file_path, written, error in _imap(split_file, tasks, args.jobs, ordered=False):
+        if error is not None:
+            errors += 1
+            print(f"{file_path}: {error}", file=sys.stderr)
+            continue
+        for out_path, n_videos, n_events in written:
+            out.write(f"{file_path} -> {out_path}: {n_videos} videos, {n_events} events\n")
+        out.flush()
+    return 1 if errors else 0
+
+
+# ---------- Export ----------
+
+def cmd_export(args, out=sys.stdout):
+    out_dir = os.path.dirname(os.path.abspath(args.output))
+    try:
+        fmt = args.format or export_format(args.output)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    def videos():
+        # Files are read one after the other and their videos streamed to the output
+        for file_path in args.files:
+            src_dir = os.path.dirname(os.path.abspath(file_path))
+            n_videos = 0
+            for video in iter_file_videos(file_path):
+                rebase_video_paths([video], src_dir, out_dir)
+                n_videos += 1
+                yield video
+            out.write(f"{file_path}: {n_videos} videos\n")
+            out.flush()
+
+    try:
+        n_rows = export_events(videos(), args.output, fmt, args.fields, default_fps=args.fps)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    out.write(f"Wrote {args.output}: {n_rows} events\n")
+    return 0
+
+
+# ---------- Entry point ----------
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Merge, split and summarize OSL JSON files without the GUI")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: number of CPUs)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats = subparsers.add_parser("stats", help="Per-label and per-video event counts")
+    stats.add_argument("files", nargs="+", help="OSL JSON files")
+    stats.add_argument("--detail", action="store_true", help="Also list label and video counts of every file")
+    stats.add_argument("--json", action="store_true", help="Print one JSON object per file (JSON lines)")
+    stats.set_defaults(func=cmd_stats)
+
+    merge = subparsers.add_parser("merge", help="Merge several OSL files into one")
+    merge.add_argument("files", nargs="+", help="OSL JSON files, top-level fields are taken from the first one")
+    merge.add_argument("--output", "-o", required=True, help="Merged OSL JSON file")
+    merge.add_argument("--duplicates", choices=("merge", "first", "error"), default="merge",
+                       help="What to do with a video present in several files (default: merge its annotations)")
+    merge.add_argument("--compact", action="store_true", help="Write compact JSON without indentation")
+    merge.set_defaults(func=cmd_merge)
+
+    split = subparsers.add_parser("split", help="Split OSL files by video, label or ratio")
+    split.add_argument("files", nargs="+", help="OSL JSON files, each one is split separately")
+    split.add_argument("--by", choices=("video", "label", "ratio"), required=True)
+    split.add_argument("--ratios", type=float, nargs="+", help="Relative sizes of the parts (default: 0.8 0.2)")
+    split.add_argument("--names", nargs="+", help="Names of the parts (default: part1, part2, ...)")
+    split.add_argument("--seed", type=int, default=0, help="Seed of the video shuffle for --by ratio")
+    split.add_argument("--output-dir", "-o", required=True, help="Directory for the resulting files")
+    split.add_argument("--compact", action="store_true", help="Write compact JSON without indentation")
+    split.set_defaults(func=cmd_split)
+
+    export = subparsers.add_parser("export", help="Export the annotations as one row per event (CSV or JSON lines)")
+    export.add_argument("files", nargs="+", help="OSL JSON files, exported one after the other")
+    export.add_argument("--output", "-o", required=True, help="Output file (.csv or .jsonl)")
+    export.add_argument("--format", choices=("csv", "jsonl"), help="Output format (default: from the extension)")
+    export.add_argument("--fields", nargs="+",
+                        help="Annotation fields written after video, position, frame, time and label (default: all)")
+    export.add_argument("--fps", type=float, default=DEFAULT_FPS,
+                        help="Frame rate of the videos that have none in the OSL file (default: %(default)s)")
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.jobs = max(1, args.jobs)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Reading and writing helpers for OSL JSON files.
+
+This module has no Qt dependency so it can be shared between the GUI and
+command-line tools.
+"""
+import os
+import re
+import json
+import tempfile
+
+from store import json_default
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _skip_ws(text, idx):
+    return _WHITESPACE.match(text, idx).end()
+
+
+def _expect(text, idx, chars, what):
+    """Return the delimiter found at idx (one of chars) and the next index."""
+    ch = text[idx:idx + 1]
+    if not ch or ch not in chars:
+        raise json.JSONDecodeError(f"Expecting {what}", text, idx)
+    return ch, idx + 1
+
+
+def iter_osl_json(text):
+    """Incrementally parse an OSL JSON document.
+
+    Yields ``(key, value, offset)`` tuples in document order, where offset
+    is the index in ``text`` right after the parsed item. Top-level fields
+    are yielded whole. The ``"videos"`` array is announced by a
+    ``("videos", None, offset)`` marker and its entries are then yielded one
+    at a time as ``("video", video, offset)``, so callers can consume videos
+    before the whole document has been decoded.
+    """
+    decode = _decoder.raw_decode
+    idx = _skip_ws(text, 0)
+    _, idx = _expect(text, idx, "{", "'{'")
+    idx = _skip_ws(text, idx)
+    if text[idx:idx + 1] == "}":
+        return
+    while True:
+        if text[idx:idx + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, idx)
+        key, idx = decode(text, idx)
+        idx = _skip_ws(text, idx)
+        _, idx = _expect(text, idx, ":", "':' delimiter")
+        idx = _skip_ws(text, idx)
+        if key == "videos" and text[idx:idx + 1] == "[":
+            yield "videos", None, idx
+            idx = _skip_ws(text, idx + 1)
+            if text[idx:idx + 1] == "]":
+                idx += 1
+            else:
+                while True:
+                    video, idx = decode(text, idx)
+                    yield "video", video, idx
+                    idx = _skip_ws(text, idx)
+                    ch, idx = _expect(text, idx, ",]", "',' delimiter")
+                    if ch == "]":
+                        break
+                    idx = _skip_ws(text, idx)
+        else:
+            value, idx = decode(text, idx)
+            yield key, value, idx
+        idx = _skip_ws(text, idx)
+        ch, idx = _expect(text, idx, ",}", "',' delimiter")
+        if ch == "}":
+            break
+        idx = _skip_ws(text, idx)
+
+
+def read_osl_text(file_path):
+    """Read an OSL JSON file into a string."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_osl_json(file_path):
+    """Load an OSL JSON file into a dict, preserving the top-level key order."""
+    osl_data = {}
+    for key, value, _ in iter_osl_json(read_osl_text(file_path)):
+        if key == "videos":
+            osl_data["videos"] = []
+        elif key == "video":
+            osl_data["videos"].append(value)
+        else:
+            osl_data[key] = value
+    return osl_data
+
+
+# ---------- Writing ----------
+
+def _dumps(value, indent):
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"), default=json_default)
+    return json.dumps(value, indent=indent, default=json_default)
+
+
+_RAW_PLACEHOLDER = "\x00osl-raw-annotations\x00"
+
+
+def encode_video(video, indent=2):
+    """Encode one video entry exactly as it appears inside the "videos" array.
+
+    Lazy annotations that were never parsed are copied from their source
+    file as they are, instead of being parsed and encoded again.
+    """
+    annotations = video.get("annotations")
+    raw = annotations.raw_json() if hasattr(annotations, "raw_json") and not annotations.is_loaded() else None
+    if raw is not None:
+        video = dict(video)
+        video["annotations"] = _RAW_PLACEHOLDER
+        return encode_video(video, indent).replace(json.dumps(_RAW_PLACEHOLDER), raw, 1)
+    text = _dumps(video, indent)
+    if indent is None:
+        return text
+    return text.replace("\n", "\n" + " " * (2 * indent))
+
+
+def iter_osl_chunks(osl_data, fragments, indent=2):
+    """Yield the text of osl_data, using pre-encoded fragments for its videos.
+
+    ``fragments`` are the encode_video() strings of ``osl_data["videos"]``,
+    in the same order. The output is identical to json.dump(osl_data,
+    indent=indent), or to a compact dump when indent is None.
+    """
+    if not osl_data:
+        yield "{}"
+        return
+    if indent is None:
+        newline, pad, item_pad, colon = "", "", "", ":"
+    else:
+        newline, pad, item_pad, colon = "\n", " " * indent, " " * (2 * indent), ": "
+    yield "{" + newline
+    for i, (key, value) in enumerate(osl_data.items()):
+        if i:
+            yield "," + newline
+        yield pad + json.dumps(key) + colon
+        if key == "videos" and isinstance(value, list):
+            if not fragments:
+                yield "[]"
+                continue
+            yield "[" + newline
+            for j, fragment in enumerate(fragments):
+                yield ("," + newline if j else "") + item_pad + fragment
+            yield newline + pad + "]"
+        else:
+            text = _dumps(value, indent)
+            yield text.replace("\n", "\n" + pad) if indent is not None else text
+    yield newline + "}"
+
+
+def write_atomic(file_path, chunks, binary=False, replace=os.replace):
+    """Write text chunks (bytes chunks if binary) to file_path through a temporary file and an atomic rename.
+
+    The target is either left untouched or fully replaced, never truncated.
+    ``replace(tmp_path, file_path)`` does the rename.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".osl-", suffix=".tmp", dir=directory)
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+        replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class FragmentCache:
+    """Cache of encoded video fragments, invalidated per video on edit.
+
+    Every video has a version that is bumped by invalidate(). A fragment
+    encoded from an older version is never stored, so fragments produced
+    by a background save cannot overwrite newer edits.
+    """
+
+    def __init__(self):
+        self._entries = {}  # id(video) -> [video, version, indent, fragment]
+
+    def _entry(self, video):
+        entry = self._entries.get(id(video))
+        if entry is None or entry[0] is not video:
+            entry = [video, 0, None, None]
+            self._entries[id(video)] = entry
+        return entry
+
+    def version(self, video):
+        return self._entry(video)[1]
+
+    def invalidate(self, video):
+        entry = self._entry(video)
+        entry[1] += 1
+        entry[3] = None
+
+    def discard(self, video):
+        entry = self._entries.get(id(video))
+        if entry is not None and entry[0] is video:
+            del self._entries[id(video)]
+
+    def clear(self):
+        self._entries.clear()
+
+    def get(self, video, indent):
+        entry = self._entries.get(id(video))
+        if entry is not None and entry[0] is video and entry[2] == indent:
+            return entry[3]
+        return None
+
+    def put(self, video, version, indent, fragment):
+        entry = self._entry(video)
+        if entry[1] == version:
+            entry[2] = indent
+            entry[3] = fragment
@@ -0,0 +1,210 @@
+"""Background checks of the availability of video files.
+
+On network file systems a single ``os.path.exists`` can block for a long
+time, so the GUI never checks video files itself. ``PathValidator`` checks
+them in a pool of worker threads right after a project is loaded, caches
+the results, and reports them in batches so the video list can mark the
+missing files. The folders holding the videos are watched, and a change in
+one of them re-checks only the videos of that folder.
+
+A check that hangs never blocks the GUI: stopping does not wait for the
+worker threads, and results of checks started before a stop are dropped.
+"""
+import os
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from PyQt6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+
+from telemetry import telemetry
+
+MAX_WORKERS = 16  # Concurrent checks; network file systems answer them in parallel
+MAX_WATCHED_DIRS = 1000
+CLOSE_WAIT_MS = 2000  # Checks stop within their batch interval, this only bounds the wait on exit
+RECHECK_DELAY_MS = 500  # Folder changes are gathered for this long before re-checking
+
+
+def path_available(path):
+    """Return True if path is an existing regular file."""
+    return os.path.isfile(path)
+
+
+class PathCheckThread(QThread):
+    """Check a list of files in a thread pool.
+
+    ``paths`` is a list of ``(key, absolute_path)`` pairs. The existing
+    folders among those of the files are emitted first through
+    ``folders_signal``, then results are emitted in batches through
+    ``checked_signal`` as a list of ``(key, absolute_path, available)`` triples.
+
+    The thread stops within ``batch_interval`` of request_stop(), even if
+    some checks hang: the pool is shut down without waiting for them.
+    """
+    folders_signal = pyqtSignal(object)
+    checked_signal = pyqtSignal(object)
+
+    def __init__(self, paths, max_workers=MAX_WORKERS, batch_interval=0.2):
+        super().__init__()
+        self.paths = paths
+        self.max_workers = max_workers
+        self.batch_interval = batch_interval
+        self._stop_requested = False
+
+    def request_stop(self):
+        self._stop_requested = True
+
+    def _completed(self, futures):
+        """Yield futures as they complete, until all are done or a stop is requested."""
+        pending = set(futures)
+        while pending and not self._stop_requested:
+            done, pending = wait(pending, timeout=self.batch_interval, return_when=FIRST_COMPLETED)
+            yield from done
+
+    def run(self):
+        started = time.perf_counter()
+        batch = []
+        last_emit = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            folders = {executor.submit(os.path.isdir, folder): folder
+                       for folder in {os.path.dirname(path) for _, path in self.paths}}
+            existing = [folders[future] for future in self._completed(folders) if future.result()]
+            if self._stop_requested:
+                return
+            self.folders_signal.emit(existing)
+            futures = {executor.submit(path_available, path): (key, path) for key, path in self.paths}
+            for future in self._completed(futures):
+                key, path = futures[future]
+                try:
+                    available = future.result()
+                except OSError:
+                    available = False
+                batch.append((key, path, available))
+                now = time.monotonic()
+                if now - last_emit >= self.batch_interval:
+                    self.checked_signal.emit(batch)
+                    batch = []
+                    last_emit = now
+            if self._stop_requested:
+                return
+        finally:
+            # Checks blocked on an unreachable share are left to finish on their own
+            executor.shutdown(wait=False, cancel_futures=True)
+        if batch:
+            self.checked_signal.emit(batch)
+        telemetry.record("path_check", time.perf_counter() - started)
+        telemetry.count("path_check.files", len(self.paths))
+
+
+class PathValidator(QObject):
+    """Availability of the video files of a project, checked in the background and kept current.
+
+    availability_changed is emitted with a list of ``(key, available)`` pairs
+    whenever files have been checked.
+    """
+    availability_changed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._available = {}  # absolute path -> bool
+        self._keys = {}  # absolute path -> set of keys (video paths as written in the project)
+        self._dirs = {}  # folder -> set of absolute paths of the videos it holds
+        self._threads = set()
+        self._generation = 0  # Bumped by stop(); results of checks started before are dropped
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._changed_dirs = set()
+        self._recheck_timer = QTimer(self)
+        self._recheck_timer.setSingleShot(True)
+        self._recheck_timer.setInterval(RECHECK_DELAY_MS)
+        self._recheck_timer.timeout.connect(self._recheck_changed_dirs)
+
+    def is_available(self, path):
+        """Cached availability of the file at path: True, False, or None if not checked yet."""
+        return self._available.get(path)
+
+    def validate(self, paths):
+        """Check a list of ``(key, absolute_path)`` pairs in the background and watch their folders."""
+        if not paths:
+            return
+        for key, path in paths:
+            self._keys.setdefault(path, set()).add(key)
+            folder = os.path.dirname(path)
+            self._dirs.setdefault(folder, set()).add(path)
+        self._start(paths)
+
+    def clear(self):
+        """Forget every file, when another project is loaded."""
+        self.stop()
+        self._available.clear()
+        self._keys.clear()
+        self._dirs.clear()
+        self._changed_dirs.clear()
+        self._recheck_timer.stop()
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+
+    def stop(self, wait_ms=0):
+        """Ask the running checks to stop and drop their results, without waiting for them.
+
+        Closing the application passes wait_ms, the longest time to wait for
+        every thread to end: Qt aborts if a running thread is deleted.
+        """
+        self._generation += 1
+        for thread in list(self._threads):
+            thread.request_stop()
+            if wait_ms:
+                thread.wait(wait_ms)
+
+    def _is_current(self, thread):
+        return thread in self._threads and thread.generation == self._generation
+
+    def _on_folders(self, folders):
+        """Watch the existing folders of the checked files (missing folders cannot be watched)."""
+        if not self._is_current(self.sender()):
+            return
+        watched = set(self._watcher.directories())
+        room = MAX_WATCHED_DIRS - len(watched)
+        folders = [folder for folder in folders if folder not in watched and folder in self._dirs][:max(room, 0)]
+        if folders:
+            self._watcher.addPaths(folders)
+
+    def _start(self, paths):
+        thread = PathCheckThread(paths)
+        thread.generation = self._generation
+        thread.folders_signal.connect(self._on_folders)
+        thread.checked_signal.connect(self._on_checked)
+        thread.finished.connect(lambda: self._threads.discard(thread))
+        self._threads.add(thread)
+        thread.start()
+
+    def _on_checked(self, batch):
+        if not self._is_current(self.sender()):
+            return  # Results of a check started before stop() or clear()
+        changed = []
+        for key, path, available in batch:
+            if path not in self._keys:
+                continue
+            if self._available.get(path) != available:
+                self._available[path] = available
+                changed.extend((k, available) for k in self._keys[path])
+        if changed:
+            self.availability_changed.emit(changed)
+            missing = sum(1 for _, available in changed if not available)
+            if missing:
+                logging.warning(f"{missing} video file(s) not found.")
+
+    def _on_directory_changed(self, folder):
+        self._changed_dirs.add(folder)
+        self._recheck_timer.start()
+
+    def _recheck_changed_dirs(self):
+        paths = []
+        for folder in self._changed_dirs:
+            for path in self._dirs.get(folder, ()):
+                paths.append((min(self._keys[path]), path))  # Results are reported for all keys of the path
+        self._changed_dirs.clear()
+        if paths:
+            telemetry.count("path_check.rechecks")
+            self._start(paths)
@@ -0,0 +1,118 @@
+"""Pool of media players keeping the neighbouring videos open.
+
+Opening a video (probing the container, starting the demuxer and the
+decoder) takes a noticeable time on long files, and reviewers usually go
+through the videos in list order. ``PlayerPool`` keeps, next to the player
+shown in the window, up to ``size`` warm players that have already opened
+the videos around the current one. Switching to one of them only moves the
+video and audio outputs over, so it is instant.
+
+Warm players are kept in least-recently-used order; preloading another
+video reuses the oldest one, so memory stays bounded by the pool size.
+"""
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+from PyQt6.QtMultimedia import QMediaPlayer
+
+from telemetry import telemetry
+
+DEFAULT_POOL_SIZE = 2
+
+
+class PlayerPool(QObject):
+    """The active QMediaPlayer, attached to the outputs, and warm players keyed by video path.
+
+    player_changed(old, new) is emitted when another player becomes active,
+    so signal connections can be moved to it.
+    """
+    player_changed = pyqtSignal(object, object)
+
+    def __init__(self, video_output, audio_output, size=DEFAULT_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.video_output = video_output
+        self.audio_output = audio_output
+        self.size = max(0, size)
+        self._warm = OrderedDict()  # path -> QMediaPlayer, least recently used first
+        self.active = QMediaPlayer(self)
+        self.active.setVideoOutput(video_output)
+        self.active.setAudioOutput(audio_output)
+        self._active_path = None
+
+    def is_warm(self, path):
+        return path == self._active_path or path in self._warm
+
+    def open(self, path):
+        """Make a player showing the video at path active and return it."""
+        if path == self._active_path:
+            return self.active
+        player = self._warm.pop(path, None)
+        if player is None:
+            telemetry.count("player_pool.miss")
+            if self.size == 0:
+                self.active.setSource(QUrl.fromLocalFile(path))
+                self._active_path = path
+                return self.active
+            player = self._spare_player()
+            player.setSource(QUrl.fromLocalFile(path))
+        else:
+            telemetry.count("player_pool.hit")
+            if player.position() != 0:
+                player.setPosition(0)
+        old = self.active
+        old.pause()
+        old.setVideoOutput(None)
+        old.setAudioOutput(None)
+        if self._active_path is not None:
+            # The video that was just left is a neighbour of the new one: keep it warm
+            self._warm[self._active_path] = old
+        else:
+            old.deleteLater()
+        player.setVideoOutput(self.video_output)
+        player.setAudioOutput(self.audio_output)
+        self.active = player
+        self._active_path = path
+        self._trim()
+        self.player_changed.emit(old, player)
+        return player
+
+    def preload(self, paths):
+        """Open the videos at paths in warm players, in order of priority, up to the pool size."""
+        for path in reversed(paths[:self.size]):
+            if path == self._active_path:
+                continue
+            if path in self._warm:
+                self._warm.move_to_end(path)
+                continue
+            player = self._spare_player()
+            player.setSource(QUrl.fromLocalFile(path))  # Opens the file in the background
+            self._warm[path] = player
+            telemetry.count("player_pool.preload")
+            self._trim()
+
+    def set_size(self, size):
+        self.size = max(0, size)
+        self._trim()
+
+    def clear(self):
+        """Stop the active player and close every video."""
+        self.active.stop()
+        self.active.setSource(QUrl())
+        self._active_path = None
+        self._trim(0)
+
+    def _spare_player(self):
+        """A player to open another video with: the least recently used warm one, or a new one."""
+        if self._warm and len(self._warm) >= self.size:
+            _, player = self._warm.popitem(last=False)
+            player.stop()
+            return player
+        return QMediaPlayer(self)
+
+    def _trim(self, size=None):
+        size = self.size if size is None else size
+        while len(self._warm) > size:
+            _, player = self._warm.popitem(last=False)
+            player.stop()
+            player.setSource(QUrl())
+            player.deleteLater()
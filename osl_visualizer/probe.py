@@ -0,0 +1,158 @@
+"""Video metadata probing (FPS, frame count, duration, resolution) with an on-disk cache."""
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from osl_io import write_atomic
+
+DEFAULT_FPS = 25.0
+
+
+def probe_video(path):
+    """Read the metadata of a video file with OpenCV.
+
+    Returns a dict with fps, frame_count, duration_ms, width and height
+    (values the container does not report are None). Raises ImportError
+    when OpenCV is not installed and OSError when the file cannot be opened.
+    """
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise OSError(f"Cannot open video: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or None
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None
+    finally:
+        cap.release()
+    duration_ms = int(frame_count * 1000 / fps) if fps and frame_count else None
+    return {
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration_ms": duration_ms,
+        "width": width,
+        "height": height,
+    }
+
+
+def _file_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class MediaProbeCache:
+    """Persistent cache of probe results, keyed by absolute path, size and mtime."""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, path):
+        """Return the cached info for path, or None if missing or stale."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            size, mtime_ns = _file_key(path)
+        except OSError:
+            return None
+        if entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        return entry["info"]
+
+    def peek(self, path):
+        """Return the cached info for path without checking the file on disk."""
+        entry = self._entries.get(path)
+        return entry["info"] if entry is not None else None
+
+    def put(self, path, info):
+        size, mtime_ns = _file_key(path)
+        with self._lock:
+            self._entries[path] = {"size": size, "mtime_ns": mtime_ns, "info": info}
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            text = json.dumps(self._entries)
+            self._dirty = False
+        write_atomic(self.cache_file, [text])
+
+
+class MediaProbeThread(QThread):
+    """Probe a list of videos in the background, skipping the ones already cached.
+
+    ``paths`` is a list of ``(key, absolute_path)`` pairs; results are emitted
+    in batches through ``probed_signal`` as a list of ``(key, info)`` pairs.
+
+    Videos are probed in a worker thread, so the thread stops within
+    ``batch_interval`` of request_stop() even if opening a file hangs.
+    """
+    probed_signal = pyqtSignal(object)
+
+    def __init__(self, cache, paths, batch_interval=0.2):
+        super().__init__()
+        self.cache = cache
+        self.paths = paths
+        self.batch_interval = batch_interval
+        self._stop_requested = False
+
+    def request_stop(self):
+        self._stop_requested = True
+
+    def _probe(self, executor, path):
+        """probe_video(path) run in executor, or None if a stop is requested first."""
+        future = executor.submit(probe_video, path)
+        while not self._stop_requested:
+            if wait([future], timeout=self.batch_interval).done:
+                return future.result()
+        return None
+
+    def run(self):
+        batch = []
+        last_emit = 0.0
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            for key, path in self.paths:
+                if self._stop_requested:
+                    break
+                info = self.cache.get(path)
+                if info is None:
+                    try:
+                        info = self._probe(executor, path)
+                    except ImportError:
+                        logging.warning("OpenCV is not installed, video metadata cannot be probed.")
+                        break
+                    except OSError:
+                        continue  # Missing or unreadable file
+                    if info is None:
+                        break
+                    self.cache.put(path, info)
+                batch.append((key, info))
+                now = time.monotonic()
+                if now - last_emit >= self.batch_interval:
+                    self.probed_signal.emit(batch)
+                    batch = []
+                    last_emit = now
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)  # A hung probe finishes on its own
+        if batch:
+            self.probed_signal.emit(batch)
+        try:
+            self.cache.save()
+        except OSError as e:
+            logging.warning(f"Could not write media probe cache: {e}")
@@ -0,0 +1,49 @@
+"""Startup profiling, enabled with ``main.py --profile-startup``.
+
+Modules call ``startup.mark(phase)`` at the end of each startup phase; the
+time elapsed since the previous mark is attributed to that phase. Marks are
+no-ops unless the profiler was enabled, so they can stay in the code.
+"""
+import sys
+import time
+
+
+class StartupProfiler:
+    """Wall-clock time of the consecutive phases of the application startup."""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = []  # (phase, seconds)
+        self._start = self._last = time.perf_counter()
+
+    def enable(self, start=None):
+        """Start profiling; start is the perf_counter() value the first phase is measured from."""
+        self.enabled = True
+        self.phases = []
+        self._start = self._last = start if start is not None else time.perf_counter()
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self._start
+
+    def report(self, stream=None):
+        """Print the per-phase breakdown."""
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        total = self.total()
+        width = max([len(phase) for phase, _ in self.phases] + [5])
+        print("Startup profile:", file=stream)
+        for phase, seconds in self.phases:
+            share = seconds / total * 100 if total > 0 else 0.0
+            print(f"  {phase:<{width}}  {seconds * 1000:8.1f} ms  {share:5.1f}%", file=stream)
+        print(f"  {'total':<{width}}  {total * 1000:8.1f} ms", file=stream)
+
+
+startup = StartupProfiler()
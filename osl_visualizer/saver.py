@@ -0,0 +1,143 @@
+import logging
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from bincache import CacheBuilder, cache_path, file_signature
+from export import ExportCancelled, export_events
+from lazy import replace_source, write_index
+from osl_io import encode_video, iter_osl_chunks, write_atomic
+
+
+class OslSaveThread(QThread):
+    """Write an OSL JSON file in the background.
+
+    ``entries`` lists ``(video, version, fragment)`` for every video of
+    ``osl_data``, where fragment is the cached encoding of the video or None
+    when it has to be re-encoded. Newly encoded fragments are available in
+    ``encoded`` once the thread has finished, so the caller can cache them.
+    The file is replaced atomically.
+
+    When ``cache`` is True, a binary cache of the saved file is then built
+    and written next to it as ``cache_file``. It is only staged: the caller
+    moves it in place if nothing was edited while the thread was running.
+
+    Lazily loaded videos that still read their annotations from the file
+    are moved to the new file when it replaces the old one, and the index
+    of the new file is written.
+    """
+    finished_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, file_path, osl_data, entries, indent=2, cache=False):
+        super().__init__()
+        self.file_path = file_path
+        self.osl_data = osl_data
+        self.entries = entries
+        self.indent = indent
+        self.cache = cache
+        self.cache_file = None
+        self.encoded = []
+        self.error = None
+
+    def run(self):
+        try:
+            self._write(self.file_path, self.osl_data, self.entries)
+        except Exception as e:
+            self.error = str(e)
+            self.error_signal.emit(self.error)
+            return
+        if self.cache:
+            self._stage_cache()
+        self.finished_signal.emit(self.file_path)
+
+    def _write(self, file_path, osl_data, entries):
+        fragments = []
+        for video, version, fragment in entries:
+            if fragment is None:
+                fragment = encode_video(video, self.indent)
+                self.encoded.append((video, version, fragment))
+            fragments.append(fragment)
+        videos = [video for video, _, _ in entries]
+        write_atomic(file_path, iter_osl_chunks(osl_data, fragments, self.indent),
+                     replace=lambda tmp_path, path: self._replace(tmp_path, path, videos))
+
+    def _replace(self, tmp_path, file_path, videos):
+        index = replace_source(tmp_path, file_path, videos)
+        if index is not None:
+            try:
+                write_index(file_path, index)
+            except OSError as e:
+                logging.warning(f"Could not write the lazy loading index of {file_path}: {e}")
+
+    def _stage_cache(self):
+        try:
+            builder = CacheBuilder()
+            builder.add_videos(self.osl_data.get("videos", []))
+            fields = {key: (None if key == "videos" else value) for key, value in self.osl_data.items()}
+            staged = cache_path(self.file_path) + ".new"
+            builder.write(staged, fields, file_signature(self.file_path))
+            self.cache_file = staged
+        except Exception as e:  # The annotations may be edited concurrently; the cache is optional
+            logging.warning(f"Could not build the binary cache: {e}")
+
+
+class ShardedSaveThread(OslSaveThread):
+    """Write the modified shards of a sharded project in the background.
+
+    ``jobs`` lists ``(file_path, osl_data, entries)`` for every shard to
+    write, as planned by ShardedProject.plan_save(); entries are as for
+    OslSaveThread. ``file_path`` is the folder or manifest of the project.
+    Each shard is replaced atomically; no binary cache is written.
+    """
+
+    def __init__(self, file_path, jobs, indent=2):
+        super().__init__(file_path, None, [], indent)
+        self.jobs = jobs
+
+    def run(self):
+        try:
+            for file_path, osl_data, entries in self.jobs:
+                self._write(file_path, osl_data, entries)
+        except Exception as e:
+            self.error = str(e)
+            self.error_signal.emit(self.error)
+            return
+        self.finished_signal.emit(self.file_path)
+
+
+class ExportThread(QThread):
+    """Export annotations to a CSV or JSON lines file in the background (see export.py).
+
+    ``paths`` and ``fps`` map id(video) to the path and frame rate to
+    write, so the thread does not need any GUI state. finished_signal
+    carries the output path and the number of exported events.
+    """
+    finished_signal = pyqtSignal(str, int)
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, file_path, videos, paths=None, fps=None, fmt=None):
+        super().__init__()
+        self.file_path = file_path
+        self.videos = videos
+        self.paths = paths or {}
+        self.fps = fps or {}
+        self.fmt = fmt
+        self._stop_requested = False
+
+    def request_stop(self):
+        self._stop_requested = True
+
+    def run(self):
+        try:
+            n_rows = export_events(self.videos, self.file_path, self.fmt,
+                                   path_of=lambda video: self.paths.get(id(video), video.get("path", "")),
+                                   fps_of=lambda video: self.fps.get(id(video)),
+                                   should_stop=lambda: self._stop_requested)
+        except ExportCancelled:
+            self.cancelled_signal.emit()
+            return
+        except Exception as e:
+            self.error_signal.emit(str(e))
+            return
+        self.finished_signal.emit(self.file_path, n_rows)
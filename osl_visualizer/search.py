@@ -0,0 +1,159 @@
+"""Search index and filter proxy for the video list.
+
+``VideoIndex`` keeps the lower-cased path of every video and looks labels up
+in the inverted label -> videos index of the video model's
+DatasetStatistics, which is updated incrementally when annotations are
+added, removed or relabeled. Filtering therefore never rescans annotation
+lists.
+
+Filter text is made of space-separated terms that must all match. A plain
+term matches a substring of the video path (case-insensitive), and a
+``label:`` term (``label:goal``, ``label:"Red card"``) matches videos having
+at least one annotation whose label contains the text.
+"""
+import shlex
+
+from PyQt6.QtCore import QSortFilterProxyModel
+
+from stats import DatasetStatistics
+
+LABEL_PREFIX = "label:"
+
+
+class VideoQuery:
+    """Parsed filter text: path substrings and, per label term, the labels it matches."""
+
+    def __init__(self, path_terms, label_sets):
+        self.path_terms = path_terms
+        self.label_sets = label_sets
+
+    def is_empty(self):
+        return not self.path_terms and not self.label_sets
+
+
+class VideoIndex:
+    """Lower-cased paths of a list of videos, keyed by identity, and their label statistics."""
+
+    def __init__(self, statistics=None):
+        self.statistics = statistics if statistics is not None else DatasetStatistics()
+        self._paths = {}  # id(video) -> lower-cased path
+
+    def __len__(self):
+        return len(self._paths)
+
+    @property
+    def label_videos(self):
+        return self.statistics.label_videos
+
+    def rebuild(self, videos):
+        self._paths = {id(video): video.get("path", "").lower() for video in videos}
+
+    def add_video(self, video):
+        self._paths[id(video)] = video.get("path", "").lower()
+
+    def remove_video(self, video):
+        self._paths.pop(id(video), None)
+
+    def parse(self, text):
+        """Parse filter text into a VideoQuery."""
+        try:
+            terms = shlex.split(text)
+        except ValueError:
+            terms = text.split()  # Unbalanced quote while the user is typing
+        path_terms = []
+        label_sets = []
+        for term in terms:
+            if term.lower().startswith(LABEL_PREFIX):
+                needle = term[len(LABEL_PREFIX):].lower()
+                if needle:
+                    label_sets.append({label for label in self.label_videos if needle in str(label).lower()})
+            elif term:
+                path_terms.append(term.lower())
+        return VideoQuery(path_terms, label_sets)
+
+    def matches(self, video, query):
+        key = id(video)
+        path = self._paths.get(key)
+        if path is None:
+            return query.is_empty()
+        if not all(term in path for term in query.path_terms):
+            return False
+        for labels in query.label_sets:
+            if not any(key in self.label_videos[label] for label in labels if label in self.label_videos):
+                return False
+        return True
+
+    def search(self, query):
+        """Return the set of id(video) matching query.
+
+        Label terms are resolved first through the inverted index, so path
+        terms are only checked on the videos having the requested labels.
+        """
+        candidates = None
+        for labels in query.label_sets:
+            found = set()
+            for label in labels:
+                found |= self.label_videos.get(label, set())
+            candidates = found if candidates is None else candidates & found
+        if candidates is None:
+            candidates = self._paths.keys()
+        if not query.path_terms:
+            return set(candidates)
+        paths = self._paths
+        return {key for key in candidates if all(term in paths[key] for term in query.path_terms)}
+
+
+class VideoFilterProxyModel(QSortFilterProxyModel):
+    """Filters a VideoListModel with a VideoIndex that follows the model's rows.
+
+    The video model keeps the label statistics current before it emits its
+    row signals, so new rows are matched against up-to-date labels.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.video_index = VideoIndex()
+        self._query = VideoQuery([], [])
+        self._matches = None  # ids of the matching videos, None when not filtering
+
+    def setSourceModel(self, model):
+        # Connected before the proxy's own handlers so the index is current when rows are filtered
+        model.modelReset.connect(self._on_source_reset)
+        model.rowsInserted.connect(self._on_source_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_source_rows_removed)
+        self.video_index = VideoIndex(model.statistics)
+        self.video_index.rebuild(model.videos)
+        super().setSourceModel(model)
+
+    def _on_source_reset(self):
+        self.video_index.rebuild(self.sourceModel().videos)
+        if self._matches is not None:
+            self._matches = self.video_index.search(self._query)
+
+    def _on_source_rows_inserted(self, parent, first, last):
+        videos = self.sourceModel().videos
+        for row in range(first, last + 1):
+            video = videos[row]
+            self.video_index.add_video(video)
+            if self._matches is not None and self.video_index.matches(video, self._query):
+                self._matches.add(id(video))
+
+    def _on_source_rows_removed(self, parent, first, last):
+        videos = self.sourceModel().videos
+        for row in range(first, last + 1):
+            self.video_index.remove_video(videos[row])
+            if self._matches is not None:
+                self._matches.discard(id(videos[row]))
+
+    def set_filter_text(self, text):
+        self._query = self.video_index.parse(text)
+        self._matches = None if self._query.is_empty() else self.video_index.search(self._query)
+        self.invalidateFilter()
+
+    def is_filtering(self):
+        return self._matches is not None
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._matches is None:
+            return True
+        return id(self.sourceModel().videos[source_row]) in self._matches
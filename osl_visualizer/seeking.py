@@ -0,0 +1,135 @@
+"""Coalescing of media player seeks.
+
+Dragging on the timeline or holding a stepping key requests a new position
+many times per second, faster than the decoder of a long HD video can seek.
+``SeekScheduler`` keeps at most one seek in flight: positions requested
+meanwhile replace each other and only the latest one is sent to the player
+once the previous seek has landed. Positions shown by the timeline and the
+time label are throttled to a fixed rate.
+
+While the user drags on the timeline (a scrub), the scheduler can show an
+approximate preview: requested positions are snapped to a coarse grid and
+seeks are spaced further apart, then the exact position is sought when the
+mouse button is released.
+"""
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from telemetry import telemetry
+
+SEEK_INTERVAL_MS = 30  # Minimum time between two seeks
+SCRUB_INTERVAL_MS = 80  # Minimum time between two preview seeks while scrubbing
+SEEK_TIMEOUT_MS = 500  # A seek the player never reports is considered done after this delay
+UI_INTERVAL_MS = 40  # Minimum time between two position updates of the UI
+PREVIEW_GRID_MS = 200  # Positions previewed while scrubbing are multiples of this
+
+
+class SeekScheduler(QObject):
+    """Sends the seeks of a media player one at a time, keeping only the latest pending one.
+
+    get_player() returns the QMediaPlayer; the player's positionChanged
+    signal must be connected to on_player_position(). position_changed is
+    emitted, at most every UI_INTERVAL_MS, with the position to show.
+    """
+    position_changed = pyqtSignal(int)
+
+    def __init__(self, get_player, parent=None):
+        super().__init__(parent)
+        self._get_player = get_player
+        self.preview = True  # Approximate preview while scrubbing
+        self._target = None  # Position of the seek in flight
+        self._pending = None  # Latest position requested while a seek was in flight
+        self._reported = False  # The player reported a position since the seek in flight was sent
+        self._waited = 0
+        self._scrubbing = False
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.timeout.connect(self._on_seek_timer)
+        self._ui_position = None  # Position waiting for the UI throttle
+        self._ui_timer = QTimer(self)
+        self._ui_timer.setSingleShot(True)
+        self._ui_timer.setInterval(UI_INTERVAL_MS)
+        self._ui_timer.timeout.connect(self._flush_ui)
+
+    def position(self):
+        """The position the player is at, or will be at once the requested seeks are done.
+
+        Relative moves (stepping by a frame or a second) start from here, so
+        repeated steps add up even while the player is still seeking.
+        """
+        if self._pending is not None:
+            return self._pending
+        if self._target is not None:
+            return self._target
+        return self._get_player().position()
+
+    def is_busy(self):
+        return self._target is not None
+
+    def seek(self, position):
+        """Request a seek to position (in ms)."""
+        position = max(0, int(position))
+        if self._scrubbing and self.preview:
+            position = round(position / PREVIEW_GRID_MS) * PREVIEW_GRID_MS
+        telemetry.count("seek.requested")
+        if self._target is None:
+            self._send(position)
+        elif position != self._target:
+            if self._pending is not None:
+                telemetry.count("seek.coalesced")
+            self._pending = position
+        self._show(position)
+
+    def begin_scrub(self):
+        self._scrubbing = True
+
+    def end_scrub(self, position):
+        """End a scrub with an exact seek to position."""
+        self._scrubbing = False
+        self.seek(position)
+
+    def reset(self):
+        """Forget pending seeks, when the player switches to another video."""
+        self._seek_timer.stop()
+        self._target = None
+        self._pending = None
+        self._scrubbing = False
+
+    def on_player_position(self, position):
+        if self._target is not None:
+            # Positions reported while seeking would make the playhead jump back and forth
+            self._reported = True
+            return
+        self._show(position)
+
+    def _send(self, position):
+        self._target = position
+        self._reported = False
+        self._waited = 0
+        telemetry.count("seek.sent")
+        with telemetry.timed("seek"):
+            self._get_player().setPosition(position)
+        self._seek_timer.start(SCRUB_INTERVAL_MS if self._scrubbing and self.preview else SEEK_INTERVAL_MS)
+
+    def _on_seek_timer(self):
+        self._waited += self._seek_timer.interval()
+        if not self._reported and self._waited < SEEK_TIMEOUT_MS:
+            self._seek_timer.start()  # Wait for the player to report the seek
+            return
+        self._target = None
+        if self._pending is not None:
+            position, self._pending = self._pending, None
+            self._send(position)
+
+    def _show(self, position):
+        if self._ui_timer.isActive():
+            self._ui_position = position
+            return
+        self._ui_position = None
+        self.position_changed.emit(position)
+        self._ui_timer.start()
+
+    def _flush_ui(self):
+        if self._ui_position is not None:
+            position, self._ui_position = self._ui_position, None
+            self.position_changed.emit(position)
+            self._ui_timer.start()
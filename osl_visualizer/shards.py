@@ -0,0 +1,154 @@
+"""Projects made of several OSL JSON files (shards).
+
+Datasets are often distributed as one OSL JSON file per split or per
+competition. A folder of OSL JSON files, or a manifest listing them
+(``<name>.oslproj``, a JSON object ``{"shards": ["train.json", ...]}`` with
+paths relative to the manifest), is opened as one virtual project.
+
+Shards are read through their lazy loading index (see lazy.py), so opening
+the project only reads the video lists; the annotations of a shard are
+parsed when one of its videos is opened. Labels are the union of the labels
+of all shards, in order of first appearance.
+
+``ShardedProject`` remembers which shard every video belongs to and what
+each shard held when it was last loaded or saved, so a save only rewrites
+the shards whose videos, annotations or labels changed.
+"""
+import os
+import json
+
+MANIFEST_SUFFIX = ".oslproj"
+
+
+class ShardError(Exception):
+    """Raised when a folder or manifest does not describe a valid sharded project."""
+
+
+def is_sharded_path(path):
+    """Return True if path is a folder or a manifest of OSL JSON files."""
+    return os.path.isdir(path) or path.endswith(MANIFEST_SUFFIX)
+
+
+def shard_paths(path):
+    """Return the absolute paths of the shards of the folder or manifest at path."""
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path)
+                       if name.endswith(".json") and not name.startswith("."))
+        paths = [os.path.join(path, name) for name in names]
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except ValueError as e:
+            raise ShardError(f"Invalid manifest {path}: {e}")
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("shards"), list):
+            raise ShardError(f'Manifest {path} must be an object with a "shards" list')
+        base_dir = os.path.dirname(os.path.abspath(path))
+        paths = [os.path.normpath(os.path.join(base_dir, shard)) for shard in manifest["shards"]]
+    if not paths:
+        raise ShardError(f"No OSL JSON files in {path}")
+    return paths
+
+
+class Shard:
+    """One OSL JSON file of a sharded project."""
+
+    def __init__(self, file_path, fields):
+        self.file_path = file_path
+        self.base_dir = os.path.dirname(file_path)
+        self.fields = fields  # Top-level fields in document order, "videos" mapped to None
+        self.saved_ids = set()  # id() of the videos the file holds
+
+    @property
+    def name(self):
+        return os.path.basename(self.file_path)
+
+    def __repr__(self):
+        return f"<Shard {self.file_path}>"
+
+
+class ShardedProject:
+    """The shards of a project and the shard of every video."""
+
+    def __init__(self, root):
+        self.root = root  # Folder or manifest path
+        self.shards = []
+        self._shard_of = {}  # id(video) -> (video, shard); the video is kept so its id stays unique
+        self.saved_labels = []
+
+    def add_shard(self, file_path, fields, videos):
+        """Register a loaded shard and its videos."""
+        shard = Shard(file_path, fields)
+        self.shards.append(shard)
+        for video in videos:
+            self._shard_of[id(video)] = (video, shard)
+        shard.saved_ids = {id(video) for video in videos}
+        for label in fields.get("labels") or []:
+            if label not in self.saved_labels:
+                self.saved_labels.append(label)
+        return shard
+
+    def labels(self):
+        """Union of the labels of all shards."""
+        return list(self.saved_labels)
+
+    def shard_of(self, video):
+        entry = self._shard_of.get(id(video))
+        return entry[1] if entry is not None else None
+
+    def assign(self, video, shard=None):
+        """Put a new video in shard (the last shard by default). Videos already assigned keep their shard."""
+        if id(video) not in self._shard_of:
+            self._shard_of[id(video)] = (video, shard if shard is not None else self.shards[-1])
+
+    def base_dir(self, video):
+        """Folder the path of video is relative to: that of its shard."""
+        shard = self.shard_of(video)
+        return shard.base_dir if shard is not None else os.path.dirname(self.shards[-1].file_path)
+
+    def _shard_labels(self, shard, labels):
+        """The labels list shard should hold, given the current project labels."""
+        added = [label for label in labels if label not in self.saved_labels]
+        removed = set(self.saved_labels) - set(labels)
+        own = shard.fields.get("labels")
+        if own is None:
+            return added or None
+        return [label for label in own if label not in removed] + [label for label in added if label not in own]
+
+    def plan_save(self, videos, labels, modified_ids, date=None):
+        """Return ``(shard, osl_data)`` for every shard that has to be written.
+
+        A shard is written when a video was added to it or removed from it,
+        when one of its videos was modified (its id is in modified_ids), or
+        when its labels change. osl_data is a snapshot of the shard's
+        content in document order, ready for OslSaveThread.
+        """
+        members = {id(shard): [] for shard in self.shards}
+        for video in videos:
+            self.assign(video)  # Videos recovered from the journal have no shard yet
+            members[id(self.shard_of(video))].append(video)
+        plan = []
+        for shard in self.shards:
+            shard_videos = members[id(shard)]
+            ids = {id(video) for video in shard_videos}
+            shard_labels = self._shard_labels(shard, labels)
+            if (ids == shard.saved_ids and shard_labels == shard.fields.get("labels")
+                    and not any(key in modified_ids for key in ids)):
+                continue
+            osl_data = {}
+            for key, value in shard.fields.items():
+                osl_data[key] = shard_videos if key == "videos" else value
+            osl_data.setdefault("videos", shard_videos)
+            if shard_labels is not None:
+                osl_data["labels"] = shard_labels
+            if date is not None and "date" in osl_data:
+                osl_data["date"] = date
+            plan.append((shard, osl_data))
+        return plan
+
+    def mark_saved(self, saved, labels):
+        """Record that the shards of a plan were written. labels are the project labels at that time."""
+        for shard, osl_data in saved:
+            shard.saved_ids = {id(video) for video in osl_data["videos"]}
+            shard.fields = {key: (None if key == "videos" else value) for key, value in osl_data.items()}
+        self.saved_labels = list(labels)
@@ -0,0 +1,137 @@
+"""Dataset statistics maintained incrementally.
+
+``DatasetStatistics`` counts annotations per video and per label once when
+videos are added, then updates the counts in O(1) for every annotation
+added, removed or relabeled. Dataset-wide figures such as "events per label"
+are therefore read directly instead of being recomputed by scanning every
+annotation list.
+"""
+from collections import Counter
+
+
+def label_counts(annotations):
+    """Count the annotations of a list (or AnnotationStore, or LazyAnnotations) per label."""
+    if hasattr(annotations, "label_counter"):
+        return annotations.label_counter()  # Answered from the lazy index, without parsing
+    if hasattr(annotations, "label_ids"):
+        names = annotations.labels.names
+        return Counter({names[label_id]: count
+                        for label_id, count in Counter(annotations.label_ids().tolist()).items()})
+    return Counter(ann.get("label") for ann in annotations)
+
+
+class VideoStats:
+    """Annotation counts of one video."""
+    __slots__ = ("events", "labels")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.events = sum(labels.values())
+
+
+class DatasetStatistics:
+    """Per-video and per-label annotation counts of a project, keyed by video identity."""
+
+    def __init__(self):
+        self.videos = {}  # id(video) -> VideoStats
+        self.label_events = Counter()  # label -> number of annotations in the dataset
+        self.label_videos = {}  # label -> set of id(video) having that label
+        self.total_events = 0
+
+    def rebuild(self, videos):
+        self.videos.clear()
+        self.label_events.clear()
+        self.label_videos.clear()
+        self.total_events = 0
+        for video in videos:
+            self.add_video(video)
+
+    def add_video(self, video):
+        key = id(video)
+        if key in self.videos:
+            self.remove_video(video)
+        stats = VideoStats(label_counts(video.get("annotations", [])))
+        self.videos[key] = stats
+        self.label_events.update(stats.labels)
+        self.total_events += stats.events
+        for label in stats.labels:
+            self.label_videos.setdefault(label, set()).add(key)
+
+    def remove_video(self, video):
+        key = id(video)
+        stats = self.videos.pop(key, None)
+        if stats is None:
+            return
+        self.label_events.subtract(stats.labels)
+        self.total_events -= stats.events
+        for label in stats.labels:
+            self._drop_label_if_unused(label)
+            self._discard_video(label, key)
+
+    def refresh_video(self, video):
+        """Recount a video whose annotations were changed without the hooks below."""
+        self.add_video(video)
+
+    def annotation_added(self, video, label):
+        stats = self.videos.get(id(video))
+        if stats is None:
+            return
+        stats.labels[label] += 1
+        stats.events += 1
+        self.label_events[label] += 1
+        self.total_events += 1
+        if stats.labels[label] == 1:
+            self.label_videos.setdefault(label, set()).add(id(video))
+
+    def annotation_removed(self, video, label):
+        stats = self.videos.get(id(video))
+        if stats is None or stats.labels[label] <= 0:
+            return
+        stats.labels[label] -= 1
+        stats.events -= 1
+        self.label_events[label] -= 1
+        self.total_events -= 1
+        self._drop_label_if_unused(label)
+        if stats.labels[label] == 0:
+            del stats.labels[label]
+            self._discard_video(label, id(video))
+
+    def annotation_relabeled(self, video, old_label, new_label):
+        if old_label != new_label:
+            self.annotation_removed(video, old_label)
+            self.annotation_added(video, new_label)
+
+    def rename_label(self, old, new):
+        """Move the counts of old to new, after all the events of old were relabeled new.
+
+        Costs O(videos having old), however many events they hold.
+        """
+        events = self.label_events.pop(old, 0)
+        keys = self.label_videos.pop(old, set())
+        if events <= 0:
+            return
+        self.label_events[new] += events
+        self.label_videos.setdefault(new, set()).update(keys)
+        for key in keys:
+            labels = self.videos[key].labels
+            labels[new] += labels.pop(old)
+
+    def video_events(self, video):
+        """Number of annotations of video, or None if it is not counted."""
+        stats = self.videos.get(id(video))
+        return stats.events if stats is not None else None
+
+    def video_labels(self, video):
+        stats = self.videos.get(id(video))
+        return stats.labels if stats is not None else Counter()
+
+    def _drop_label_if_unused(self, label):
+        if self.label_events.get(label, 0) <= 0:
+            self.label_events.pop(label, None)
+
+    def _discard_video(self, label, key):
+        videos = self.label_videos.get(label)
+        if videos is not None:
+            videos.discard(key)
+            if not videos:
+                del self.label_videos[label]
@@ -0,0 +1,468 @@
+"""Compact, array-backed storage for annotations.
+
+An ``AnnotationStore`` behaves like the list of annotation dicts found in
+``osl_data["videos"][i]["annotations"]`` but keeps positions and label ids
+in NumPy arrays. Labels are interned in a shared ``LabelTable``, metadata is
+only stored for the events that have it, and other string fields (such as
+``gameTime`` or ``team``) are kept as ids into an interned string pool. The
+key order of every event is kept as an interned layout so the store converts
+back to the original OSL JSON without loss.
+"""
+import threading
+import weakref
+from collections.abc import MutableSequence
+
+import numpy as np
+
+_COLUMNAR_KEYS = ("position", "label", "metadata")
+_MIN_CAPACITY = 16
+_POSITION_RANGE = np.iinfo(np.int64)
+
+
+class LabelTable:
+    """Interns label strings and maps them to stable integer ids."""
+
+    def __init__(self, labels=()):
+        self.names = []
+        self.ids = {}
+        self._lock = threading.Lock()
+        for label in labels:
+            self.intern(label)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, label):
+        return label in self.ids
+
+    def intern(self, label):
+        """Return the id of label, adding it to the table if needed."""
+        label_id = self.ids.get(label)
+        if label_id is None:
+            with self._lock:
+                label_id = self.ids.get(label)
+                if label_id is None:
+                    label_id = len(self.names)
+                    self.names.append(label)
+                    self.ids[label] = label_id
+        return label_id
+
+    def name(self, label_id):
+        return self.names[label_id]
+
+    def rename(self, old, new):
+        """Give the id of old to new and return it.
+
+        Every store sharing the table then shows new for the events of old,
+        without any event being rewritten. new must not be interned yet.
+        """
+        with self._lock:
+            if new in self.ids:
+                raise ValueError(f"Label {new!r} is already in the table")
+            label_id = self.ids.pop(old)
+            self.names[label_id] = new
+            self.ids[new] = label_id
+        return label_id
+
+
+class AnnotationRow:
+    """Lightweight dict-like view of one annotation stored in an AnnotationStore.
+
+    Views are cached per slot, so looking up the same annotation twice returns
+    the same object and identity checks (``a is b``) keep working. A view of a
+    removed annotation is detached and keeps a private copy of its data.
+    """
+    __slots__ = ("_store", "_slot", "__weakref__")
+
+    def __init__(self, store, slot):
+        self._store = store
+        self._slot = slot
+
+    def __getitem__(self, key):
+        if self._store is None:
+            return self._slot[key]
+        return self._store._get_field(self._slot, key)
+
+    def __setitem__(self, key, value):
+        if self._store is None:
+            self._slot[key] = value
+        else:
+            self._store._set_field(self._slot, key, value)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        if self._store is None:
+            return tuple(self._slot)
+        return self._store._layout_of(self._slot)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        """Return the annotation as a plain OSL JSON dict."""
+        if self._store is None:
+            return dict(self._slot)
+        return self._store._slot_to_dict(self._slot)
+
+    def _detach(self):
+        self._slot = self._store._slot_to_dict(self._slot)
+        self._store = None
+
+    def __repr__(self):
+        return f"AnnotationRow({self.to_dict()!r})"
+
+
+class AnnotationStore(MutableSequence):
+    """List-compatible container of annotations backed by NumPy arrays."""
+
+    def __init__(self, annotations=(), labels=None):
+        self.labels = labels if labels is not None else LabelTable()
+        self._positions = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._label_ids = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._layout_ids = np.zeros(_MIN_CAPACITY, dtype=np.uint16)
+        self._order = np.zeros(_MIN_CAPACITY, dtype=np.int64)  # row -> slot
+        self._n_slots = 0
+        self._n_rows = 0
+        self._layouts = []
+        self._layout_index = {}
+        self._metadata = {}  # slot -> metadata dict, only for events that have one
+        self._str_columns = {}  # key -> int32 array of string pool ids (-1 when unset)
+        self._strings = []
+        self._string_ids = {}
+        self._extras = {}  # slot -> dict of values that fit no column
+        self._views = weakref.WeakValueDictionary()
+        self.extend(annotations)
+
+    # ---------- Construction / conversion ----------
+
+    @classmethod
+    def from_list(cls, annotations, labels=None):
+        """Build a store from a list of annotation dicts."""
+        return cls(annotations, labels)
+
+    def to_list(self):
+        """Return the annotations as a list of plain OSL JSON dicts."""
+        # Copy the row order first so a concurrent edit cannot shift it mid-way
+        return [self._slot_to_dict(slot) for slot in self._order[:self._n_rows].tolist()]
+
+    def nbytes(self):
+        """Approximate memory used by the columnar arrays."""
+        return (self._positions.nbytes + self._label_ids.nbytes + self._layout_ids.nbytes
+                + self._order.nbytes + sum(col.nbytes for col in self._str_columns.values()))
+
+    # ---------- Columnar access ----------
+
+    def positions(self):
+        """Return the positions of all rows, in row order, as an int64 array."""
+        return self._positions[self._order[:self._n_rows]]
+
+    def label_ids(self):
+        """Return the label ids of all rows, in row order, as an int32 array."""
+        return self._label_ids[self._order[:self._n_rows]]
+
+    def set_positions(self, positions):
+        """Set the positions of all rows at once from an array in row order.
+
+        The row order is kept, so the new positions must keep the rows sorted.
+        """
+        self._positions[self._order[:self._n_rows]] = positions
+        if self._extras:
+            self._drop_extras("position")
+
+    def relabel_rows(self, rows, label):
+        """Set the label of the given rows (an array of row indexes) at once."""
+        slots = self._order[:self._n_rows][rows]
+        self._label_ids[slots] = self.labels.intern(label)
+        if self._extras:
+            self._drop_extras("label", set(slots.tolist()))
+
+    def delete_rows(self, rows):
+        """Remove the given rows (an array of row indexes) in one pass."""
+        order = self._order[:self._n_rows]
+        for slot in order[rows].tolist():
+            self._release_slot(slot)
+        keep = np.ones(self._n_rows, dtype=bool)
+        keep[rows] = False
+        kept = order[keep]
+        self._order[:len(kept)] = kept
+        self._n_rows = len(kept)
+
+    # ---------- MutableSequence protocol ----------
+
+    def __len__(self):
+        return self._n_rows
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._view(int(slot)) for slot in self._order[:self._n_rows][idx]]
+        return self._view(int(self._order[self._row_index(idx)]))
+
+    def __setitem__(self, idx, annotation):
+        if isinstance(idx, slice):
+            raise TypeError("AnnotationStore does not support slice assignment")
+        row = self._row_index(idx)
+        self._release_slot(int(self._order[row]))
+        self._order[row] = self._new_slot(annotation)
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            for row in sorted(range(*idx.indices(self._n_rows)), reverse=True):
+                del self[row]
+            return
+        row = self._row_index(idx)
+        self._release_slot(int(self._order[row]))
+        self._order[row:self._n_rows - 1] = self._order[row + 1:self._n_rows]
+        self._n_rows -= 1
+
+    def insert(self, idx, annotation):
+        row = max(0, min(idx + self._n_rows if idx < 0 else idx, self._n_rows))
+        slot = self._new_slot(annotation)
+        self._ensure_order_capacity(self._n_rows + 1)
+        self._order[row + 1:self._n_rows + 1] = self._order[row:self._n_rows].copy()
+        self._order[row] = slot
+        self._n_rows += 1
+
+    def move(self, src, dst):
+        """Move the row at src to dst, keeping the same annotation view."""
+        src = self._row_index(src)
+        dst = self._row_index(dst)
+        slot = self._order[src]
+        if src < dst:
+            self._order[src:dst] = self._order[src + 1:dst + 1].copy()
+        elif dst < src:
+            self._order[dst + 1:src + 1] = self._order[dst:src].copy()
+        self._order[dst] = slot
+
+    def __iter__(self):
+        for slot in self._order[:self._n_rows].tolist():
+            yield self._view(slot)
+
+    def clear(self):
+        for view in list(self._views.values()):
+            view._detach()
+        self.__init__(labels=self.labels)
+
+    def sort(self, key=None, reverse=False):
+        """Sort rows in place, by position when no key is given (stable)."""
+        order = self._order[:self._n_rows]
+        moved = [slot for slot, extra in self._extras.items() if "position" in extra]
+        if key is None and not moved:
+            perm = np.argsort(self._positions[order], kind="stable")
+            if reverse:
+                perm = perm[::-1]
+        else:
+            if key is None:
+                # Positions that did not fit the column (floats, oversized ints) are compared as they are
+                keys = self._positions[order].tolist()
+                row_of = {slot: row for row, slot in enumerate(order.tolist())}
+                for slot in moved:
+                    keys[row_of[slot]] = self._extras[slot]["position"]
+            else:
+                keys = [key(self._view(int(slot))) for slot in order]
+            perm = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        self._order[:self._n_rows] = order[perm]
+
+    # ---------- Slot management ----------
+
+    def _row_index(self, idx):
+        if idx < 0:
+            idx += self._n_rows
+        if not 0 <= idx < self._n_rows:
+            raise IndexError("annotation index out of range")
+        return idx
+
+    def _view(self, slot):
+        view = self._views.get(slot)
+        if view is None:
+            view = AnnotationRow(self, slot)
+            self._views[slot] = view
+        return view
+
+    def _ensure_slot_capacity(self, n):
+        if n <= len(self._positions):
+            return
+        capacity = max(n, 2 * len(self._positions))
+        for name in ("_positions", "_label_ids", "_layout_ids"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._n_slots] = old[:self._n_slots]
+            setattr(self, name, new)
+        for key, old in self._str_columns.items():
+            new = np.full(capacity, -1, dtype=np.int32)
+            new[:self._n_slots] = old[:self._n_slots]
+            self._str_columns[key] = new
+
+    def _str_column(self, key):
+        column = self._str_columns.get(key)
+        if column is None:
+            column = np.full(len(self._positions), -1, dtype=np.int32)
+            self._str_columns[key] = column
+        return column
+
+    def _intern_string(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _ensure_order_capacity(self, n):
+        if n <= len(self._order):
+            return
+        order = np.zeros(max(n, 2 * len(self._order)), dtype=np.int64)
+        order[:self._n_rows] = self._order[:self._n_rows]
+        self._order = order
+
+    def _intern_layout(self, keys):
+        layout_id = self._layout_index.get(keys)
+        if layout_id is None:
+            layout_id = len(self._layouts)
+            self._layouts.append(keys)
+            self._layout_index[keys] = layout_id
+        return layout_id
+
+    def _layout_of(self, slot):
+        return self._layouts[self._layout_ids[slot]]
+
+    def _new_slot(self, annotation):
+        if isinstance(annotation, AnnotationRow):
+            annotation = annotation.to_dict()
+        if self._n_slots >= len(self._positions):
+            self._compact_slots()
+        slot = self._n_slots
+        self._ensure_slot_capacity(slot + 1)
+        self._n_slots += 1
+        self._layout_ids[slot] = self._intern_layout(tuple(annotation))
+        self._positions[slot] = 0
+        self._label_ids[slot] = 0
+        for column in self._str_columns.values():
+            column[slot] = -1
+        for key, value in annotation.items():
+            self._store_value(slot, key, value)
+        return slot
+
+    def _release_slot(self, slot):
+        view = self._views.pop(slot, None)
+        if view is not None:
+            view._detach()
+        self._metadata.pop(slot, None)
+        self._extras.pop(slot, None)
+
+    def _compact_slots(self):
+        """Renumber live slots so that slots of removed rows can be reused."""
+        live = self._order[:self._n_rows].copy()
+        if self._n_slots - len(live) < max(1, self._n_slots // 4):
+            return  # Not worth it yet, let the arrays grow instead
+        remap = {int(old): new for new, old in enumerate(live)}
+        for name in ("_positions", "_label_ids", "_layout_ids"):
+            column = getattr(self, name)
+            column[:len(live)] = column[live]
+        for column in self._str_columns.values():
+            column[:len(live)] = column[live]
+        self._metadata = {remap[slot]: value for slot, value in self._metadata.items()}
+        self._extras = {remap[slot]: value for slot, value in self._extras.items()}
+        views = list(self._views.items())
+        self._views = weakref.WeakValueDictionary()
+        for slot, view in views:
+            view._slot = remap[slot]
+            self._views[view._slot] = view
+        self._order[:self._n_rows] = np.arange(self._n_rows)
+        self._n_slots = len(live)
+
+    # ---------- Field access ----------
+
+    def _store_value(self, slot, key, value):
+        if (key == "position" and isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+                and _POSITION_RANGE.min <= value <= _POSITION_RANGE.max):
+            self._positions[slot] = value
+        elif key == "label" and isinstance(value, str):
+            self._label_ids[slot] = self.labels.intern(value)
+        elif key == "metadata" and isinstance(value, dict):
+            if value:
+                self._metadata[slot] = value
+            else:
+                self._metadata.pop(slot, None)
+        elif key not in _COLUMNAR_KEYS and isinstance(value, str):
+            self._str_column(key)[slot] = self._intern_string(value)
+        else:
+            column = self._str_columns.get(key)
+            if column is not None:
+                column[slot] = -1
+            self._extras.setdefault(slot, {})[key] = value
+            return
+        extra = self._extras.get(slot)
+        if extra is not None:
+            extra.pop(key, None)
+            if not extra:
+                del self._extras[slot]
+
+    def _drop_extras(self, key, slots=None):
+        """Forget the values of key that did not fit its column, after the column was set in bulk."""
+        for slot in [slot for slot, extra in self._extras.items()
+                     if key in extra and (slots is None or slot in slots)]:
+            extra = self._extras[slot]
+            del extra[key]
+            if not extra:
+                del self._extras[slot]
+
+    def _get_field(self, slot, key):
+        extra = self._extras.get(slot)
+        if extra is not None and key in extra:
+            return extra[key]
+        if key in self._layout_of(slot):
+            if key == "position":
+                return int(self._positions[slot])
+            if key == "label":
+                return self.labels.names[self._label_ids[slot]]
+            if key == "metadata":
+                return self._metadata.setdefault(slot, {})
+            return self._strings[self._str_columns[key][slot]]
+        raise KeyError(key)
+
+    def _set_field(self, slot, key, value):
+        layout = self._layout_of(slot)
+        if key not in layout:
+            self._layout_ids[slot] = self._intern_layout(layout + (key,))
+        self._store_value(slot, key, value)
+
+    def _slot_to_dict(self, slot):
+        return {key: self._get_field(slot, key) for key in self._layout_of(slot)}
+
+
+def compact_videos(videos, labels):
+    """Replace the annotation lists of videos with AnnotationStores sharing labels."""
+    for video in videos:
+        annotations = video.get("annotations")
+        if isinstance(annotations, list):
+            video["annotations"] = AnnotationStore.from_list(annotations, labels)
+    return videos
+
+
+def json_default(obj):
+    """``default`` hook for json.dump that serializes stores and row views."""
+    if isinstance(obj, AnnotationStore):
+        return obj.to_list()
+    if isinstance(obj, AnnotationRow):
+        return obj.to_dict()
+    if hasattr(obj, "to_list"):
+        return obj.to_list()  # LazyAnnotations
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,186 @@
+"""Counters and latency histograms of the hot paths of the GUI.
+
+Instrumented code calls ``telemetry.count(name)`` or wraps work in
+``with telemetry.timed(name):``. Both are no-ops unless telemetry was
+enabled (``main.py --telemetry`` or View > Collect Telemetry), so they can
+stay in the code. The collected figures are written on demand as JSON by
+dump(), optionally with the top allocation sites of a tracemalloc snapshot
+(``main.py --trace-memory``).
+"""
+import json
+import time
+import bisect
+import functools
+import threading
+import tracemalloc
+from collections import Counter
+
+from osl_io import write_atomic
+
+# Upper bounds of the histogram buckets, in ms: 0.01 ms to about 84 s, doubling
+BUCKET_BOUNDS_MS = tuple(0.01 * 2 ** k for k in range(24))
+
+
+class Histogram:
+    """Latency distribution over logarithmic buckets. Recording costs O(log buckets)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)  # The last one holds larger values
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1), capped by the maximum."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "min_ms": self.min_ms,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {(f"<={bound:g}" if i < len(BUCKET_BOUNDS_MS) else f">{BUCKET_BOUNDS_MS[-1]:g}"): n
+                        for i, (bound, n) in enumerate(zip(BUCKET_BOUNDS_MS + (None,), self.buckets)) if n},
+        }
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("telemetry", "name", "start")
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Telemetry:
+    """Named counters and latency histograms, safe to update from worker threads."""
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = Counter()
+        self.histograms = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self._started = time.time()
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, name, seconds):
+        """Add one latency sample, in seconds, to the histogram of name."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    def timed(self, name):
+        """Context manager recording the duration of its block in the histogram of name."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def instrument(self, name):
+        """Decorator recording the duration of every call of the function in the histogram of name."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ---------- Memory ----------
+
+    def start_memory_tracing(self, frames=1):
+        """Start tracemalloc, which slows allocations down noticeably while it runs."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def memory_snapshot(self, limit=25):
+        """Current and peak traced memory and the top allocation sites, or None if not tracing."""
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        return {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [{"site": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                    for stat in stats[:limit]],
+        }
+
+    # ---------- Reporting ----------
+
+    def snapshot(self, memory=True):
+        """Return the collected figures as a JSON-serializable dict."""
+        with self._lock:
+            data = {
+                "enabled": self.enabled,
+                "started": self._started,
+                "elapsed_s": time.time() - self._started,
+                "counters": dict(sorted(self.counters.items())),
+                "latency": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            }
+        if memory:
+            data["memory"] = self.memory_snapshot()
+        return data
+
+    def dump(self, file_path, memory=True):
+        """Write snapshot() to file_path as JSON."""
+        write_atomic(file_path, [json.dumps(self.snapshot(memory), indent=2)])
+
+
+telemetry = Telemetry()
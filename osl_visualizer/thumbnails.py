@@ -0,0 +1,158 @@
+"""Frame thumbnails for annotations, decoded in worker processes and cached.
+
+Thumbnails are kept in a bounded in-memory LRU and in a persistent on-disk
+cache, keyed by video path, size, modification time, position and width.
+"""
+import os
+import hashlib
+import logging
+import importlib.util
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QPixmap
+
+THUMBNAIL_WIDTH = 96
+
+
+def render_thumbnail(video_path, position_ms, width):
+    """Decode the frame of video_path at position_ms and return it as PNG bytes (None on failure).
+
+    Runs in a worker process.
+    """
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        cap.set(cv2.CAP_PROP_POS_MSEC, position_ms)
+        ok, frame = cap.read()
+    finally:
+        cap.release()
+    if not ok or frame is None:
+        return None
+    h, w = frame.shape[:2]
+    height = max(1, round(h * width / w))
+    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    ok, png = cv2.imencode(".png", frame)
+    return png.tobytes() if ok else None
+
+
+def thumbnails_available():
+    """Return True if OpenCV is installed, which thumbnail decoding requires."""
+    return importlib.util.find_spec("cv2") is not None
+
+
+class ThumbnailCache(QObject):
+    """Provides annotation thumbnails to the models, decoding missing ones lazily.
+
+    get() never blocks on decoding: it returns the thumbnail if it is in
+    memory or in the disk cache, and otherwise schedules its decoding and
+    returns None. ``thumbnail_ready`` is emitted once a thumbnail becomes
+    available.
+    """
+    thumbnail_ready = pyqtSignal(str, int)
+    _decoded = pyqtSignal(object, object)
+
+    def __init__(self, cache_dir, max_items=512, max_pending=32, width=THUMBNAIL_WIDTH, workers=2, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.max_pending = max_pending
+        self.width = width
+        os.makedirs(cache_dir, exist_ok=True)
+        self._memory = OrderedDict()  # key -> QPixmap, least recently used first
+        self._pending = OrderedDict()  # key -> Future, oldest first
+        self._failed = set()
+        self._video_keys = {}  # video path -> (size, mtime_ns)
+        # Spawned (not forked) workers, forking a process running Qt is unsafe
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._decoded.connect(self._on_decoded)
+
+    def set_video(self, video_path):
+        """Register a video whose thumbnails will be requested (stats the file once)."""
+        if video_path in self._video_keys:
+            return
+        try:
+            st = os.stat(video_path)
+            self._video_keys[video_path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            self._video_keys[video_path] = None
+
+    def _key(self, video_path, position):
+        return video_path, int(position)
+
+    def _disk_path(self, key):
+        video_path, position = key
+        signature = f"{video_path}|{self._video_keys.get(video_path)}|{position}|{self.width}"
+        return os.path.join(self.cache_dir, hashlib.sha1(signature.encode("utf-8")).hexdigest() + ".png")
+
+    def get(self, video_path, position):
+        """Return the thumbnail at position, or None while it is being decoded."""
+        key = self._key(video_path, position)
+        pixmap = self._memory.get(key)
+        if pixmap is not None:
+            self._memory.move_to_end(key)
+            return pixmap
+        if key in self._failed or key in self._pending:
+            return None
+        if video_path not in self._video_keys:
+            self.set_video(video_path)
+        if self._video_keys[video_path] is None:
+            return None  # Missing video file
+        disk_path = self._disk_path(key)
+        if os.path.exists(disk_path):
+            pixmap = QPixmap(disk_path)
+            if not pixmap.isNull():
+                self._remember(key, pixmap)
+                return pixmap
+        self._schedule(key)
+        return None
+
+    def _schedule(self, key):
+        # Only the most recent requests matter (rows scrolled out of view are dropped)
+        while len(self._pending) >= self.max_pending:
+            old_key, future = self._pending.popitem(last=False)
+            future.cancel()
+        video_path, position = key
+        future = self._executor.submit(render_thumbnail, video_path, position, self.width)
+        self._pending[key] = future
+        future.add_done_callback(lambda f, key=key: self._decoded.emit(key, f))
+
+    def _on_decoded(self, key, future):
+        if self._pending.get(key) is not future:
+            return
+        del self._pending[key]
+        if future.cancelled():
+            return
+        try:
+            png = future.result()
+        except Exception as e:
+            logging.debug(f"Thumbnail decoding failed for {key}: {e}")
+            png = None
+        if not png:
+            self._failed.add(key)
+            return
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, "PNG")
+        try:
+            with open(self._disk_path(key), "wb") as f:
+                f.write(png)
+        except OSError as e:
+            logging.debug(f"Could not write thumbnail cache: {e}")
+        self._remember(key, pixmap)
+        self.thumbnail_ready.emit(*key)
+
+    def _remember(self, key, pixmap):
+        self._memory[key] = pixmap
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def shutdown(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,366 @@
+"""Event timeline widget showing the annotations of the current video.
+
+Annotations are counted in a density pyramid: per-label event counts over a
+fixed number of time bins, plus coarser levels obtained by merging pairs of
+bins. Painting picks the level whose bins are about one pixel wide, so its
+cost depends on the widget width and not on the number of events. When the
+view is zoomed in far enough, the individual events are drawn instead.
+"""
+import math
+import zlib
+
+import numpy as np
+from PyQt6.QtCore import Qt, QPointF, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+from utils import bisect_by, ms_to_hms_ms
+from telemetry import telemetry
+
+BASE_BINS = 8192
+MIN_VIEW_SPAN_MS = 500
+
+
+def label_color(label):
+    """Return a stable color for label."""
+    hue = zlib.crc32(str(label).encode("utf-8")) % 360
+    return QColor.fromHsv(hue, 170, 230)
+
+
+class DensityPyramid:
+    """Per-label event counts over time, at several resolutions.
+
+    Level 0 splits ``[0, duration)`` into ``base_bins`` bins and every
+    following level halves the number of bins. add() and remove() update
+    one bin per level, so edits cost O(log(base_bins)).
+    """
+
+    def __init__(self, base_bins=BASE_BINS):
+        self.base_bins = base_bins
+        self.n_levels = int(math.log2(base_bins)) + 1
+        self.duration = 1
+        self.labels = []
+        self._label_rows = {}
+        self.levels = [np.zeros((0, base_bins >> k), dtype=np.int32) for k in range(self.n_levels)]
+
+    def reset(self, duration, positions, labels):
+        """Rebuild all levels from parallel lists of positions and labels."""
+        self.duration = max(int(duration), 1)
+        self.labels = []
+        self._label_rows = {}
+        rows = np.fromiter((self._label_row(label) for label in labels), dtype=np.int64, count=len(labels))
+        n_labels = len(self.labels)
+        bins = self._bins(np.asarray(positions, dtype=np.int64))
+        base = np.bincount(rows * self.base_bins + bins, minlength=n_labels * self.base_bins)
+        level = base.astype(np.int32).reshape(n_labels, self.base_bins)
+        self.levels = [level]
+        for _ in range(1, self.n_levels):
+            level = level.reshape(n_labels, level.shape[1] // 2, 2).sum(axis=2, dtype=np.int32)
+            self.levels.append(level)
+
+    def contains(self, position):
+        return 0 <= position < self.duration
+
+    def add(self, position, label, count=1):
+        """Count an event (or uncount it with a negative count). position must be within the duration."""
+        row = self._label_row(label)
+        if row >= self.levels[0].shape[0]:
+            self.levels = [np.vstack([level, np.zeros((1, level.shape[1]), dtype=np.int32)]) for level in self.levels]
+        b = int(self._bins(position))
+        for k, level in enumerate(self.levels):
+            level[row, b >> k] += count
+
+    def remove(self, position, label):
+        self.add(position, label, -1)
+
+    def level_for(self, span, columns):
+        """Return the coarsest level that still has at most one bin per column over span milliseconds."""
+        bins = span * self.base_bins / self.duration
+        if bins <= columns:
+            return 0
+        return min(self.n_levels - 1, math.ceil(math.log2(bins / columns)))
+
+    def column_counts(self, start, span, columns):
+        """Return per-label counts for each of columns pixel columns covering [start, start + span)."""
+        k = self.level_for(span, columns)
+        level = self.levels[k]
+        bin_ms = self.duration / level.shape[1]
+        centers = start + (np.arange(columns) + 0.5) * (span / columns)
+        idx = np.floor(centers / bin_ms).astype(np.int64)
+        valid = (idx >= 0) & (idx < level.shape[1])
+        counts = level[:, np.clip(idx, 0, level.shape[1] - 1)]
+        counts[:, ~valid] = 0
+        return counts
+
+    def _label_row(self, label):
+        row = self._label_rows.get(label)
+        if row is None:
+            row = len(self.labels)
+            self.labels.append(label)
+            self._label_rows[label] = row
+        return row
+
+    def _bins(self, positions):
+        return np.clip(positions * self.base_bins // self.duration, 0, self.base_bins - 1)
+
+
+class EventTimeline(QWidget):
+    """Seek bar showing the annotations of the current video, colored by label.
+
+    Follows an AnnotationListModel through its row signals, so adding,
+    removing, moving or relabeling an annotation only updates the pyramid
+    incrementally. Clicking or dragging seeks (a drag is reported between
+    scrub_started and scrub_finished), the mouse wheel zooms around
+    the cursor, shift+wheel or a right-button drag pans, and a double click
+    shows the whole video again.
+    """
+    seek_requested = pyqtSignal(int)
+    scrub_started = pyqtSignal()
+    scrub_finished = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(28)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setMouseTracking(True)
+        self.model = None
+        self.duration = 0
+        self.position = 0
+        self.pyramid = DensityPyramid()
+        self._positions = []  # Mirror of the model rows, needed to undo an event's old counts
+        self._labels = []
+        self._colors = {}
+        self._view_start = 0.0
+        self._view_span = None  # None shows the whole video
+        self._seeking = False
+        self._pan_origin = None
+
+    # ---------- Model binding ----------
+
+    def set_model(self, model):
+        """Follow the annotations of an AnnotationListModel."""
+        self.model = model
+        model.modelReset.connect(self._rebuild)
+        model.layoutChanged.connect(self._rebuild)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_removed)
+        model.rowsMoved.connect(self._on_rows_moved)
+        model.dataChanged.connect(self._on_data_changed)
+        self._rebuild()
+
+    def _rebuild(self):
+        annotations = self.model.annotations if self.model is not None else []
+        if hasattr(annotations, "positions"):
+            names = annotations.labels.names
+            self._positions = annotations.positions().tolist()
+            self._labels = [names[i] for i in annotations.label_ids().tolist()]
+        else:
+            self._positions = [ann["position"] for ann in annotations]
+            self._labels = [ann["label"] for ann in annotations]
+        self.pyramid.reset(self._domain(), self._positions, self._labels)
+        self.update()
+
+    def _domain(self):
+        """Time range covered by the pyramid: the video duration, extended to the last event."""
+        last = self._positions[-1] + 1 if self._positions else 0  # Rows are sorted by position
+        return max(self.duration, last, 1)
+
+    def _count(self, position, label, count):
+        if not self.pyramid.contains(position):
+            self.pyramid.reset(self._domain(), self._positions, self._labels)
+            return
+        self.pyramid.add(position, label, count)
+
+    def _on_rows_inserted(self, parent, first, last):
+        for row in range(first, last + 1):
+            ann = self.model.annotations[row]
+            self._positions.insert(row, ann["position"])
+            self._labels.insert(row, ann["label"])
+            self._count(ann["position"], ann["label"], 1)
+        self.update()
+
+    def _on_rows_removed(self, parent, first, last):
+        for row in range(last, first - 1, -1):
+            self.pyramid.remove(self._positions.pop(row), self._labels.pop(row))
+        self.update()
+
+    def _on_rows_moved(self, parent, start, end, destination, dest_row):
+        # dest_row is the destination before the rows are taken out
+        new_row = dest_row if dest_row < start else dest_row - (end - start + 1)
+        for mirror in (self._positions, self._labels):
+            block = mirror[start:end + 1]
+            del mirror[start:end + 1]
+            mirror[new_row:new_row] = block
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        if roles and Qt.ItemDataRole.DisplayRole not in roles:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            ann = self.model.annotations[row]
+            position, label = ann["position"], ann["label"]
+            if position == self._positions[row] and label == self._labels[row]:
+                continue
+            self.pyramid.remove(self._positions[row], self._labels[row])
+            self._positions[row] = position
+            self._labels[row] = label
+            self._count(position, label, 1)
+        self.update()
+
+    # ---------- Playback state ----------
+
+    def set_duration(self, duration):
+        """Set the video duration in milliseconds and show the whole video."""
+        duration = max(int(duration), 0)
+        self._view_span = None
+        self._view_start = 0.0
+        if duration != self.duration:
+            self.duration = duration
+            if self._domain() != self.pyramid.duration:
+                self.pyramid.reset(self._domain(), self._positions, self._labels)
+        self.update()
+
+    def set_position(self, position):
+        """Move the playhead, scrolling a zoomed view to keep it visible."""
+        if self._seeking:
+            return  # The playhead follows the mouse while dragging
+        self.position = position
+        if self._view_span is not None and not self._seeking and self._pan_origin is None:
+            start, span = self._view()
+            if not start <= position < start + span:
+                self._set_view(position - span * 0.1, span)
+        self.update()
+
+    # ---------- View ----------
+
+    def _view(self):
+        domain = self._domain()
+        if self._view_span is None:
+            return 0.0, float(domain)
+        return self._view_start, self._view_span
+
+    def _set_view(self, start, span):
+        domain = self._domain()
+        span = min(max(span, MIN_VIEW_SPAN_MS), domain)
+        if span >= domain:
+            self._view_span = None
+            self._view_start = 0.0
+        else:
+            self._view_span = span
+            self._view_start = min(max(start, 0.0), domain - span)
+        self.update()
+
+    def _x_to_ms(self, x):
+        start, span = self._view()
+        return start + min(max(x, 0), self.width()) * span / max(self.width(), 1)
+
+    def _ms_to_x(self, ms):
+        start, span = self._view()
+        return (ms - start) * self.width() / span
+
+    # ---------- Painting ----------
+
+    @telemetry.instrument("timeline.paint")
+    def paintEvent(self, event):
+        width, height = self.width(), self.height()
+        if width <= 0:
+            return
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        start, span = self._view()
+        band_top = 4
+        band_height = height - 8
+        first = bisect_by(self._positions, start, int)
+        last = bisect_by(self._positions, start + span, int)
+        if last - first <= width // 4:
+            self._paint_markers(painter, first, last, band_top, band_height)
+        else:
+            self._paint_density(painter, start, span, band_top, band_height)
+        if self.duration > 0:
+            x = self._ms_to_x(self.position)
+            painter.setPen(QPen(self.palette().highlight().color(), 2))
+            painter.drawLine(QPointF(x, 0), QPointF(x, height))
+        painter.end()
+
+    def _paint_markers(self, painter, first, last, top, height):
+        for row in range(first, last):
+            label = self._labels[row]
+            x = self._ms_to_x(self._positions[row])
+            painter.setPen(QPen(self._color(label), 2))
+            painter.drawLine(QPointF(x, top), QPointF(x, top + height))
+
+    def _paint_density(self, painter, start, span, top, height):
+        """Draw per-column stacked bars, rendered into one image with NumPy."""
+        width = self.width()
+        counts = self.pyramid.column_counts(start, span, width)  # (labels, columns)
+        if counts.size == 0 or height <= 0:
+            return
+        peak = counts.sum(axis=0).max()
+        if peak <= 0:
+            return
+        # Square root scaling keeps sparse regions visible next to dense ones
+        totals = np.sqrt(counts.sum(axis=0) / peak) * height
+        cumulative = np.cumsum(counts, axis=0) * (totals / np.maximum(counts.sum(axis=0), 1))
+        rows = (height - 0.5 - np.arange(height))[:, None]  # Distance from the bottom of the band
+        label_index = (cumulative[:, None, :] <= rows[None, :, :]).sum(axis=0)  # (height, columns)
+        palette = np.zeros((len(self.pyramid.labels) + 1, 4), dtype=np.uint8)
+        for i, label in enumerate(self.pyramid.labels):
+            color = self._color(label)
+            palette[i] = (color.blue(), color.green(), color.red(), 255)
+        pixels = np.ascontiguousarray(palette[label_index])
+        image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32)
+        painter.drawImage(0, top, image)
+
+    def _color(self, label):
+        color = self._colors.get(label)
+        if color is None:
+            color = self._colors[label] = label_color(label)
+        return color
+
+    # ---------- Interaction ----------
+
+    def mousePressEvent(self, event):
+        x = event.position().x()
+        if event.button() == Qt.MouseButton.LeftButton and self.duration > 0:
+            self._seeking = True
+            self.scrub_started.emit()
+            self._seek_to(x)
+        elif event.button() in (Qt.MouseButton.RightButton, Qt.MouseButton.MiddleButton):
+            self._pan_origin = (x, self._view()[0])
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        if self._seeking:
+            self._seek_to(x)
+        elif self._pan_origin is not None:
+            origin_x, origin_start = self._pan_origin
+            start, span = self._view()
+            self._set_view(origin_start - (x - origin_x) * span / max(self.width(), 1), span)
+        self.setToolTip(ms_to_hms_ms(self._x_to_ms(x)))
+
+    def mouseReleaseEvent(self, event):
+        if self._seeking:
+            self._seeking = False
+            self.scrub_finished.emit(self.position)
+        self._pan_origin = None
+
+    def mouseDoubleClickEvent(self, event):
+        self._set_view(0.0, self._domain())
+
+    def wheelEvent(self, event):
+        start, span = self._view()
+        delta = event.angleDelta()
+        if event.modifiers() & Qt.KeyboardModifier.ShiftModifier or delta.x():
+            steps = (delta.x() or delta.y()) / 120
+            self._set_view(start - steps * span * 0.1, span)
+        else:
+            anchor = self._x_to_ms(event.position().x())
+            factor = 0.8 ** (delta.y() / 120)
+            new_span = span * factor
+            self._set_view(anchor - (anchor - start) * new_span / span, new_span)
+        event.accept()
+
+    def _seek_to(self, x):
+        position = int(min(self._x_to_ms(x), self.duration))
+        self.position = position
+        self.update()
+        self.seek_requested.emit(position)
@@ -0,0 +1,50 @@
+"""Set up windows and dialogs from their Qt Designer forms.
+
+Parsing a .ui file with ``uic.loadUi`` at every start is slow, so the forms
+are also compiled into Python modules (``compiled_ui/ui_<name>.py``, see
+tools/compile_ui.py). load_ui() uses the compiled module when it was
+generated from the current .ui file, and falls back to ``uic.loadUi``
+when it is missing or out of date.
+"""
+import os
+import hashlib
+import logging
+import importlib
+
+UI_DIR = os.path.join(os.path.dirname(__file__), "ui")
+
+
+def _ui_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _compiled_form(name, ui_path):
+    """Return the compiled form class of ui/<name>.ui, or None if it cannot be used."""
+    try:
+        module = importlib.import_module(f"compiled_ui.ui_{name}")
+    except ImportError:
+        return None
+    # A frozen build may ship only the compiled modules
+    if os.path.exists(ui_path) and _ui_sha1(ui_path) != module.UI_SHA1:
+        logging.debug(f"{name}.ui changed since it was compiled, parsing it instead")
+        return None
+    return module.FORM_CLASS
+
+
+def load_ui(widget, name):
+    """Build the form ui/<name>.ui into widget, like ``uic.loadUi(path, widget)``.
+
+    Child widgets, layouts and actions become attributes of widget and its
+    slots are connected by name.
+    """
+    ui_path = os.path.join(UI_DIR, name + ".ui")
+    form_class = _compiled_form(name, ui_path)
+    if form_class is None:
+        from PyQt6 import uic
+        uic.loadUi(ui_path, widget)
+        return
+    form = form_class()
+    form.setupUi(widget)
+    for attr, value in vars(form).items():
+        setattr(widget, attr, value)
@@ -0,0 +1,329 @@
+"""Undo/redo history made of small edit deltas.
+
+Every edit of the GUI is recorded as a ``Command`` holding only what it
+changed (a label, a row and a position, or a reference to the removed
+video), never a snapshot of the project, so undoing or redoing an edit
+costs the same whatever the size of the dataset.
+
+Commands are applied through an editor (the main window) providing the
+editing primitives ``insert_annotation``, ``delete_annotation``,
+``relabel_annotation``, ``retime_annotation``, ``insert_label``,
+``delete_label``, ``insert_video``, ``delete_video``, ``apply_bulk_edit``
+and ``revert_bulk_edit``. Those keep the
+models, the statistics, the modification state and the edit journal in
+sync, so an undone edit is journaled and saved like any other.
+
+``UndoStack`` bounds the history by an estimate of the memory held by its
+commands and merges rapid repeated edits of the same annotation (such as
+retiming it several times in a row) into a single step.
+"""
+import time
+from collections import deque
+
+from bulk import DELETE, change_size
+
+DEFAULT_BUDGET = 64 * 1024 * 1024
+MERGE_WINDOW = 2.0  # Seconds between two edits of the same annotation merged into one step
+
+# Rough memory estimates, in bytes, used to enforce the budget
+_COMMAND_COST = 200
+_ANNOTATION_COST = 250
+_ROW_COST = 40  # A row and an old label or position kept by a bulk edit
+
+
+class Command:
+    """One undoable edit, already applied when it is pushed on the stack."""
+    text = ""
+
+    def __init__(self):
+        self.timestamp = time.monotonic()
+
+    def undo(self, editor):
+        raise NotImplementedError
+
+    def redo(self, editor):
+        raise NotImplementedError
+
+    def cost(self):
+        """Estimated memory held by the command, in bytes."""
+        return _COMMAND_COST
+
+    def merge(self, other):
+        """Absorb other, pushed right after this command. Returns False if they cannot be merged."""
+        return False
+
+
+# ---------- Annotations ----------
+
+class AddAnnotation(Command):
+    text = "Add Annotation"
+
+    def __init__(self, video, annotation, row):
+        super().__init__()
+        self.video = video
+        self.annotation = annotation
+        self.row = row
+
+    def undo(self, editor):
+        self.annotation = editor.delete_annotation(self.video, self.row)
+
+    def redo(self, editor):
+        self.row = editor.insert_annotation(self.video, self.annotation, self.row)
+
+    def cost(self):
+        return _COMMAND_COST + _ANNOTATION_COST
+
+
+class RemoveAnnotation(Command):
+    text = "Remove Annotation"
+
+    def __init__(self, video, annotation, row):
+        super().__init__()
+        self.video = video
+        self.annotation = annotation
+        self.row = row
+
+    def undo(self, editor):
+        self.row = editor.insert_annotation(self.video, self.annotation, self.row)
+
+    def redo(self, editor):
+        self.annotation = editor.delete_annotation(self.video, self.row)
+
+    def cost(self):
+        return _COMMAND_COST + _ANNOTATION_COST
+
+
+class SetLabel(Command):
+    text = "Change Label"
+
+    def __init__(self, video, row, old_label, new_label):
+        super().__init__()
+        self.video = video
+        self.row = row
+        self.old_label = old_label
+        self.new_label = new_label
+
+    def undo(self, editor):
+        editor.relabel_annotation(self.video, self.row, self.old_label)
+
+    def redo(self, editor):
+        editor.relabel_annotation(self.video, self.row, self.new_label)
+
+    def merge(self, other):
+        if not isinstance(other, SetLabel) or other.video is not self.video or other.row != self.row:
+            return False
+        self.new_label = other.new_label
+        return True
+
+
+class MoveAnnotation(Command):
+    """Retiming of an annotation, which may move it to another row to keep the list sorted."""
+    text = "Move Annotation"
+
+    def __init__(self, video, old_row, new_row, old_position, new_position):
+        super().__init__()
+        self.video = video
+        self.old_row = old_row
+        self.new_row = new_row
+        self.old_position = old_position
+        self.new_position = new_position
+
+    def undo(self, editor):
+        self.old_row = editor.retime_annotation(self.video, self.new_row, self.old_position)
+
+    def redo(self, editor):
+        self.new_row = editor.retime_annotation(self.video, self.old_row, self.new_position)
+
+    def merge(self, other):
+        if not isinstance(other, MoveAnnotation) or other.video is not self.video or other.old_row != self.new_row:
+            return False
+        self.new_row = other.new_row
+        self.new_position = other.new_position
+        return True
+
+
+# ---------- Labels ----------
+
+class AddLabel(Command):
+    text = "Add Label"
+
+    def __init__(self, label, index):
+        super().__init__()
+        self.label = label
+        self.index = index
+
+    def undo(self, editor):
+        self.index = editor.delete_label(self.label)
+
+    def redo(self, editor):
+        self.index = editor.insert_label(self.label, self.index)
+
+
+class RemoveLabel(Command):
+    text = "Remove Label"
+
+    def __init__(self, label, index):
+        super().__init__()
+        self.label = label
+        self.index = index
+
+    def undo(self, editor):
+        self.index = editor.insert_label(self.label, self.index)
+
+    def redo(self, editor):
+        self.index = editor.delete_label(self.label)
+
+
+# ---------- Videos ----------
+
+class AddVideo(Command):
+    text = "Add Video"
+
+    def __init__(self, video):
+        super().__init__()
+        self.video = video
+        # Computed once, so the memory accounting of the stack stays balanced if the video changes
+        self._cost = _COMMAND_COST + _ANNOTATION_COST * len(video.get("annotations") or ())
+
+    def undo(self, editor):
+        editor.delete_video(self.video)
+
+    def redo(self, editor):
+        editor.insert_video(self.video)
+
+    def cost(self):
+        return self._cost
+
+
+class RemoveVideo(Command):
+    """Removal of a video, which keeps the video itself (not a copy) to put it back."""
+    text = "Remove Video"
+
+    def __init__(self, video):
+        super().__init__()
+        self.video = video
+        self._cost = _COMMAND_COST + _ANNOTATION_COST * len(video.get("annotations") or ())
+
+    def undo(self, editor):
+        editor.insert_video(self.video)
+
+    def redo(self, editor):
+        editor.delete_video(self.video)
+
+    def cost(self):
+        return self._cost
+
+
+# ---------- Bulk edits ----------
+
+class ApplyBulkEdit(Command):
+    """A bulk edit (see bulk.py), undone from the rows, labels or positions it changed."""
+
+    def __init__(self, edit, changes, old_labels):
+        super().__init__()
+        self.edit = edit
+        self.text = edit.text
+        self.changes = changes
+        self.old_labels = old_labels
+        self.videos = [video for video, _ in changes]
+        # Deleted events are kept whole, other changes only keep a row and a value
+        per_row = _ANNOTATION_COST if edit.op == DELETE else _ROW_COST
+        self._cost = _COMMAND_COST + per_row * sum(change_size(change) for _, change in changes)
+
+    def undo(self, editor):
+        editor.revert_bulk_edit(self.changes, self.old_labels)
+
+    def redo(self, editor):
+        self.changes, self.old_labels = editor.apply_bulk_edit(self.edit, self.videos)
+
+    def cost(self):
+        return self._cost
+
+
+class UndoStack:
+    """Bounded history of commands.
+
+    Commands are dropped, oldest first, when the estimated memory of the
+    history exceeds budget bytes; the most recent command is always kept.
+    A command pushed within merge_window seconds of the previous one is
+    offered to it through Command.merge().
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, merge_window=MERGE_WINDOW):
+        self.budget = budget
+        self.merge_window = merge_window
+        self._undo = deque()
+        self._redo = []
+        self._memory = 0
+        self._can_merge = False  # Only merge with a command pushed right before
+
+    def __len__(self):
+        return len(self._undo)
+
+    def push(self, command):
+        """Record a command that was just applied. The redo history is dropped."""
+        for dropped in self._redo:
+            self._memory -= dropped.cost()
+        self._redo.clear()
+        top = self._undo[-1] if self._undo else None
+        if (self._can_merge and top is not None
+                and command.timestamp - top.timestamp <= self.merge_window):
+            cost = top.cost()
+            if top.merge(command):
+                top.timestamp = command.timestamp
+                self._memory += top.cost() - cost
+                return
+        self._undo.append(command)
+        self._memory += command.cost()
+        self._can_merge = True
+        self._trim()
+
+    def undo(self, editor):
+        """Undo the last command. Returns it, or None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        command.undo(editor)
+        self._redo.append(command)
+        self._can_merge = False
+        return command
+
+    def redo(self, editor):
+        """Redo the last undone command. Returns it, or None if there is nothing to redo."""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        command.redo(editor)
+        self._undo.append(command)
+        self._can_merge = False
+        return command
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_text(self):
+        return self._undo[-1].text if self._undo else ""
+
+    def redo_text(self):
+        return self._redo[-1].text if self._redo else ""
+
+    def memory(self):
+        """Estimated memory held by the history, in bytes."""
+        return self._memory
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._trim()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._memory = 0
+        self._can_merge = False
+
+    def _trim(self):
+        while self._memory > self.budget and len(self._undo) > 1:
+            self._memory -= self._undo.popleft().cost()
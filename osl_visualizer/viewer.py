@@ -1,20 +1,37 @@
 import os
 import json
+import time
 import logging
 from datetime import datetime
 
-from PyQt6 import uic
 from PyQt6.QtWidgets import (
-    QMainWindow, QFileDialog, QMessageBox, QInputDialog
+    QMainWindow, QFileDialog, QMessageBox, QInputDialog, QProgressBar, QPushButton
 )
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtMultimediaWidgets import QVideoWidget
-from PyQt6.QtCore import Qt, QUrl, QSettings
+from PyQt6.QtCore import Qt, QSettings, QSize, QSortFilterProxyModel, QObject, QTimer, pyqtSignal
 from PyQt6.QtGui import QShortcut, QKeySequence
 
-from models import VideoListModel, AnnotationListModel
-from dialogs import ConfigDialog, DownloaderDialog
-from utils import ms_to_time, ms_to_hms_ms
+from models import VideoListModel, AnnotationListModel, LabelListModel, LabelStatisticsModel
+from search import VideoFilterProxyModel
+from loader import OslLoadThread, ShardedLoadThread
+from store import AnnotationStore, LabelTable
+from lazy import LazyAnnotations
+from bincache import cache_path
+from osl_io import FragmentCache
+from saver import ExportThread, OslSaveThread, ShardedSaveThread
+from shards import MANIFEST_SUFFIX, is_sharded_path
+from undo import (UndoStack, AddAnnotation, RemoveAnnotation, SetLabel, MoveAnnotation,
+                  AddLabel, RemoveLabel, AddVideo, RemoveVideo, ApplyBulkEdit)
+from bulk import BulkEdit, RENAME, affected_videos, count_affected, apply_edit, revert_edit, renamed_label
+from labels import LabelRegistry
+from journal import EditJournal, JournalError, read_journal, journal_matches_file, replay_journal
+from pathcheck import CLOSE_WAIT_MS, PathValidator
+from probe import MediaProbeCache, MediaProbeThread, DEFAULT_FPS
+from thumbnails import ThumbnailCache, thumbnails_available
+from utils import ms_to_time, relative_video_path, resolve_video_path, app_cache_dir
+from uiloader import load_ui
+from profiling import startup
+from seeking import SeekScheduler
+from telemetry import telemetry
 
 
 logging.basicConfig(
@@ -24,15 +41,55 @@ logging.basicConfig(
 )
 
 
+class _RecordBridge(QObject):
+    record_signal = pyqtSignal(object)
+
+
 class StatusBarHandler(logging.Handler):
-    def __init__(self, status_bar):
+    """Shows log records on the status bar, with at most one update per interval.
+
+    Records arriving faster are coalesced: only the latest is formatted and
+    shown, with the number of records it replaced. Records logged by worker
+    threads reach the status bar through a queued signal.
+    """
+
+    def __init__(self, status_bar, interval_ms=250):
         super().__init__()
         self.status_bar = status_bar
+        self._pending = None
+        self._pending_count = 0
+        self._timer = QTimer(status_bar)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._flush)
+        self._bridge = _RecordBridge()
+        self._bridge.record_signal.connect(self._on_record)
 
     def emit(self, record):
+        self._bridge.record_signal.emit(record)
+
+    def _on_record(self, record):
+        if self._timer.isActive():
+            self._pending = record
+            self._pending_count += 1
+            return
+        self._show(record, 0)
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        record, skipped = self._pending, self._pending_count - 1
+        self._pending = None
+        self._pending_count = 0
+        telemetry.count("log.coalesced", skipped)
+        self._show(record, skipped)
+
+    def _show(self, record, skipped):
         msg = self.format(record)
-        # Display message on status bar
+        if skipped:
+            msg += f" (+{skipped} more)"
         self.status_bar.showMessage(msg, 5000)  # Display for 5 seconds
+        self._timer.start()
 
 
 class DatasetViewer(QMainWindow):
@@ -40,16 +97,8 @@ class DatasetViewer(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        uic.loadUi(os.path.join(os.path.dirname(__file__), "ui/mainwindow.ui"), self)
-
-        # Replace placeholder with QVideoWidget for video playback
-        placeholder = self.videoWidgetPlaceholder
-        layout = placeholder.parent().layout()
-        self.videoWidget = QVideoWidget(self)
-        layout.replaceWidget(placeholder, self.videoWidget)
-        placeholder.deleteLater()
-        self.videoWidget.setMinimumSize(300, 200)
-        self.videoWidget.show()
+        load_ui(self, "mainwindow")
+        startup.mark("main window UI")
 
         # Set Logging Configuration
         status_bar_handler = StatusBarHandler(self.statusBar)
@@ -58,34 +107,125 @@ class DatasetViewer(QMainWindow):
         status_bar_handler.setFormatter(formatter)
         logging.getLogger().addHandler(status_bar_handler)
 
+        # Loading progress widgets, shown only while a file is being parsed
+        self.loadProgressBar = QProgressBar(self)
+        self.loadProgressBar.setRange(0, 100)
+        self.loadProgressBar.setMaximumWidth(200)
+        self.cancelLoadButton = QPushButton("Cancel", self)
+        self.cancelLoadButton.clicked.connect(lambda: self.cancel_loading())
+        self.statusBar.addPermanentWidget(self.loadProgressBar)
+        self.statusBar.addPermanentWidget(self.cancelLoadButton)
+        self.loadProgressBar.hide()
+        self.cancelLoadButton.hide()
+
         # State variables
         self.osl_data = None
         self.current_video_info = None
         self.jump_before_ms = 5000
+        self.compact_annotations = False
+        self.label_table = LabelTable()
         self.last_osl_dir = ""
-        self.is_modified = False  # Track if the dataset has been modified
-
-        # Multimedia
-        self.player = QMediaPlayer(self)
-        self.audio_output = QAudioOutput(self)
-        self.player.setAudioOutput(self.audio_output)
-        self.player.setVideoOutput(self.videoWidget)
+        self.compact_json = False
+        self.show_thumbnails = True
+        self.lazy_loading = False  # Parse the annotations of a video only when it is opened
+        self.binary_cache = False  # Keep <project>.json.cache next to the project for fast reopening
+        self.scrub_preview = True  # Approximate, coarser seeks while dragging on the timeline
+        self.thumbnail_cache = None
+        # Unsaved changes are tracked per video; project-level changes (labels,
+        # video list) bump a single version counter
+        self.fragment_cache = FragmentCache()
+        self.modified_videos = {}  # id(video) -> video
+        self._project_version = 0
+        self._saved_project_version = 0
+        self.load_thread = None
+        self._pending_load = None  # (file_path, label_table) of a load whose first videos have not arrived yet
+        self._held_videos = None  # Videos read while a journal from a previous session waits to be recovered
+        self.save_thread = None
+        self.export_thread = None
+        self._load_started = self._save_started = self._export_started = 0.0  # perf_counter() at the start, for telemetry
+        self.journal = None  # Crash-recovery journal of the loaded project file
+        self.project = None  # ShardedProject when a folder or manifest of OSL JSON files is open
+        self.undo_memory_mb = 64  # Memory budget of the undo history
+        self.undo_stack = UndoStack(self.undo_memory_mb * 1024 * 1024)
+        self.media_cache = MediaProbeCache(os.path.join(app_cache_dir(), "media_probe.json"))
+        self.probe_threads = set()
+        self._probe_generation = 0  # Bumped by _stop_media_probes(); older results are dropped
+        self.current_media_info = None  # Probed metadata (fps, duration...) of the current video
+        # Checks in the background which video files exist, the GUI thread never waits on the file system
+        self.path_validator = PathValidator(parent=self)
+
+        # Multimedia: created on first use, QtMultimedia and its backend are slow to load
+        self._player = None  # Active player of the pool
+        self.player_pool = None
+        self.player_pool_size = 2  # Number of neighbouring videos kept open
+        self.audio_output = None
+        self.videoWidget = None
+        # Coalesces the seeks sent to the player and throttles the position shown by the UI
+        self.seek_scheduler = SeekScheduler(lambda: self.player, parent=self)
 
         # Models
         self.videoModel = VideoListModel([])
         self.annotationModel = AnnotationListModel([])
+        # Project labels, indexed for O(1) lookups, shown by the label combo box
+        self.label_registry = LabelRegistry(table=self.label_table)
+        self.labelModel = LabelListModel(self.label_registry)
+        self.labelComboBox.setModel(self.labelModel)
 
         # Attach models to QListView widgets
-        self.videoListView.setModel(self.videoModel)
+        self.videoProxy = VideoFilterProxyModel(parent=self)
+        self.videoProxy.setSourceModel(self.videoModel)
+        self.videoListView.setModel(self.videoProxy)
+        self._setup_statistics_panel()
         self.annotationListView.setModel(self.annotationModel)
+        self.timeline.set_model(self.annotationModel)
+        startup.mark("models and views")
 
         # Connect UI signals
         self._connect_signals()
         self._setup_shortcuts()
         self.load_settings()
+        self._update_thumbnails()
+        startup.mark("signals and settings")
 
         # Create a new project on startup
         self.new_project()
+        startup.mark("new project")
+
+    @property
+    def player(self):
+        """The active media player, created with the video widget the first time it is needed."""
+        if self._player is None:
+            self._create_player()
+        return self._player
+
+    def _create_player(self):
+        from PyQt6.QtMultimedia import QAudioOutput
+        from PyQt6.QtMultimediaWidgets import QVideoWidget
+        from player_pool import PlayerPool
+
+        # Replace placeholder with QVideoWidget for video playback
+        placeholder = self.videoWidgetPlaceholder
+        layout = placeholder.parent().layout()
+        self.videoWidget = QVideoWidget(self)
+        layout.replaceWidget(placeholder, self.videoWidget)
+        placeholder.deleteLater()
+        self.videoWidget.setMinimumSize(300, 200)
+        self.videoWidget.show()
+
+        self.audio_output = QAudioOutput(self)
+        self.player_pool = PlayerPool(self.videoWidget, self.audio_output, self.player_pool_size, parent=self)
+        self.player_pool.player_changed.connect(self._on_player_changed)
+        self._on_player_changed(None, self.player_pool.active)
+
+    def _on_player_changed(self, old, new):
+        """Move the player signal connections to the player that became active."""
+        if old is not None:
+            old.positionChanged.disconnect(self.seek_scheduler.on_player_position)
+            old.durationChanged.disconnect(self.update_duration)
+        self._player = new
+        new.positionChanged.connect(self.seek_scheduler.on_player_position)
+        new.durationChanged.connect(self.update_duration)
+        self.playButton.setText("Play")
 
     def _connect_signals(self):
         """Connects all UI widgets to their respective slots."""
@@ -93,15 +233,18 @@ class DatasetViewer(QMainWindow):
         self.saveButton.clicked.connect(self.save_osl_json)
         self.saveAsButton.clicked.connect(self.save_as_osl_json)
         self.videoListView.clicked.connect(self.on_video_selected)
+        self.videoFilterLineEdit.textChanged.connect(self.videoProxy.set_filter_text)
         self.annotationListView.clicked.connect(self.on_annotation_selected)
         self.playButton.clicked.connect(self.toggle_play_pause)
         self.labelComboBox.currentIndexChanged.connect(self.update_annotation_label)
         self.setTimeToVideoButton.clicked.connect(self.set_annotation_time_to_video)
         self.prevButton.clicked.connect(self.go_to_previous_annotation)
         self.nextButton.clicked.connect(self.go_to_next_annotation)
-        self.slider.sliderMoved.connect(self.seek_slider)
-        self.player.positionChanged.connect(self.update_slider)
-        self.player.durationChanged.connect(self.update_duration)
+        self.timeline.seek_requested.connect(self.seek_slider)
+        self.timeline.scrub_started.connect(self.seek_scheduler.begin_scrub)
+        self.timeline.scrub_finished.connect(self.seek_scheduler.end_scrub)
+        self.seek_scheduler.position_changed.connect(self.update_slider)
+        self.path_validator.availability_changed.connect(self.videoModel.set_availability)
         self.back5sButton.clicked.connect(lambda: self.step_video(-5000))
         self.back1sButton.clicked.connect(lambda: self.step_video(-1000))
         self.forward1sButton.clicked.connect(lambda: self.step_video(1000))
@@ -119,20 +262,33 @@ class DatasetViewer(QMainWindow):
         self.removeAnnotationButton.clicked.connect(self.remove_selected_annotation)
         self.addLabelButton.clicked.connect(self.add_label)
         self.removeLabelButton.clicked.connect(self.remove_label)
+        self.renameLabelButton.clicked.connect(self.rename_label)
         self.addVideoButton.clicked.connect(self.add_video)
         self.removeVideoButton.clicked.connect(self.remove_video)
         self.actionLoad_OSL_Json.triggered.connect(self.load_osl_json)
+        self.actionOpen_OSL_Folder.triggered.connect(self.load_osl_folder)
         self.actionSave_OSL_JSON.triggered.connect(self.save_osl_json)
         self.actionSave_As_OSL_JSON.triggered.connect(self.save_as_osl_json)
+        self.actionExport_Annotations.triggered.connect(self.export_annotations)
         self.actionOpen_Settings.triggered.connect(self.show_config_dialog)
         self.actionDataset_Downloader.triggered.connect(self.open_downloader_dialog)
+        self.actionUndo.triggered.connect(self.undo)
+        self.actionRedo.triggered.connect(self.redo)
+        self.actionBulk_Edit.triggered.connect(self.bulk_edit)
+        self.actionCollect_Telemetry.setChecked(telemetry.enabled)
+        self.actionCollect_Telemetry.toggled.connect(telemetry.enable)
+        self.actionDump_Telemetry.triggered.connect(self.dump_telemetry)
 
         # Set keyboard shortcuts directly on the actions
         self.actionLoad_OSL_Json.setShortcut(QKeySequence("Ctrl+O"))
+        self.actionOpen_OSL_Folder.setShortcut(QKeySequence("Ctrl+Shift+O"))
         self.actionSave_OSL_JSON.setShortcut(QKeySequence("Ctrl+S"))
         self.actionSave_As_OSL_JSON.setShortcut(QKeySequence("Ctrl+Shift+S"))
         self.actionOpen_Settings.setShortcut(QKeySequence("Ctrl+E"))
         self.actionDataset_Downloader.setShortcut(QKeySequence("Ctrl+D"))
+        self.actionUndo.setShortcut(QKeySequence("Ctrl+Z"))
+        self.actionRedo.setShortcuts([QKeySequence("Ctrl+Shift+Z"), QKeySequence("Ctrl+Y")])
+        self.actionBulk_Edit.setShortcut(QKeySequence("Ctrl+B"))
 
     def _setup_shortcuts(self):
         """Sets up keyboard shortcuts for video controls and annotation."""
@@ -156,49 +312,190 @@ class DatasetViewer(QMainWindow):
         self.current_video_info = None
         # self.jump_before_ms = 5000
         # self.last_osl_dir = ""
-        self.is_modified = False # Track if the dataset has been modified
+        self.clear_modified()
+        self._close_journal()
+        self.clear_undo()
+        self._reset_path_checks()
+        self.project = None
         from pathlib import Path
         # Set default file path to 'untitled.json' in the Documents folder
         unique_filename = f"untitled-{now.strftime('%Y%m%d-%H%M%S')}.json"
         self.last_osl_dir = str(Path.home() / "Documents")
         self.file_path = os.path.join(self.last_osl_dir, unique_filename)
 
-        self.videoModel.set_videos([])
+        self.videoModel.set_videos(self.osl_data["videos"])
         self.annotationModel.set_annotations([])
-        self.labelComboBox.clear()
+        self._set_labels(self.osl_data["labels"])
         self.current_video_info = None
-        self.is_modified = False
+        self.current_media_info = None
         logging.info("Started a new OSL project.")
 
     # ---------- File Operations ----------
 
     def load_osl_json(self):
         """Open a file dialog to select and load an OSL JSON file."""
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open OSL JSON File", self.last_osl_dir, "JSON Files (*.json)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open OSL JSON File", self.last_osl_dir,
+                                                   f"JSON Files (*.json);;OSL Projects (*{MANIFEST_SUFFIX})")
         self.load_osl_json_from_file(file_path)
 
+    def load_osl_folder(self):
+        """Open a folder and load all the OSL JSON files it holds as one project."""
+        folder = QFileDialog.getExistingDirectory(self, "Open Folder of OSL JSON Files", self.last_osl_dir)
+        self.load_osl_json_from_file(folder)
+
     def load_osl_json_from_file(self, file_path):
-        """Load OSL JSON data from the specified file path."""
+        """Load OSL JSON data from the specified file path.
+
+        The file is parsed in a background thread. Videos are added to the
+        video list in batches as they are decoded, so the first ones can be
+        opened before the whole file has been read.
+
+        file_path may also be a folder or a ``.oslproj`` manifest of OSL JSON
+        files, which are opened as one sharded project (see shards.py).
+
+        The current project stays open until the first videos have been
+        read, so a file that cannot be read does not close it.
+        """
         if file_path:
-            logging.info(f"Loading OSL JSON file: {file_path}")
-            self.last_osl_dir = os.path.dirname(file_path)
-            try:
-                with open(file_path, 'r') as f:
-                    self.osl_data = json.load(f)
-                videos = self.osl_data.get("videos", [])
-                self.videoModel.set_videos(videos)
-                self.current_video_info = None
-                self.annotationModel.set_annotations([])
-                self.labelComboBox.clear()
-                self.labelComboBox.addItems(self.osl_data.get("labels", []))
-                self.save_settings()
-                if hasattr(self, "player"):
-                    self.player.stop()       # Stop playback (if running)
-                    self.player.setSource(QUrl.fromLocalFile(""))
-                self.file_path = file_path
-                self.is_modified = False  # Reset modified flag after saving
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to load JSON: {e}")
+            sharded = is_sharded_path(file_path)
+            logging.info(f"Loading {'sharded project' if sharded else 'OSL JSON file'}: {file_path}")
+            self.cancel_loading(discard=False)
+            self.last_osl_dir = file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
+            label_table = LabelTable()
+            self._pending_load = (file_path, label_table)
+            self._load_started = time.perf_counter()
+            if sharded:
+                self.load_thread = ShardedLoadThread(file_path)
+            else:
+                self.load_thread = OslLoadThread(file_path, label_table if self.compact_annotations else None,
+                                                 lazy=self.lazy_loading, cache=self.binary_cache)
+            self.load_thread.videos_signal.connect(self.on_videos_loaded)
+            self.load_thread.progress_signal.connect(self.loadProgressBar.setValue)
+            self.load_thread.finished_signal.connect(self.on_load_finished)
+            self.load_thread.error_signal.connect(self.on_load_failed)
+            self.load_thread.cancelled_signal.connect(self.on_load_cancelled)
+            self.loadProgressBar.setValue(0)
+            self.loadProgressBar.show()
+            self.cancelLoadButton.show()
+            self.load_thread.start()
+
+    def is_loading(self):
+        """Return True while an OSL JSON file is being parsed in the background."""
+        return self.load_thread is not None and self.load_thread.isRunning()
+
+    def cancel_loading(self, discard=True):
+        """Stop a running background load. Partially loaded data is discarded."""
+        thread = self.load_thread
+        if thread is None:
+            return
+        self.load_thread = None
+        thread.request_stop()
+        thread.wait()
+        self._hide_load_progress()
+        if discard:
+            logging.info("Loading cancelled.")
+            self._end_failed_load()
+
+    def _end_failed_load(self):
+        """Keep the previous project if the failed load had not replaced it yet, else start a new one."""
+        if self._pending_load is not None:
+            self._pending_load = None
+        else:
+            self.new_project()
+
+    def _begin_loaded_project(self):
+        """Close the current project when the first videos of the file being loaded arrive."""
+        file_path, label_table = self._pending_load
+        self._pending_load = None
+        self._held_videos = None
+        self.osl_data = {"videos": [], "labels": []}
+        self.videoModel.set_videos(self.osl_data["videos"])
+        self.current_video_info = None
+        self.annotationModel.set_annotations([])
+        if self._player is not None:
+            self.seek_scheduler.reset()
+            self.player_pool.clear()  # Stop playback (if running) and close the preloaded videos
+        self.file_path = file_path
+        self.clear_modified()
+        self._close_journal()
+        self.clear_undo()
+        self._reset_path_checks()
+        self.project = None
+        self.label_table = label_table
+        self._set_labels(self.osl_data["labels"])
+        # Edits made while the rest of the file loads are journaled, unless edits of a previous
+        # session are waiting: they apply to the file as read, so its videos are only shown once complete
+        header, records = read_journal(self.file_path)
+        if records:
+            self._held_videos = []
+            return
+        if header is not None:
+            EditJournal(self.file_path).discard()
+        self.journal = EditJournal(self.file_path)
+
+    def _hide_load_progress(self):
+        self.loadProgressBar.hide()
+        self.cancelLoadButton.hide()
+
+    def _is_stale_load_signal(self):
+        # Queued signals from a cancelled or replaced loader may still arrive
+        return self.load_thread is None or self.sender() is not self.load_thread
+
+    def on_videos_loaded(self, videos):
+        if self._is_stale_load_signal():
+            return
+        if self._pending_load is not None:
+            self._begin_loaded_project()
+        if self._held_videos is not None:
+            self._held_videos.extend(videos)
+        else:
+            self.videoModel.append_videos(videos)
+
+    def on_load_finished(self, fields):
+        """Complete the project once the background parser has read the whole file."""
+        if self._is_stale_load_signal():
+            return
+        if self._pending_load is not None:
+            self._begin_loaded_project()
+        self.project = getattr(self.load_thread, "project", None)
+        self.load_thread = None
+        self._hide_load_progress()
+        videos = self.osl_data["videos"]
+        held_videos, self._held_videos = self._held_videos, None
+        added_labels = self.osl_data["labels"]  # Labels added while the file was loading
+        # Rebuild the top-level dict in document order so saves keep the original layout
+        self.osl_data = {key: (videos if key == "videos" else value) for key, value in fields.items()}
+        self.osl_data.setdefault("videos", videos)
+        if added_labels:
+            labels = self.osl_data.setdefault("labels", [])
+            labels.extend(label for label in added_labels if label not in labels)
+        if held_videos is not None:
+            videos.extend(held_videos)
+            self.videoModel.set_videos(videos)
+            self._recover_journal()
+            self.journal = EditJournal(self.file_path)
+        self.probe_media(self.osl_data["videos"])
+        self.check_video_paths(self.osl_data["videos"])
+        self._set_labels(self.osl_data.get("labels", []))
+        self.save_settings()
+        telemetry.record("load", time.perf_counter() - self._load_started)
+        telemetry.count("load.videos", len(videos))
+        logging.info(f"Loaded {len(videos)} videos from {self.file_path}")
+
+    def on_load_failed(self, message):
+        if self._is_stale_load_signal():
+            return
+        self.load_thread = None
+        self._hide_load_progress()
+        self._end_failed_load()
+        QMessageBox.critical(self, "Error", f"Failed to load JSON: {message}")
+
+    def on_load_cancelled(self):
+        if self._is_stale_load_signal():
+            return
+        self.load_thread = None
+        self._hide_load_progress()
+        self._end_failed_load()
 
     def save_osl_json(self):
         """Save current OSL JSON data to currentfile."""
@@ -222,57 +519,360 @@ class DatasetViewer(QMainWindow):
         if not self.osl_data:
             logging.warning("No data to save.")
             return False
+        if self.project is not None:
+            QMessageBox.warning(self, "Save As", "A project made of several OSL JSON files can only be saved "
+                                                 "in place, each video in its own file.")
+            return False
         file_path, _ = QFileDialog.getSaveFileName(self, "Save OSL JSON File", self.last_osl_dir, "JSON Files (*.json)")
         saved = self.save_osl_json_from_file(file_path)
         return saved
 
     def save_osl_json_from_file(self, file_path):
-        """Save current OSL JSON data to file."""
+        """Save current OSL JSON data to file.
+
+        Only videos edited since the last save are re-encoded; the file is
+        written in a background thread and replaced atomically. Returns True
+        if the save was started.
+
+        In a sharded project only the files whose videos, annotations or
+        labels changed are rewritten.
+        """
         if not file_path:
             logging.info("Save cancelled.")
             return False
-        try:
-            self.osl_data["date"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-            with open(file_path, 'w') as f:
-                json.dump(self.osl_data, f, indent=2)
-            logging.info(f"Annotations saved to {file_path}")
-            self.is_modified = False  # Reset modified flag after saving
-            QMessageBox.information(self, "Saved", f"Annotations saved to {file_path}")
+        if self.is_loading():
+            QMessageBox.warning(self, "Loading", "Please wait until the dataset has finished loading.")
+            return False
+        if self.is_saving():
+            QMessageBox.warning(self, "Saving", "A save is already in progress.")
+            return False
+        self.osl_data["date"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        indent = None if self.compact_json else 2
+        videos = list(self.osl_data.get("videos", []))
+        if self.project is not None:
+            labels = list(self.osl_data.get("labels", []))
+            plan = self.project.plan_save(videos, labels, self.modified_videos, self.osl_data["date"])
+            jobs = [(shard.file_path, osl_data, self._save_entries(osl_data["videos"], indent))
+                    for shard, osl_data in plan]
+            self._saving_plan = (plan, labels)
+        else:
+            # Shallow snapshot, so edits made while the file is written do not leak into it
+            snapshot = dict(self.osl_data)
+            snapshot["videos"] = videos
+            if isinstance(snapshot.get("labels"), list):
+                snapshot["labels"] = list(snapshot["labels"])
+            self._saving_plan = None
+        self._saving_versions = (
+            [(video, self.fragment_cache.version(video)) for video in self.modified_videos.values()],
+            self._project_version,
+        )
+        journal = self.journal if self.journal is not None and file_path == self.file_path else None
+        self._saving_journal = (journal, journal.checkpoint() if journal is not None else None)
+        if self.project is not None:
+            self.save_thread = ShardedSaveThread(file_path, jobs, indent)
+            logging.info(f"{len(jobs)} of {len(self.project.shards)} file(s) of the project modified.")
+        else:
+            self.save_thread = OslSaveThread(file_path, snapshot, self._save_entries(videos, indent), indent,
+                                             cache=self.binary_cache)
+        self.save_thread.finished_signal.connect(self.on_save_finished)
+        self.save_thread.error_signal.connect(self.on_save_failed)
+        logging.info(f"Saving annotations to {file_path}...")
+        self._save_started = time.perf_counter()
+        self.save_thread.start()
+        return True
+
+    def _save_entries(self, videos, indent):
+        return [(video, self.fragment_cache.version(video), self.fragment_cache.get(video, indent))
+                for video in videos]
+
+    def is_saving(self):
+        return self.save_thread is not None and self.save_thread.isRunning()
+
+    def wait_for_save(self):
+        """Block until a running save completes. Returns False if it failed."""
+        thread = self.save_thread
+        if thread is None:
             return True
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save JSON: {e}")
+        thread.wait()
+        return thread.error is None
+
+    def on_save_finished(self, file_path):
+        if self.sender() is not self.save_thread:
+            return
+        self._complete_save()
+        QMessageBox.information(self, "Saved", f"Annotations saved to {file_path}")
+
+    def _complete_save(self):
+        """Update the modification state and the journal after a successful save."""
+        thread = self.save_thread
+        self.save_thread = None
+        telemetry.record("save", time.perf_counter() - self._save_started)
+        telemetry.count("save.reencoded_videos", len(thread.encoded))
+        for video, version, fragment in thread.encoded:
+            self.fragment_cache.put(video, version, thread.indent, fragment)
+        # Videos edited while the file was being written stay modified
+        saved_videos, saved_project_version = self._saving_versions
+        for video, version in saved_videos:
+            if self.fragment_cache.version(video) == version:
+                self.modified_videos.pop(id(video), None)
+        self._saved_project_version = saved_project_version
+        if self._saving_plan is not None and self.project is not None:
+            self.project.mark_saved(*self._saving_plan)
+        if thread.cache_file is not None:
+            # The cache was built from the data while it was being saved: only keep it if nothing changed since
+            try:
+                if not self.modified_videos and self._project_version == saved_project_version:
+                    os.replace(thread.cache_file, cache_path(thread.file_path))
+                else:
+                    os.remove(thread.cache_file)
+            except OSError as e:
+                logging.warning(f"Could not update the binary cache: {e}")
+        journal, checkpoint = self._saving_journal
+        if journal is not None and journal is self.journal:
+            journal.compact(checkpoint)
+        logging.info(f"Annotations saved to {thread.file_path}")
+
+    def on_save_failed(self, message):
+        if self.sender() is not self.save_thread:
+            return
+        self.save_thread = None
+        QMessageBox.critical(self, "Error", f"Failed to save JSON: {message}")
+
+    # ---------- Export ----------
+
+    def export_annotations(self):
+        """Export the annotations as one row per event, to CSV or JSON lines, in the background."""
+        if not self.osl_data or not self.osl_data.get("videos"):
+            logging.warning("No annotations to export.")
+            return False
+        if self.is_loading():
+            QMessageBox.warning(self, "Loading", "Please wait until the dataset has finished loading.")
+            return False
+        if self.export_thread is not None and self.export_thread.isRunning():
+            QMessageBox.warning(self, "Export", "An export is already in progress.")
             return False
+        default_path = os.path.splitext(self.file_path)[0] + "_events.csv" if self.project is None else \
+            os.path.join(self.last_osl_dir, "events.csv")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Annotations", default_path, "CSV Files (*.csv);;JSON Lines (*.jsonl)")
+        if not file_path:
+            return False
+        if not os.path.splitext(file_path)[1]:
+            file_path += ".jsonl" if "jsonl" in selected_filter else ".csv"
+        return self.export_annotations_to_file(file_path)
+
+    def export_annotations_to_file(self, file_path):
+        """Start exporting the annotations to file_path (.csv or .jsonl). Returns True if started."""
+        out_dir = os.path.dirname(os.path.abspath(file_path))
+        videos = list(self.osl_data.get("videos", []))
+        # Video paths are written relative to the exported file, frames use the probed frame rates
+        paths = {id(video): relative_video_path(self._video_path(video), out_dir) for video in videos}
+        fps = {}
+        for video in videos:
+            info = self.videoModel.media_info.get(video.get("path", ""))
+            if info and info.get("fps"):
+                fps[id(video)] = info["fps"]
+        self.export_thread = ExportThread(file_path, videos, paths, fps)
+        self.export_thread.finished_signal.connect(self.on_export_finished)
+        self.export_thread.error_signal.connect(self.on_export_failed)
+        self.export_thread.cancelled_signal.connect(self.on_export_cancelled)
+        logging.info(f"Exporting annotations to {file_path}...")
+        self._export_started = time.perf_counter()
+        self.export_thread.start()
+        return True
+
+    def on_export_finished(self, file_path, n_rows):
+        if self.sender() is not self.export_thread:
+            return
+        self.export_thread = None
+        telemetry.record("export", time.perf_counter() - self._export_started)
+        logging.info(f"Exported {n_rows} events to {file_path}")
+        QMessageBox.information(self, "Exported", f"Exported {n_rows} events to {file_path}")
+
+    def on_export_failed(self, message):
+        if self.sender() is not self.export_thread:
+            return
+        self.export_thread = None
+        QMessageBox.critical(self, "Error", f"Failed to export annotations: {message}")
+
+    def on_export_cancelled(self):
+        if self.sender() is not self.export_thread:
+            return
+        self.export_thread = None
+        logging.info("Export cancelled.")
+
+    # ---------- Modification Tracking ----------
+
+    @property
+    def is_modified(self):
+        """True if the project has changes that have not been saved."""
+        return bool(self.modified_videos) or self._project_version != self._saved_project_version
+
+    def mark_modified(self, video=None):
+        """Record an unsaved change to video, or to the project itself when video is None."""
+        if video is None:
+            self._project_version += 1
+        else:
+            self.fragment_cache.invalidate(video)
+            self.modified_videos[id(video)] = video
+
+    def clear_modified(self):
+        """Forget all unsaved changes and cached fragments (after loading or a new project)."""
+        self.fragment_cache.clear()
+        self.modified_videos.clear()
+        self._saved_project_version = self._project_version
+
+    # ---------- Edit Journal ----------
+
+    def _journal(self, op, **fields):
+        """Record an edit in the crash-recovery journal."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.append(op, **fields)
+        except OSError as e:
+            logging.warning(f"Could not write edit journal, crash recovery disabled: {e}")
+            self.journal = None
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def _recover_journal(self):
+        """Offer to replay the edits left in the journal by a session that was not saved."""
+        header, records = read_journal(self.file_path)
+        if not records:
+            if header is not None:
+                EditJournal(self.file_path).discard()
+            return
+        text = (f"Found {len(records)} unsaved edit(s) from a previous session for this file.\n"
+                "Do you want to recover them?")
+        if not journal_matches_file(header, self.file_path):
+            text += "\n\nWarning: the file has changed since these edits were recorded, they may not apply cleanly."
+        ret = QMessageBox.question(
+            self, "Recover Unsaved Edits", text,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if ret != QMessageBox.StandardButton.Yes:
+            EditJournal(self.file_path).discard()
+            logging.info("Discarded unsaved edits from the journal.")
+            return
+        try:
+            edited_videos, project_changed = replay_journal(self.osl_data, records)
+        except (JournalError, KeyError, TypeError) as e:
+            # Keep the journal aside so it is not offered again, and start over from the file
+            journal = EditJournal(self.file_path)
+            os.replace(journal.path, journal.path + ".failed")
+            QMessageBox.critical(self, "Error", f"Failed to recover unsaved edits: {e}\n"
+                                                f"The journal was kept as {journal.path}.failed")
+            self.load_osl_json_from_file(self.file_path)
+            return
+        self.videoModel.set_videos(self.osl_data["videos"])
+        self.clear_undo()  # The replayed edits cannot be undone
+        for video in edited_videos:
+            self.mark_modified(video)
+        if project_changed:
+            self.mark_modified()
+        logging.info(f"Recovered {len(records)} unsaved edit(s) from the journal.")
+
+    # ---------- Statistics Panel ----------
+
+    def _setup_statistics_panel(self):
+        self.labelStatisticsModel = LabelStatisticsModel(self.videoModel.statistics)
+        proxy = QSortFilterProxyModel(self)
+        proxy.setSourceModel(self.labelStatisticsModel)
+        proxy.setSortRole(Qt.ItemDataRole.UserRole)
+        self.labelStatisticsView.setModel(proxy)
+        self.labelStatisticsView.setSortingEnabled(True)
+        self.labelStatisticsView.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+        self.labelStatisticsView.verticalHeader().hide()
+        self.menuView.addAction(self.statisticsDock.toggleViewAction())
+        self.videoModel.statistics_changed.connect(self.update_statistics_panel)
+        self.update_statistics_panel()
+
+    def update_statistics_panel(self):
+        """Refresh the statistics panel from the incrementally maintained counts."""
+        stats = self.videoModel.statistics
+        n_videos = len(self.videoModel.videos)
+        average = stats.total_events / n_videos if n_videos else 0
+        self.statisticsSummaryLabel.setText(
+            f"{n_videos} videos, {stats.total_events} events, {len(stats.label_events)} labels "
+            f"({average:.1f} events per video)")
+        self.labelStatisticsModel.refresh()
+        self._update_video_statistics()
+
+    def _update_video_statistics(self):
+        video = self.current_video_info
+        if video is None:
+            self.statisticsVideoLabel.setText("")
+            return
+        n_events = self.videoModel.statistics.video_events(video) or 0
+        text = f"Current video: {n_events} events"
+        duration = self._current_duration()
+        if duration > 0:
+            text += f", {n_events * 60000 / duration:.2f} per minute"
+        self.statisticsVideoLabel.setText(text)
 
     # ---------- Model/View Selection ----------
 
+    @telemetry.instrument("video.select")
     def on_video_selected(self, index):
         """Load the selected video and its annotations."""
+        proxy_row = None
+        if index.model() is self.videoProxy:
+            proxy_row = index.row()
+            index = self.videoProxy.mapToSource(index)
         video = self.videoModel.data(index, Qt.ItemDataRole.UserRole)
         self.current_video_info = video
-        annotations = video.get("annotations", [])
-        self.annotationModel.set_annotations(annotations)
+        annotations = self._video_annotations(video)
 
         # Load video file
         video_rel_path = video.get("path")
-        if os.path.isabs(video_rel_path):
-            current_video_path = video_rel_path
-        else:
-            current_video_path = os.path.normpath(os.path.join(self.last_osl_dir, video_rel_path))
-
-        if os.path.exists(current_video_path):
-            self.player.setSource(QUrl.fromLocalFile(current_video_path))
+        current_video_path = self._video_path(video)
+        self.annotationModel.set_annotations(annotations, current_video_path)
+
+        # Use cached metadata right away, the media backend only reports it once the file is open
+        self.current_media_info = self.media_cache.peek(current_video_path) or self.videoModel.media_info.get(video_rel_path)
+        if self.current_media_info is None:
+            self.probe_media([video])
+        duration = self._current_duration()
+        self.timeline.set_duration(duration)
+        self.timeline.set_position(0)
+        self._update_video_statistics()
+        self.timeLabel.setText(f"{ms_to_time(0)} / {ms_to_time(duration)}")
+
+        if self._video_available(current_video_path):
+            self.seek_scheduler.reset()
+            if self.player_pool is None:
+                self._create_player()
+            player = self.player_pool.open(current_video_path)  # Instant if the video was preloaded
+            if player.duration() > 0:
+                self.update_duration(player.duration())  # A preloaded player will not report it again
+            if proxy_row is not None:
+                self._preload_neighbours(proxy_row)
             # self.player.play()
             # self.playButton.setText("Pause")
             # logging.info("Started video playback.")
         else:
             QMessageBox.warning(self, "File not found", f"Video file not found:\n{current_video_path}")
 
+    def _preload_neighbours(self, proxy_row):
+        """Open the videos around proxy_row, in the order of the video list, in warm players."""
+        paths = []
+        for distance in range(1, self.player_pool.size + 1):
+            for row in (proxy_row + distance, proxy_row - distance):
+                if 0 <= row < self.videoProxy.rowCount():
+                    video = self.videoModel.videos[self.videoProxy.mapToSource(self.videoProxy.index(row, 0)).row()]
+                    path = self._video_path(video)
+                    if self.path_validator.is_available(path) is not False:
+                        paths.append(path)
+        self.player_pool.preload(paths)
+
     def on_annotation_selected(self, index):
         """Select and display details for a specific annotation."""
         ann = self.annotationModel.data(index, Qt.ItemDataRole.UserRole)
-        self.labelComboBox.blockSignals(True)
-        self.labelComboBox.setCurrentText(ann["label"])
-        self.labelComboBox.blockSignals(False)
+        self._show_label(ann["label"])
         # self.annotationTimeLabel.setText(ms_to_hms_ms(ann["position"]))
         if "metadata" in ann:
             pretty = json.dumps(ann["metadata"], indent=2, ensure_ascii=False)
@@ -280,7 +880,7 @@ class DatasetViewer(QMainWindow):
         else:
             self.metadataTextEdit.setText("")
         jump_to = max(0, ann["position"] - self.jump_before_ms)
-        self.player.setPosition(jump_to)
+        self.seek_scheduler.seek(jump_to)
         # self.player.play()
         # self.playButton.setText("Pause")
         logging.info(f"Selected annotation at time={ann['position']}ms, label={ann['label']}")
@@ -292,51 +892,38 @@ class DatasetViewer(QMainWindow):
         idx = self.annotationListView.currentIndex().row()
         if idx < 0 or idx >= len(self.annotationModel.annotations):
             return
-        ann = self.annotationModel.annotations[idx]
-        ann["label"] = self.labelComboBox.currentText()
-        self.annotationModel.dataChanged.emit(
-            self.annotationModel.index(idx),
-            self.annotationModel.index(idx)
-        )
-        self.is_modified = True
+        video = self.current_video_info
+        label = self.labelComboBox.currentText()
+        old_label = self.relabel_annotation(video, idx, label)
+        if old_label != label:
+            self._push_undo(SetLabel(video, idx, old_label, label))
 
     def set_annotation_time_to_video(self):
-        """Set the time of the current annotation to the current video position, resort and refresh."""
+        """Set the time of the current annotation to the current video position and move it into place."""
         idx = self.annotationListView.currentIndex().row()
         if idx < 0 or idx >= len(self.annotationModel.annotations):
             QMessageBox.warning(self, "No annotation selected", "Please select an annotation to update.")
             return
-        current_time = int(self.player.position())
-        ann = self.annotationModel.annotations[idx]
-        ann["position"] = current_time
-        # Resort
-        anns = self.annotationModel.annotations
-        anns.sort(key=lambda a: a["position"])
-        self.annotationModel.set_annotations(anns)
-        self.is_modified = True
-        # Find new index
-        for new_idx, a in enumerate(anns):
-            if a is ann:
-                self.annotationListView.setCurrentIndex(self.annotationModel.index(new_idx))
-                # self.annotationTimeLabel.setText(ms_to_hms_ms(current_time))
-                break
+        video = self.current_video_info
+        current_time = int(self.seek_scheduler.position())
+        old_position = self.annotationModel.annotations[idx]["position"]
+        new_idx = self.retime_annotation(video, idx, current_time)
+        self._push_undo(MoveAnnotation(video, idx, new_idx, old_position, current_time))
 
     def add_annotation_at_current_time(self):
         """Add a new annotation at the current video time in chronological order."""
         if not self.current_video_info:
             QMessageBox.warning(self, "No video", "Please select a video first.")
             return
-        current_time = int(self.player.position())
+        current_time = int(self.seek_scheduler.position())
         current_label = self.labelComboBox.currentText() # or (self.osl_data["labels"][0] if self.osl_data and "labels" in self.osl_data and self.osl_data["labels"] else "Event")
         new_annotation = {
             "position": current_time,
             "label": current_label,
             "metadata": {}
         }
-        idx = self.annotationModel.add_annotation(new_annotation)
-        self.current_video_info["annotations"] = self.annotationModel.annotations
-        self.annotationListView.setCurrentIndex(self.annotationModel.index(idx))
-        self.is_modified = True
+        idx = self.insert_annotation(self.current_video_info, new_annotation)
+        self._push_undo(AddAnnotation(self.current_video_info, new_annotation, idx))
         logging.info(f"Added annotation at {current_time}ms, label={current_label}")
 
     def remove_selected_annotation(self):
@@ -352,9 +939,8 @@ class DatasetViewer(QMainWindow):
         )
         if ret != QMessageBox.StandardButton.Yes:
             return
-        self.annotationModel.remove_annotation(idx)
-        self.current_video_info["annotations"] = self.annotationModel.annotations
-        self.is_modified = True
+        annotation = self.delete_annotation(self.current_video_info, idx)
+        self._push_undo(RemoveAnnotation(self.current_video_info, annotation, idx))
         logging.info(f"Removed annotation at idx={idx}")
 
     # ---------- Label Management ----------
@@ -362,15 +948,12 @@ class DatasetViewer(QMainWindow):
     def add_label(self):
         text, ok = QInputDialog.getText(self, "Add Label", "Enter new label:")
         if ok and text.strip():
-            if "labels" not in self.osl_data:
-                self.osl_data["labels"] = []
-            if text not in self.osl_data["labels"]:
-                self.osl_data["labels"].append(text)
-                self.labelComboBox.addItem(text)
+            if text not in self.label_registry:
+                index = self.insert_label(text)
+                self._push_undo(AddLabel(text, index))
                 logging.info(f"Added label: {text}")
             else:
                 QMessageBox.information(self, "Duplicate", f"Label '{text}' already exists.")
-            self.is_modified = True
 
     def remove_label(self):
         label = self.labelComboBox.currentText()
@@ -384,13 +967,88 @@ class DatasetViewer(QMainWindow):
         )
         if ret != QMessageBox.StandardButton.Yes:
             return
-        if "labels" in self.osl_data and label in self.osl_data["labels"]:
-            self.osl_data["labels"].remove(label)
-            self.labelComboBox.removeItem(self.labelComboBox.currentIndex())
+        if label in self.label_registry:
+            index = self.delete_label(label)
+            self._push_undo(RemoveLabel(label, index))
             logging.info(f"Removed label: {label}")
         else:
             QMessageBox.warning(self, "Error", f"Label '{label}' not found.")
-        self.is_modified = True
+
+    # ---------- Bulk Editing ----------
+
+    def _bulk_scope_videos(self, scope):
+        """The videos a bulk edit applies to, for one of the BulkEditDialog.SCOPE_* values."""
+        from dialogs import BulkEditDialog
+        if scope == BulkEditDialog.SCOPE_SELECTED:
+            return [self.current_video_info] if self.current_video_info is not None else []
+        if scope == BulkEditDialog.SCOPE_FILTERED:
+            proxy = self.videoProxy
+            return [self.videoModel.videos[proxy.mapToSource(proxy.index(row, 0)).row()]
+                    for row in range(proxy.rowCount())]
+        return list(self.videoModel.videos)
+
+    def bulk_edit(self):
+        """Rename, merge or delete labels, or shift or rescale positions, across many videos at once."""
+        from dialogs import BulkEditDialog
+        statistics = self.videoModel.statistics
+        # Labels used by events but missing from the project labels can be renamed or deleted too
+        labels = list(self.label_registry)
+        labels += sorted(str(label) for label in statistics.label_events if label not in self.label_registry)
+
+        def preview(edit, scope):
+            return count_affected(self._bulk_scope_videos(scope), edit, statistics.video_labels)
+
+        scope = BulkEditDialog.SCOPE_FILTERED if self.videoProxy.is_filtering() else BulkEditDialog.SCOPE_ALL
+        dialog = BulkEditDialog(self, labels, preview, scope)
+        if not dialog.exec():
+            return
+        edit = dialog.get_edit()
+        if edit is None:
+            return
+        videos = self._bulk_scope_videos(dialog.get_scope())
+        changes, old_labels = self.apply_bulk_edit(edit, videos)
+        if changes or old_labels is not None:
+            self._push_undo(ApplyBulkEdit(edit, changes, old_labels))
+        logging.info(f"{edit.text}: changed {len(changes)} videos")
+
+    def rename_label(self):
+        """Rename the selected label, and the label of all its events, in every video."""
+        label = self.labelComboBox.currentText()
+        if not label:
+            QMessageBox.warning(self, "No Selection", "No label selected.")
+            return
+        text, ok = QInputDialog.getText(self, "Rename Label", f"Rename '{label}' in all videos to:", text=label)
+        text = text.strip()
+        if not ok or not text or text == label:
+            return
+        if text in self.label_registry:
+            ret = QMessageBox.question(
+                self, "Merge Labels",
+                f"The label '{text}' already exists. Do you want to merge '{label}' into it?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if ret != QMessageBox.StandardButton.Yes:
+                return
+        edit = BulkEdit(RENAME, [label], text)
+        changes, old_labels = self.apply_bulk_edit(edit, list(self.videoModel.videos))
+        self._push_undo(ApplyBulkEdit(edit, changes, old_labels))
+        self._show_label(text)
+        logging.info(f"Renamed label '{label}' to '{text}' in {len(changes)} videos")
+
+    def _set_labels(self, labels):
+        """Show labels, the project list edited in place from now on, in the label combo box."""
+        # Changing the combo box items must not relabel the selected annotation
+        self.labelComboBox.blockSignals(True)
+        self.labelModel.set_labels(labels, self.label_table)
+        self.labelComboBox.blockSignals(False)
+
+    def _show_label(self, label):
+        """Select label in the combo box, if it is a project label, without relabeling the annotation."""
+        if label not in self.label_registry:
+            return
+        self.labelComboBox.blockSignals(True)
+        self.labelComboBox.setCurrentIndex(self.label_registry.index(label))
+        self.labelComboBox.blockSignals(False)
 
     # ---------- Video Files Management ----------
 
@@ -398,23 +1056,27 @@ class DatasetViewer(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Video File", self.last_osl_dir, "Video Files (*.mp4 *.avi *.mkv);;All Files (*)")
         if not file_path:
             return
+        base_dir = self.last_osl_dir
+        shard = None
+        if self.project is not None:
+            # Added to the file of the selected video, or to the last file of the project
+            shard = self.project.shard_of(self.current_video_info) or self.project.shards[-1]
+            base_dir = shard.base_dir
         # Relative path for OSL dataset
-        rel_path = os.path.relpath(file_path, self.last_osl_dir) if self.last_osl_dir else file_path
+        rel_path = os.path.relpath(file_path, base_dir) if base_dir else file_path
         # Create video entry
         new_video = {
             "path": rel_path,
-            "annotations": []
+            "annotations": AnnotationStore(labels=self.label_table) if self.compact_annotations else []
         }
-        if "videos" not in self.osl_data:
-            self.osl_data["videos"] = []
-        self.osl_data["videos"].append(new_video)
-        self.osl_data["videos"].sort(key=lambda v: v["path"])
-        self.videoModel.set_videos(self.osl_data["videos"])
-        self.is_modified = True
+        if shard is not None:
+            self.project.assign(new_video, shard)
+        self.insert_video(new_video)
+        self._push_undo(AddVideo(new_video))
         logging.info(f"Added video: {rel_path}")
 
     def remove_video(self):
-        idx = self.videoListView.currentIndex().row()
+        idx = self.videoProxy.mapToSource(self.videoListView.currentIndex()).row()
         if idx < 0 or idx >= len(self.videoModel.videos):
             QMessageBox.warning(self, "No Selection", "Please select a video to remove.")
             return
@@ -426,24 +1088,224 @@ class DatasetViewer(QMainWindow):
         )
         if ret != QMessageBox.StandardButton.Yes:
             return
-        # Remove from OSL data
-        del self.osl_data["videos"][idx]
-        self.videoModel.set_videos(self.osl_data["videos"])
+        self.delete_video(video)
+        self._push_undo(RemoveVideo(video))
+        logging.info(f"Removed video: {video['path']}")
+
+    # ---------- Editing Primitives ----------
+    # Every edit, including undo and redo, goes through these methods so the
+    # models, the statistics, the modification state and the journal stay in sync.
+
+    def _video_annotations(self, video):
+        """The annotation list of video, parsed first if the video was lazily loaded."""
+        annotations = video.get("annotations", [])
+        if isinstance(annotations, LazyAnnotations):
+            annotations = annotations.materialize(self.label_table if self.compact_annotations else None)
+            video["annotations"] = annotations
+        return annotations
+
+    def _annotation_model(self, video):
+        """The annotation model of the current video, or a detached one for any other video."""
+        if video is self.current_video_info:
+            return self.annotationModel
+        return AnnotationListModel(self._video_annotations(video))
+
+    def _select_annotation(self, video, row):
+        if video is not self.current_video_info:
+            return
+        self.annotationListView.setCurrentIndex(self.annotationModel.index(row))
+        self._show_label(self.annotationModel.annotations[row]["label"])
+
+    def insert_annotation(self, video, annotation, row=None):
+        """Insert annotation into video at row, or in chronological order, and return its row."""
+        model = self._annotation_model(video)
+        if row is None:
+            row = model.add_annotation(annotation)
+        else:
+            model.insert_annotation(row, annotation)
+        video["annotations"] = model.annotations
+        self.videoModel.annotation_added(video, annotation["label"])
+        self.mark_modified(video)
+        self._journal("add_annotation", path=video.get("path"), row=row, annotation=annotation)
+        self._select_annotation(video, row)
+        return row
+
+    def delete_annotation(self, video, row):
+        """Remove the annotation at row of video and return it as a plain dict."""
+        model = self._annotation_model(video)
+        annotation = model.annotations[row]
+        if hasattr(annotation, "to_dict"):
+            annotation = annotation.to_dict()  # Row view of an AnnotationStore
+        model.remove_annotation(row)
+        video["annotations"] = model.annotations
+        self.videoModel.annotation_removed(video, annotation["label"])
+        self.mark_modified(video)
+        self._journal("remove_annotation", path=video.get("path"), row=row)
+        return annotation
+
+    def relabel_annotation(self, video, row, label):
+        """Set the label of the annotation at row of video and return its previous label."""
+        old_label = self._annotation_model(video).set_label(row, label)
+        self.videoModel.annotation_relabeled(video, old_label, label)
+        self.mark_modified(video)
+        self._journal("set_label", path=video.get("path"), row=row, label=label)
+        self._select_annotation(video, row)
+        return old_label
+
+    def retime_annotation(self, video, row, position):
+        """Move the annotation at row of video to position and return its new row."""
+        new_row = self._annotation_model(video).move_annotation(row, position)
+        self.mark_modified(video)
+        self._journal("move_annotation", path=video.get("path"), row=row, position=position)
+        self._select_annotation(video, new_row)
+        return new_row
+
+    def insert_label(self, label, index=None):
+        """Insert label in the project labels at index, or last, and return its index."""
+        self.osl_data.setdefault("labels", self.label_registry.labels)
+        # Changing the combo box items must not relabel the selected annotation
+        self.labelComboBox.blockSignals(True)
+        index = self.labelModel.insert_label(label, index)
+        self.labelComboBox.blockSignals(False)
+        self.mark_modified()
+        self._journal("add_label", label=label, index=index)
+        return index
+
+    def delete_label(self, label):
+        """Remove label from the project labels and return its former index."""
+        self.labelComboBox.blockSignals(True)
+        index = self.labelModel.remove_label(label)
+        self.labelComboBox.blockSignals(False)
+        self.mark_modified()
+        self._journal("remove_label", label=label)
+        return index
+
+    def apply_bulk_edit(self, edit, videos):
+        """Apply a bulk edit to videos in one pass and return ``(changes, old_labels)`` to revert it.
+
+        Only the videos the edit changes, according to the statistics, are
+        parsed if they were lazily loaded. old_labels are the project labels
+        before a rename, or None if they did not change.
+        """
+        statistics = self.videoModel.statistics
+        affected = affected_videos(videos, edit, statistics.video_labels)
+        # When these videos hold every event of the renamed label, it can be renamed in the label table.
+        # Only compact stores refer to the table; plain lists are relabeled event by event.
+        dataset_wide = (sum(n_events for _, n_events in affected)
+                        == sum(statistics.label_events.get(label, 0) for label in edit.sources()))
+        table = self.label_table if dataset_wide and self.compact_annotations else None
+        changes = apply_edit([video for video, _ in affected], edit, self._video_annotations, table)
+        new_labels = edit.new_labels(self.label_registry.labels)
+        old_labels = None
+        if new_labels is not None:
+            old_labels = list(self.label_registry)
+            self._replace_labels(new_labels)
+        self._bulk_edited([video for video, _ in changes], renamed_label(changes))
+        self._journal("bulk", edit=edit.to_record(), paths=[video.get("path") for video, _ in changes])
+        return changes, old_labels
+
+    def revert_bulk_edit(self, changes, old_labels=None):
+        """Undo the changes returned by apply_bulk_edit()."""
+        revert_edit(changes, self._video_annotations)
+        if old_labels is not None:
+            self._replace_labels(old_labels)
+        renamed = renamed_label(changes)
+        self._bulk_edited([video for video, _ in changes], renamed[::-1] if renamed else None)
+        self._journal("bulk_revert", changes=[dict(change, path=video.get("path")) for video, change in changes],
+                      labels=old_labels)
+
+    def _replace_labels(self, labels):
+        self.osl_data.setdefault("labels", self.label_registry.labels)
+        self.labelComboBox.blockSignals(True)
+        self.labelModel.replace_labels(labels)
+        self.labelComboBox.blockSignals(False)
+        self.mark_modified()
+
+    def _bulk_edited(self, videos, renamed=None):
+        """Refresh the statistics and the views once after a bulk edit of videos.
+
+        renamed is ``(old, new)`` when the edit renamed a label of every event
+        using it, whose counts then move to the new label without recounting.
+        """
+        for video in videos:
+            self.mark_modified(video)
+        if renamed is not None:
+            self.videoModel.rename_label(*renamed)
+        else:
+            self.videoModel.refresh_videos(videos)
+        if self.videoProxy.is_filtering():
+            self.videoProxy.set_filter_text(self.videoFilterLineEdit.text())  # Labels may have changed
+        if any(video is self.current_video_info for video in videos):
+            self.annotationModel.set_annotations(self.current_video_info["annotations"],
+                                                 self.annotationModel.video_path)
+
+    def insert_video(self, video):
+        """Insert video in path order and return its row."""
+        # The video model shares its list with osl_data["videos"]
+        self.osl_data.setdefault("videos", self.videoModel.videos)
+        if not self.videoModel.is_sorted_by_path():
+            self.videoModel.sort_by_path()
+        row = self.videoModel.insert_video(video)
+        self.videoListView.scrollTo(self.videoProxy.mapFromSource(self.videoModel.index(row)))
+        self.probe_media([video])
+        self.check_video_paths([video])
+        self.mark_modified()
+        self._journal("add_video", row=row, video=video)
+        return row
+
+    def delete_video(self, video):
+        """Remove video and all its annotations from the project and return its former row."""
+        row = self.videoModel.row_of(video)
+        self.videoModel.remove_video(row)
         # Reset annotation panel if you just deleted the current video
-        if self.current_video_info == video:
+        if self.current_video_info is video:
             self.current_video_info = None
             self.annotationModel.set_annotations([])
-        self.is_modified = True
-        logging.info(f"Removed video: {video['path']}")
+            self._update_video_statistics()
+        self.fragment_cache.discard(video)
+        self.modified_videos.pop(id(video), None)
+        self.mark_modified()
+        self._journal("remove_video", row=row, path=video.get("path"))
+        return row
+
+    # ---------- Undo / Redo ----------
+
+    def _push_undo(self, command):
+        self.undo_stack.push(command)
+        self._update_undo_actions()
+
+    def undo(self):
+        """Undo the last edit."""
+        command = self.undo_stack.undo(self)
+        if command is not None:
+            logging.info(f"Undo: {command.text}")
+        self._update_undo_actions()
+
+    def redo(self):
+        """Redo the last undone edit."""
+        command = self.undo_stack.redo(self)
+        if command is not None:
+            logging.info(f"Redo: {command.text}")
+        self._update_undo_actions()
+
+    def clear_undo(self):
+        self.undo_stack.clear()
+        self._update_undo_actions()
+
+    def _update_undo_actions(self):
+        self.actionUndo.setEnabled(self.undo_stack.can_undo())
+        self.actionUndo.setText(f"Undo {self.undo_stack.undo_text()}".rstrip())
+        self.actionRedo.setEnabled(self.undo_stack.can_redo())
+        self.actionRedo.setText(f"Redo {self.undo_stack.redo_text()}".rstrip())
 
     # ---------- Video Playback Controls ----------
 
     def toggle_play_pause(self):
         """Toggle play/pause state of the video."""
-        if self.player.source().isEmpty():
+        if self._player is None or self.player.source().isEmpty():
             QMessageBox.information(self, "No Video", "No video is loaded.")
             return
-        if self.player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
+        if self.player.playbackState() == self.player.PlaybackState.PlayingState:
             self.player.pause()
             self.playButton.setText("Play")
             logging.info("Paused video.")
@@ -454,36 +1316,24 @@ class DatasetViewer(QMainWindow):
 
     def go_to_previous_annotation(self):
         """Go to the annotation before the current playback time."""
-        pos = self.player.position()
-        prev_idx = None
-        for i, ann in enumerate(self.annotationModel.annotations):
-            if ann["position"] < pos:
-                prev_idx = i
-            else:
-                break
-        if prev_idx is not None:
-            self.annotationListView.setCurrentIndex(self.annotationModel.index(prev_idx))
-            self.on_annotation_selected(self.annotationModel.index(prev_idx))
+        row = self.annotationModel.previous_row(self.seek_scheduler.position())
+        if row is not None:
+            self.annotationListView.setCurrentIndex(self.annotationModel.index(row))
+            self.on_annotation_selected(self.annotationModel.index(row))
 
     def go_to_next_annotation(self):
         """Go to the annotation after the current playback time."""
-        pos = self.player.position()
-        for i, ann in enumerate(self.annotationModel.annotations):
-            if ann["position"] > pos:
-                self.annotationListView.setCurrentIndex(self.annotationModel.index(i))
-                self.on_annotation_selected(self.annotationModel.index(i))
-                break
+        row = self.annotationModel.next_row(self.seek_scheduler.position())
+        if row is not None:
+            self.annotationListView.setCurrentIndex(self.annotationModel.index(row))
+            self.on_annotation_selected(self.annotationModel.index(row))
 
     def update_slider(self, position):
-        """Update the slider position and time display."""
-        self.slider.blockSignals(True)
-        duration = self.player.duration()
-        if duration > 0:
-            slider_value = int((position / duration) * 1000)
-            self.slider.setValue(slider_value)
+        """Update the timeline playhead and time display."""
+        duration = self._current_duration()
+        self.timeline.set_position(position)
         self.timeLabel.setText(f"{ms_to_time(position)} / {ms_to_time(duration)}")
         # self.highlight_current_annotation(position)
-        self.slider.blockSignals(False)
 
     # def highlight_current_annotation(self, position):
     #     """Highlight the annotation closest to the current playback position."""
@@ -493,31 +1343,113 @@ class DatasetViewer(QMainWindow):
     #             break
 
     def update_duration(self, duration):
-        """Reset the slider when video duration changes (e.g., new video loaded)."""
-        self.slider.setValue(0)
+        """Reset the timeline when video duration changes (e.g., new video loaded)."""
+        self.timeline.set_duration(self._current_duration())
+        self.timeline.set_position(self.player.position())
+        self._update_video_statistics()
 
-    def seek_slider(self, value):
-        """Seek the video to the position indicated by the slider."""
-        duration = self.player.duration()
-        if duration > 0:
-            pos = int((value / 1000) * duration)
-            self.player.setPosition(pos)
-            self.timeLabel.setText(f"{ms_to_time(pos)} / {ms_to_time(duration)}")
-            logging.info(f"Seeked video to {pos}ms.")
+    def seek_slider(self, pos):
+        """Seek the video to the position (in ms) picked on the timeline."""
+        if self._current_duration() > 0:
+            self.seek_scheduler.seek(pos)
+            logging.debug(f"Seeked video to {pos}ms.")  # Not shown on the status bar, seeks come in bursts
 
     # ---------- Video Stepping ----------
 
     def step_video(self, ms_delta):
         """Jump forward or backward by ms_delta milliseconds."""
-        pos = self.player.position()
-        duration = self.player.duration()
+        pos = self.seek_scheduler.position()
+        duration = self._current_duration()
         new_pos = min(max(pos + ms_delta, 0), duration)
-        self.player.setPosition(new_pos)
+        self.seek_scheduler.seek(new_pos)
 
     def step_frame(self, direction):
-        """Jump forward/backward by one frame (approx 40 ms at 25 FPS)."""
-        frame_ms = 40  # Adjust for your FPS if needed
-        self.step_video(frame_ms * direction)
+        """Jump forward/backward by one frame, using the probed FPS of the video (25 FPS if unknown)."""
+        fps = self._current_fps()
+        frame = round(self.seek_scheduler.position() * fps / 1000) + direction
+        new_pos = round(frame * 1000 / fps)
+        self.seek_scheduler.seek(min(max(new_pos, 0), self._current_duration()))
+
+    # ---------- Media Metadata ----------
+
+    def _current_fps(self):
+        if self.current_media_info and self.current_media_info.get("fps"):
+            return self.current_media_info["fps"]
+        return DEFAULT_FPS
+
+    def _current_duration(self):
+        """Duration of the current video, from the player or else from the probe cache."""
+        duration = self._player.duration() if self._player is not None else 0
+        if duration <= 0 and self.current_media_info and self.current_media_info.get("duration_ms"):
+            duration = self.current_media_info["duration_ms"]
+        return duration
+
+    def check_video_paths(self, videos):
+        """Check in the background whether the files of videos exist, to mark the missing ones in the list."""
+        self.path_validator.validate([(video.get("path", ""), self._video_path(video)) for video in videos])
+
+    def _video_path(self, video):
+        """Absolute path of the file of video, whose path is relative to the OSL JSON file holding it."""
+        base_dir = self.project.base_dir(video) if self.project is not None else self.last_osl_dir
+        return resolve_video_path(video.get("path", ""), base_dir)
+
+    def _video_available(self, path):
+        """Whether the video file at path exists, answered from the background checks when possible."""
+        if self.player_pool is not None and self.player_pool.is_warm(path):
+            return True
+        available = self.path_validator.is_available(path)
+        if available is None:
+            available = os.path.exists(path)  # Not checked yet
+        return available
+
+    def _reset_path_checks(self):
+        self.path_validator.clear()
+        self.videoModel.availability.clear()
+
+    def probe_media(self, videos):
+        """Read FPS, duration and resolution of videos in the background, using the on-disk cache."""
+        paths = [(video.get("path", ""), self._video_path(video)) for video in videos]
+        cached = [(key, self.media_cache.peek(path)) for key, path in paths]
+        self.videoModel.set_media_info([(key, info) for key, info in cached if info is not None])
+        thread = MediaProbeThread(self.media_cache, paths)
+        thread.generation = self._probe_generation
+        thread.probed_signal.connect(self.on_media_probed)
+        thread.finished.connect(lambda: self.probe_threads.discard(thread))
+        self.probe_threads.add(thread)
+        thread.start()
+
+    def on_media_probed(self, items):
+        if self.sender().generation != self._probe_generation:
+            return
+        self.videoModel.set_media_info(items)
+        if self.current_video_info is not None:
+            info = dict(items).get(self.current_video_info.get("path"))
+            if info is not None:
+                self.current_media_info = info
+                if self.timeline.duration != self._current_duration():
+                    self.timeline.set_duration(self._current_duration())
+                self.update_slider(self._player.position() if self._player is not None else 0)
+
+    def _update_thumbnails(self):
+        """Create or drop the annotation thumbnail cache according to the settings."""
+        enabled = self.show_thumbnails and thumbnails_available()
+        if enabled and self.thumbnail_cache is None:
+            self.thumbnail_cache = ThumbnailCache(os.path.join(app_cache_dir(), "thumbnails"), parent=self)
+            self.annotationModel.set_thumbnail_cache(self.thumbnail_cache)
+            self.annotationListView.setIconSize(QSize(self.thumbnail_cache.width, self.thumbnail_cache.width * 9 // 16))
+        elif not enabled and self.thumbnail_cache is not None:
+            self.annotationModel.set_thumbnail_cache(None)
+            self.thumbnail_cache.shutdown()
+            self.thumbnail_cache = None
+        self.annotationModel.layoutChanged.emit()
+
+    def _stop_media_probes(self, wait_ms=0):
+        """Ask the media probes to stop and drop their results; only closing waits for them, at most wait_ms."""
+        self._probe_generation += 1
+        for thread in list(self.probe_threads):
+            thread.request_stop()
+            if wait_ms:
+                thread.wait(wait_ms)
 
     def speed_video(self, factor):
         """Set the playback speed of the video."""
@@ -527,9 +1459,25 @@ class DatasetViewer(QMainWindow):
         self.player.setPlaybackRate(factor)
         logging.info(f"Set video playback speed to {factor}x")
 
+    # ---------- Telemetry ----------
+
+    def dump_telemetry(self):
+        """Write the collected counters, latency histograms and memory snapshot to a JSON file."""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Telemetry", os.path.join(self.last_osl_dir, "telemetry.json"),
+                                                   "JSON Files (*.json)")
+        if not file_path:
+            return
+        try:
+            telemetry.dump(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save telemetry: {e}")
+            return
+        logging.info(f"Telemetry saved to {file_path}")
+
     # ---------- Dataset Downloader Dialog ----------
 
     def open_downloader_dialog(self):
+        from dialogs import DownloaderDialog
         dialog = DownloaderDialog(self)
         dialog.exec()
 
@@ -537,9 +1485,25 @@ class DatasetViewer(QMainWindow):
 
     def show_config_dialog(self):
         """Open the configuration/settings dialog for the user to change settings."""
-        dialog = ConfigDialog(self, self.jump_before_ms)
+        from dialogs import ConfigDialog
+        dialog = ConfigDialog(self, self.jump_before_ms, self.compact_annotations, self.compact_json,
+                              self.show_thumbnails, self.lazy_loading, self.binary_cache, self.undo_memory_mb,
+                              self.scrub_preview, self.player_pool_size)
         if dialog.exec():
             self.jump_before_ms = dialog.get_jump_before()
+            self.compact_annotations = dialog.get_compact_annotations()
+            self.compact_json = dialog.get_compact_json()
+            self.show_thumbnails = dialog.get_show_thumbnails()
+            self.lazy_loading = dialog.get_lazy_loading()
+            self.binary_cache = dialog.get_binary_cache()
+            self.undo_memory_mb = dialog.get_undo_memory_mb()
+            self.undo_stack.set_budget(self.undo_memory_mb * 1024 * 1024)
+            self.scrub_preview = dialog.get_scrub_preview()
+            self.seek_scheduler.preview = self.scrub_preview
+            self.player_pool_size = dialog.get_player_pool_size()
+            if self.player_pool is not None:
+                self.player_pool.set_size(self.player_pool_size)
+            self._update_thumbnails()
             self.save_settings()   # Persist!
 
     def save_settings(self):
@@ -547,6 +1511,14 @@ class DatasetViewer(QMainWindow):
         settings = QSettings("OSLActionSpotting", "DatasetAnnotationTool")
         settings.setValue("jump_before_ms", self.jump_before_ms)
         settings.setValue("last_osl_dir", self.last_osl_dir)
+        settings.setValue("compact_annotations", self.compact_annotations)
+        settings.setValue("compact_json", self.compact_json)
+        settings.setValue("show_thumbnails", self.show_thumbnails)
+        settings.setValue("lazy_loading", self.lazy_loading)
+        settings.setValue("binary_cache", self.binary_cache)
+        settings.setValue("undo_memory_mb", self.undo_memory_mb)
+        settings.setValue("scrub_preview", self.scrub_preview)
+        settings.setValue("player_pool_size", self.player_pool_size)
 
     def load_settings(self):
         """Load persistent user settings using QSettings."""
@@ -556,6 +1528,22 @@ class DatasetViewer(QMainWindow):
         except (TypeError, ValueError):
             self.jump_before_ms = 5000
         self.last_osl_dir = settings.value("last_osl_dir", "")
+        self.compact_annotations = settings.value("compact_annotations", False, type=bool)
+        self.compact_json = settings.value("compact_json", False, type=bool)
+        self.show_thumbnails = settings.value("show_thumbnails", True, type=bool)
+        self.lazy_loading = settings.value("lazy_loading", False, type=bool)
+        self.binary_cache = settings.value("binary_cache", False, type=bool)
+        try:
+            self.undo_memory_mb = max(1, int(settings.value("undo_memory_mb", 64)))
+        except (TypeError, ValueError):
+            self.undo_memory_mb = 64
+        self.undo_stack.set_budget(self.undo_memory_mb * 1024 * 1024)
+        self.scrub_preview = settings.value("scrub_preview", True, type=bool)
+        self.seek_scheduler.preview = self.scrub_preview
+        try:
+            self.player_pool_size = max(0, int(settings.value("player_pool_size", 2)))
+        except (TypeError, ValueError):
+            self.player_pool_size = 2
 
     # ---------- Close Event Handling ----------
 
@@ -588,16 +1576,33 @@ class DatasetViewer(QMainWindow):
                 event.ignore()
                 return False
         elif clicked == dont_save_btn:
+            if self.journal is not None:
+                self.journal.discard()  # The user chose to drop the unsaved edits
             return True  # Allow quit without saving
         else:  # Cancel
             event.ignore()
             return False
 
     def closeEvent(self, event):
+        if self.is_loading():
+            # A partially loaded project must never be saved over the original file
+            self.cancel_loading()
         if self.is_modified:
             if self.maybe_save_before_exit(event):
-                event.accept()
+                if self.wait_for_save():
+                    if self.save_thread is not None:
+                        self._complete_save()
+                    event.accept()
+                else:
+                    event.ignore()  # The error is reported by on_save_failed
             # If not, event is already ignored inside maybe_save_before_exit
         else:
             event.accept()
-
+        if event.isAccepted():
+            if self.export_thread is not None:
+                self.export_thread.request_stop()  # The previous export file is kept
+                self.export_thread.wait()
+            self._stop_media_probes(CLOSE_WAIT_MS)
+            self.path_validator.stop(CLOSE_WAIT_MS)
+            if self.thumbnail_cache is not None:
+                self.thumbnail_cache.shutdown()
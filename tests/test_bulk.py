@@ -0,0 +1,69 @@
+import copy
+
+import pytest
+
+from bulk import BulkEdit, DELETE, RENAME, RESCALE, SHIFT, apply_edit, renamed_label, revert_edit
+from store import LabelTable, compact_videos
+
+VIDEOS = [
+    {"path": "a.mp4", "annotations": [
+        {"label": "Goal", "position": 1000, "team": "home"},
+        {"label": "Foul", "position": 2000},
+        {"label": "Goal", "position": 3000, "team": "away"},
+    ]},
+    {"path": "b.mp4", "annotations": [
+        {"label": "Foul", "position": 500},
+        {"label": "Corner", "position": 1500},
+    ]},
+    {"path": "c.mp4", "annotations": []},
+]
+
+EDITS = [
+    BulkEdit(RENAME, ["Foul"], target="Free kick"),
+    BulkEdit(RENAME, ["Foul", "Corner"], target="Goal"),
+    BulkEdit(DELETE, ["Goal"]),
+    BulkEdit(DELETE, ["Foul", "Corner"]),
+    BulkEdit(SHIFT, offset=-700),
+    BulkEdit(RESCALE, from_fps=25, to_fps=50),
+]
+
+
+def events(videos):
+    return [[dict(ann) for ann in video["annotations"]] for video in videos]
+
+
+def make_videos(compact):
+    videos = copy.deepcopy(VIDEOS)
+    table = LabelTable(["Goal", "Foul", "Corner"])
+    if compact:
+        compact_videos(videos, table)
+    return videos, table
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["plain", "compact"])
+@pytest.mark.parametrize("edit", EDITS, ids=repr)
+def test_revert_restores_the_events(edit, compact):
+    videos, _ = make_videos(compact)
+    changes = apply_edit(videos, edit)
+    assert changes
+    assert events(videos) != events(VIDEOS)
+    revert_edit(changes)
+    assert events(videos) == events(VIDEOS)
+
+
+def test_edits_change_only_matching_events():
+    videos, _ = make_videos(False)
+    changes = apply_edit(videos, BulkEdit(SHIFT, offset=-700))
+    assert [ann["position"] for ann in videos[0]["annotations"]] == [300, 1300, 2300]
+    assert [ann["position"] for ann in videos[1]["annotations"]] == [0, 800]  # Clipped at 0
+    assert [video["path"] for video, _ in changes] == ["a.mp4", "b.mp4"]
+
+
+def test_rename_in_label_table_reverts():
+    videos, table = make_videos(True)
+    changes = apply_edit(videos, BulkEdit(RENAME, ["Foul"], target="Free kick"), table=table)
+    assert renamed_label(changes) == ("Foul", "Free kick")
+    assert "Foul" not in table and [ann["label"] for ann in videos[1]["annotations"]] == ["Free kick", "Corner"]
+    revert_edit(changes)
+    assert "Free kick" not in table
+    assert events(videos) == events(VIDEOS)
@@ -0,0 +1,119 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from downloader import ParallelDownloader, DownloadItem, resolve_url
+
+REPO = "org/dataset"
+FILES = {
+    "train/annotations.json": b'{"videos": []}',
+    "train/video.mp4": bytes(range(256)) * 40,
+}
+
+
+class HubHandler(BaseHTTPRequestHandler):
+    """Serves FILES under the Hub's resolve URLs, honouring Range requests."""
+
+    def _body(self):
+        prefix = f"/datasets/{REPO}/resolve/main/"
+        if not self.path.startswith(prefix):
+            return None
+        return FILES.get(self.path[len(prefix):])
+
+    def do_HEAD(self):
+        body = self._body()
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+    def do_GET(self):
+        body = self._body()
+        if body is None:
+            self.send_error(404)
+            return
+        self.server.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HubHandler)
+    server.ranges = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_item(server, tmp_path, path_in_repo):
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    return DownloadItem(resolve_url(endpoint, REPO, "main", path_in_repo), str(tmp_path / path_in_repo))
+
+
+def test_fetch_sizes_reports_missing_files(hub, tmp_path):
+    items = [make_item(hub, tmp_path, path) for path in FILES]
+    missing_item = make_item(hub, tmp_path, "train/missing.mp4")
+    missing = ParallelDownloader(max_workers=2).fetch_sizes(items + [missing_item])
+    assert missing == [missing_item]
+    assert [item.size for item in items] == [len(body) for body in FILES.values()]
+
+
+def test_download_all_resumes_part_files(hub, tmp_path):
+    items = [make_item(hub, tmp_path, path) for path in FILES]
+    downloader = ParallelDownloader(max_workers=2, chunk_size=100)
+    assert downloader.fetch_sizes(items) == []
+    video = items[1]
+    os.makedirs(os.path.dirname(video.dest))
+    with open(video.dest + ".part", "wb") as f:
+        f.write(FILES["train/video.mp4"][:1000])
+
+    finished = []
+    progress = []
+    failed = downloader.download_all(items, on_progress=lambda *args: progress.append(args),
+                                     on_file_done=lambda item, error: finished.append((item, error)),
+                                     interval=0.01)
+
+    assert failed == []
+    assert sorted(item.name for item, error in finished if error is None) == ["annotations.json", "video.mp4"]
+    assert sorted(hub.ranges, key=str) == [None, "bytes=1000-"]
+    for item, path in zip(items, FILES):
+        assert not os.path.exists(item.dest + ".part")
+        with open(item.dest, "rb") as f:
+            assert f.read() == FILES[path]
+    done, total = progress[-1][:2]
+    assert done == total == sum(len(body) for body in FILES.values())
+
+
+def test_download_all_skips_complete_files(hub, tmp_path):
+    item = make_item(hub, tmp_path, "train/annotations.json")
+    downloader = ParallelDownloader()
+    downloader.fetch_sizes([item])
+    downloader.download_all([item], interval=0.01)
+    hub.ranges.clear()
+    assert downloader.download_all([item], interval=0.01) == []
+    assert item.skipped and hub.ranges == []
+
+
+def test_download_all_reports_missing_files(hub, tmp_path):
+    item = make_item(hub, tmp_path, "train/missing.mp4")
+    failed = ParallelDownloader().download_all([item], interval=0.01)
+    assert [failed_item for failed_item, _ in failed] == [item]
+    assert not os.path.exists(item.dest) and not os.path.exists(item.dest + ".part")
@@ -0,0 +1,107 @@
+import copy
+import json
+
+from bulk import BulkEdit, RENAME, SHIFT, apply_edit, revert_edit
+from journal import EditJournal, journal_matches_file, journal_path, read_journal, replay_journal
+from osl_io import load_osl_json
+
+
+def make_project():
+    return {
+        "version": 1,
+        "labels": ["Goal", "Foul", "Corner"],
+        "videos": [
+            {"path": "a.mp4", "annotations": [
+                {"label": "Goal", "position": 1000},
+                {"label": "Foul", "position": 2000},
+                {"label": "Corner", "position": 3000},
+            ]},
+            {"path": "b.mp4", "annotations": [
+                {"label": "Foul", "position": 500},
+                {"label": "Foul", "position": 1500},
+            ]},
+        ],
+    }
+
+
+def save(path, osl_data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(osl_data, f, indent=2)
+
+
+def test_replay_gives_the_edited_project(tmp_path):
+    path = str(tmp_path / "project.json")
+    edited = make_project()
+    save(path, edited)
+    journal = EditJournal(path)
+    videos = {video["path"]: video for video in edited["videos"]}
+
+    # Every edit is made to the open project and journaled, as the viewer does
+    a, b = videos["a.mp4"]["annotations"], videos["b.mp4"]["annotations"]
+    a.insert(1, {"label": "Goal", "position": 1500})
+    journal.append("add_annotation", path="a.mp4", row=1, annotation={"label": "Goal", "position": 1500})
+    a[0]["label"] = "Corner"
+    journal.append("set_label", path="a.mp4", row=0, label="Corner")
+    a[3]["position"] = 100
+    a.insert(0, a.pop(3))
+    journal.append("move_annotation", path="a.mp4", row=3, position=100)
+    del b[0]
+    journal.append("remove_annotation", path="b.mp4", row=0)
+    edited["labels"].append("Offside")
+    journal.append("add_label", label="Offside", index=3)
+    video = {"path": "c.mp4", "annotations": [{"label": "Offside", "position": 42}]}
+    edited["videos"].append(video)
+    journal.append("add_video", row=2, video=video)
+
+    rename = BulkEdit(RENAME, ["Foul"], target="Free kick")
+    changes = apply_edit(edited["videos"], rename)
+    edited["labels"] = rename.new_labels(edited["labels"])
+    journal.append("bulk", edit=rename.to_record(), paths=[v["path"] for v, _ in changes])
+    shift = BulkEdit(SHIFT, offset=250)
+    changes = apply_edit(edited["videos"], shift)
+    journal.append("bulk", edit=shift.to_record(), paths=[v["path"] for v, _ in changes])
+    revert_edit(changes)
+    journal.append("bulk_revert", changes=[dict(change, path=v["path"]) for v, change in changes], labels=None)
+    journal.close()
+
+    header, records = read_journal(path)
+    assert journal_matches_file(header, path)
+    assert len(records) == 9
+    osl_data = load_osl_json(path)
+    edited_videos, project_changed = replay_journal(osl_data, records)
+    assert project_changed
+    assert sorted(v["path"] for v in edited_videos) == ["a.mp4", "b.mp4", "c.mp4"]
+    assert osl_data == edited
+
+
+def test_compact_keeps_records_after_the_checkpoint(tmp_path):
+    path = str(tmp_path / "project.json")
+    save(path, make_project())
+    journal = EditJournal(path)
+    journal.append("add_label", label="Offside", index=3)
+    checkpoint = journal.checkpoint()
+    journal.append("remove_label", label="Corner")
+    save(path, make_project())  # The full save
+    journal.compact(checkpoint)
+
+    header, records = read_journal(path)
+    assert journal_matches_file(header, path)
+    assert records == [{"op": "remove_label", "label": "Corner"}]
+
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "project.json")
+    project = make_project()
+    save(path, project)
+    journal = EditJournal(path)
+    journal.append("set_label", path="b.mp4", row=1, label="Goal")
+    journal.close()
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.write('{"op": "remove_annotation", "pa')  # Crash in the middle of a write
+
+    _, records = read_journal(path)
+    osl_data = load_osl_json(path)
+    replay_journal(osl_data, records)
+    expected = copy.deepcopy(project)
+    expected["videos"][1]["annotations"][1]["label"] = "Goal"
+    assert osl_data == expected
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from lazy import LazySource, index_videos, load_index, read_index
+from osl_io import load_osl_json
+from saver import OslSaveThread
+
+
+def make_project(n_videos=4):
+    return {
+        "version": 1,
+        "labels": ["Goal", "Foul"],
+        "videos": [{"path": f"video_{i}.mp4", "fps": 25, "annotations": [
+            {"label": "Goal" if j % 3 else "Foul", "position": 1000 * j, "note": f"é {i}.{j}"}
+            for j in range(i + 2)
+        ]} for i in range(n_videos)],
+    }
+
+
+def open_lazily(path):
+    index, _ = load_index(path)
+    osl_data = {key: value for key, value in index["fields"].items() if key != "videos"}
+    osl_data["videos"] = list(index_videos(index, LazySource(path)))
+    return osl_data
+
+
+def save(path, osl_data, indent):
+    entries = [(video, 0, None) for video in osl_data["videos"]]
+    OslSaveThread(path, osl_data, entries, indent).run()
+
+
+@pytest.mark.parametrize("indent", [2, None], ids=["indented", "compact"])
+def test_unparsed_annotations_follow_the_save(tmp_path, indent):
+    path = str(tmp_path / "project.json")
+    project = make_project()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(project, f, indent=4)
+    osl_data = open_lazily(path)
+    videos = osl_data["videos"]
+    assert not any(video["annotations"].is_loaded() for video in videos)
+    spans = [(video["annotations"].start, video["annotations"].end) for video in videos]
+
+    # Edit one video and add another in front, so every other span moves
+    videos[1]["annotations"].append({"label": "Foul", "position": 99999})
+    videos.insert(0, {"path": "new.mp4", "annotations": [{"label": "Goal", "position": 1}]})
+    save(path, osl_data, indent)
+
+    unparsed = [video for video in videos if video["path"] not in ("new.mp4", "video_1.mp4")]
+    assert not any(video["annotations"].is_loaded() for video in unparsed)
+    assert [(v["annotations"].start, v["annotations"].end) for v in unparsed] != [spans[0]] + spans[2:]
+    expected = {video["path"]: video["annotations"] for video in project["videos"]}
+    for video in unparsed:
+        assert video["annotations"].to_list() == expected[video["path"]]
+        assert video["annotations"].is_loaded() is False
+        assert list(video["annotations"]) == expected[video["path"]]
+
+    saved = load_osl_json(path)
+    assert [video["path"] for video in saved["videos"]] == ["new.mp4"] + [f"video_{i}.mp4" for i in range(4)]
+    assert saved["videos"][2]["annotations"] == project["videos"][1]["annotations"] + [
+        {"label": "Foul", "position": 99999}]
+    assert read_index(path) is not None  # Written with the save, so the next open skips the scan
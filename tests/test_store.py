@@ -0,0 +1,33 @@
+import pytest
+
+from store import AnnotationStore, LabelTable
+
+EVENTS = [
+    {"label": "Goal", "position": 3000, "team": "home"},
+    {"label": "Foul", "position": 1500.5},
+    {"label": "Corner", "position": 2 ** 70},
+    {"label": "Goal", "position": 2000},
+    {"label": "Foul", "position": -5, "metadata": {"source": "model"}},
+    {"label": "Corner", "position": 2000},
+]
+
+
+def test_round_trip():
+    store = AnnotationStore.from_list(EVENTS, LabelTable())
+    assert store.to_list() == EVENTS
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_sort_uses_positions_kept_outside_the_column(reverse):
+    store = AnnotationStore.from_list(EVENTS)
+    store.sort(reverse=reverse)
+    assert store.to_list() == sorted(EVENTS, key=lambda ann: ann["position"], reverse=reverse)
+
+
+def test_sort_after_position_edits():
+    store = AnnotationStore.from_list(EVENTS[:2] + EVENTS[3:])
+    store[0]["position"] = 2 ** 80
+    store[1]["position"] = 0
+    store.sort()
+    assert [ann["position"] for ann in store] == [-5, 0, 2000, 2000, 2 ** 80]
+    assert [ann["label"] for ann in store] == ["Foul", "Foul", "Goal", "Corner", "Goal"]
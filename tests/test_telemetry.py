@@ -0,0 +1,18 @@
+from telemetry import Telemetry
+
+
+def test_instrument_records_calls_only_when_enabled():
+    telemetry = Telemetry()
+
+    @telemetry.instrument("work")
+    def work(x, y=1):
+        """Add two numbers."""
+        return x + y
+
+    assert work(1, y=2) == 3
+    assert "work" not in telemetry.histograms
+    telemetry.enable()
+    assert work(1) == 2
+    assert telemetry.histograms["work"].count == 1
+    assert (work.__name__, work.__doc__, work.__wrapped__(2)) == ("work", "Add two numbers.", 3)
+    assert work.__qualname__.endswith("<locals>.work")
@@ -0,0 +1,85 @@
+"""Compile the Qt Designer files of the GUI into Python modules.
+
+Usage: python tools/compile_ui.py [--check]
+
+Every ``osl_visualizer/ui/<name>.ui`` is compiled with PyQt6's uic into
+``osl_visualizer/compiled_ui/ui_<name>.py``, which records the SHA-1 of the
+.ui file it was generated from. At runtime ``uiloader.load_ui()`` uses the
+compiled module while that hash matches the .ui file next to it, and parses
+the .ui file otherwise, so editing a form in Designer without running this
+script is never wrong, only slower to start.
+
+With ``--check``, nothing is written and the exit status is 1 when a
+compiled module is missing or out of date.
+"""
+import os
+import io
+import re
+import sys
+import hashlib
+import argparse
+
+from PyQt6 import uic
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "osl_visualizer")
+UI_DIR = os.path.join(ROOT, "ui")
+OUT_DIR = os.path.join(ROOT, "compiled_ui")
+
+
+def ui_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def compiled_sha1(py_path):
+    """The UI_SHA1 recorded in a compiled module, or None if there is none."""
+    if not os.path.exists(py_path):
+        return None
+    with open(py_path, "r", encoding="utf-8") as f:
+        match = re.search(r'^UI_SHA1 = "([0-9a-f]+)"', f.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def compile_form(ui_path):
+    """Return the source of the compiled module of a .ui file."""
+    out = io.StringIO()
+    with open(ui_path, "r", encoding="utf-8") as f:
+        uic.compileUi(f, out)
+    source = out.getvalue()
+    form_class = re.search(r"^class (Ui_\w+)\b", source, re.MULTILINE).group(1)
+    # The .ui path is written in the header, keep it relative so the output does not depend on the checkout
+    source = source.replace(f"reading ui file '{f.name}'", f"reading ui file 'ui/{os.path.basename(ui_path)}'")
+    return source + f"\n\nFORM_CLASS = {form_class}\nUI_SHA1 = \"{ui_sha1(ui_path)}\"\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the .ui files of the GUI into Python modules.")
+    parser.add_argument("--check", action="store_true", help="only report missing or outdated modules")
+    args = parser.parse_args(argv)
+
+    outdated = []
+    os.makedirs(OUT_DIR, exist_ok=True)
+    init_path = os.path.join(OUT_DIR, "__init__.py")
+    if not args.check and not os.path.exists(init_path):
+        with open(init_path, "w", encoding="utf-8") as f:
+            f.write('"""Python modules generated from ui/*.ui by tools/compile_ui.py. Do not edit."""\n')
+    for name in sorted(os.listdir(UI_DIR)):
+        if not name.endswith(".ui"):
+            continue
+        ui_path = os.path.join(UI_DIR, name)
+        py_path = os.path.join(OUT_DIR, "ui_" + name[:-3] + ".py")
+        if compiled_sha1(py_path) == ui_sha1(ui_path):
+            continue
+        outdated.append(py_path)
+        if args.check:
+            print(f"outdated: {os.path.relpath(py_path, ROOT)}")
+        else:
+            source = compile_form(ui_path)
+            with open(py_path, "w", encoding="utf-8") as f:
+                f.write(source)
+            print(f"compiled {name} -> {os.path.relpath(py_path, ROOT)}")
+    return 1 if args.check and outdated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())